@@ -0,0 +1,161 @@
+import json
+import re
+from typing import List, NamedTuple, Optional
+
+
+class MedicineExtraction(NamedTuple):
+    """Fields extracted from one medicine label; "" (text) or None (numbers) where the label does not say.
+
+    pill_count and frequency are numbers; as_strings() gives the older
+    all-text (name, dosage, instructions, pill_count, frequency) tuple that
+    the /upload-image/ response still sends.
+    """
+    medicine_name: str = ""
+    dosage: str = ""
+    instructions: str = ""
+    pill_count: Optional[int] = None
+    frequency: Optional[float] = None
+
+    def as_strings(self) -> tuple:
+        """The fields as text: numbers like "30" or "0.5", "" for any field that is missing."""
+        return tuple(_text(value) for value in self)
+
+
+EXTRACTION_FIELDS = MedicineExtraction._fields
+
+
+class ExtractionParseError(ValueError):
+    """A model response that holds none of the extraction fields."""
+
+
+_FIELD_SCHEMA = {
+    "medicine_name": {"type": "string", "description": "Medicine name as printed, without the strength"},
+    "dosage": {"type": "string", "description": "Strength per dose unit, e.g. '10 mg'"},
+    "instructions": {
+        "type": "string",
+        "description": "Full directions, keeping timing such as 'twice daily' or 'every other day'"
+    },
+    "pill_count": {"type": "integer", "nullable": True, "description": "Number of units dispensed"},
+    "frequency": {
+        "type": "number", "nullable": True,
+        "description": "Doses per day, e.g. 'twice daily' = 2, 'every other day' = 0.5"
+    },
+}
+
+# Gemini response_schema for one label, and for a numbered batch of labels
+EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": _FIELD_SCHEMA,
+    "required": list(EXTRACTION_FIELDS),
+}
+BATCH_EXTRACTION_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {"item": {"type": "integer"}, **_FIELD_SCHEMA},
+        "required": ["item", *EXTRACTION_FIELDS],
+    },
+}
+
+# Line format of responses from before schema mode: "- Medicine Name: Aspirin", possibly in **bold**
+_LEGACY_LINE = re.compile(
+    r"^[\s\-*]*(Medicine Name|Dosage|Instructions|Pill ?Count|Frequency)\**\s*:\s*\**\s*(.*?)\s*$",
+    re.MULTILINE | re.IGNORECASE
+)
+_LEGACY_FIELDS = {
+    "medicine name": "medicine_name", "dosage": "dosage", "instructions": "instructions",
+    "pillcount": "pill_count", "pill count": "pill_count", "frequency": "frequency",
+}
+
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)?")
+
+
+def format_number(value: float) -> str:
+    return f"{round(value, 2):g}"
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return format_number(value)
+    return str(value).strip()
+
+
+def _number(value) -> Optional[float]:
+    """A number from a JSON number or from text such as "2" or "30 tablets"; None when there is none."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(str(value))
+    return float(match.group().replace(",", ".")) if match else None
+
+
+def _from_fields(fields: dict) -> MedicineExtraction:
+    pill_count = _number(fields.get("pill_count"))
+    return MedicineExtraction(
+        _text(fields.get("medicine_name")),
+        _text(fields.get("dosage")),
+        _text(fields.get("instructions")),
+        int(pill_count) if pill_count is not None else None,
+        _number(fields.get("frequency")),
+    )
+
+
+def extraction_from_values(values) -> MedicineExtraction:
+    """Rebuilds an extraction from its field values in order (e.g. a cached JSON list), normalizing their types."""
+    return _from_fields(dict(zip(EXTRACTION_FIELDS, values)))
+
+
+def _load_json(response_text: str):
+    text = response_text.strip()
+    if text.startswith("```"):  # ```json ... ``` fences, which some responses still carry
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+    return json.loads(text)
+
+
+def parse_extraction(response_text: str) -> MedicineExtraction:
+    """Parses one extraction from a schema-mode JSON response (or the older line format).
+
+    Raises ExtractionParseError when the response holds none of the fields.
+    """
+    fields = None
+    if response_text.lstrip()[:1] in ("{", "[", "`"):
+        try:
+            fields = _load_json(response_text)
+        except ValueError:
+            pass
+    if fields is None:
+        # One pass over the lines; the first value of each field wins
+        fields = {}
+        for match in _LEGACY_LINE.finditer(response_text):
+            fields.setdefault(_LEGACY_FIELDS[match.group(1).lower()], match.group(2))
+
+    if isinstance(fields, list) and len(fields) == 1:
+        fields = fields[0]
+    if not isinstance(fields, dict) or not any(name in fields for name in EXTRACTION_FIELDS):
+        raise ExtractionParseError(f"No extraction fields in response: {response_text[:200]!r}")
+    return _from_fields(fields)
+
+
+def parse_batch_extraction(response_text: str, count: int) -> List[Optional[MedicineExtraction]]:
+    """One extraction per batch item, in item order; None for items the response left out."""
+    try:
+        items = _load_json(response_text)
+    except ValueError as e:
+        raise ExtractionParseError(f"Batch response is not JSON: {e}")
+    if isinstance(items, dict):
+        items = items.get("items", [items])
+    if not isinstance(items, list):
+        raise ExtractionParseError("Batch response is not a JSON array")
+
+    results = [None] * count
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        number = item.get("item", position + 1)
+        if isinstance(number, int) and 1 <= number <= count and results[number - 1] is None:
+            results[number - 1] = _from_fields(item)
+    return results
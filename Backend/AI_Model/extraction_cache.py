@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from cache_utils import TTLCache
+from Security.encryption import fernet_for
+
+# Centralized config values
+from Backend.config import (
+    EXTRACTION_CACHE_MAX_ENTRIES, EXTRACTION_CACHE_DIR,
+    EXTRACTION_CACHE_DISK_MAX_ENTRIES, EXTRACTION_CACHE_DISK_TTL_SECONDS
+)
+
+_MISSING = object()
+_ENTRY_SUFFIX = ".enc"
+_TEMP_SUFFIX = ".tmp"
+
+
+class ContentCache:
+    """Content-addressed cache: a bounded in-memory LRU backed by an optional directory of encrypted files.
+
+    Keys are hex digests of the content. Memory misses fall through to disk
+    and are promoted back into memory on a hit; the disk tier survives
+    restarts and is shared by workers on the same host.
+
+    Disk entries hold label text and extractions, so each is a Fernet token
+    under a key derived from ENCRYPTION_KEY. Entries older than `disk_ttl`
+    seconds are not served, and every tenth of `disk_max_entries` writes a
+    prune deletes expired entries and then the oldest beyond the cap (plus
+    any file that is not an encrypted entry, such as older plaintext ones).
+    """
+
+    def __init__(self, name: str, maxsize: int, disk_dir: Optional[str] = None,
+                 disk_max_entries: Optional[int] = None, disk_ttl: Optional[int] = None,
+                 cipher: Optional[Fernet] = None, clock: Callable[[], float] = time.time):
+        self.name = name
+        self._memory = TTLCache(maxsize=maxsize)
+        self._disk_dir = os.path.join(disk_dir, name) if disk_dir else None
+        self.disk_max_entries = disk_max_entries
+        self.disk_ttl = disk_ttl
+        self._cipher = cipher or (fernet_for("extraction-cache") if disk_dir else None)
+        self._clock = clock
+        self._prune_every = max(1, disk_max_entries // 10) if disk_max_entries else None
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._disk_dir, key[:2], f"{key}{_ENTRY_SUFFIX}")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._memory.get(key, _MISSING)
+        if value is not _MISSING:
+            with self._lock:
+                self.memory_hits += 1
+            return value
+
+        if self._disk_dir:
+            value = self._read(self._path(key))
+            if value is not _MISSING:
+                self._memory.set(key, value)
+                with self._lock:
+                    self.disk_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def _read(self, path: str) -> Any:
+        try:
+            with open(path, "rb") as f:
+                token = f.read()
+        except OSError:
+            return _MISSING
+        try:
+            if self.disk_ttl is None:
+                plaintext = self._cipher.decrypt(token)
+            else:
+                # Fernet tokens carry their write time, so the age check does not trust the file's mtime
+                plaintext = self._cipher.decrypt_at_time(token, self.disk_ttl, int(self._clock()))
+            return json.loads(plaintext)
+        except (InvalidToken, ValueError):
+            # Expired, corrupt or written under another key
+            self._remove(path)
+            return _MISSING
+
+    def set(self, key: str, value: Any):
+        """Stores a JSON-serializable value in memory and, if configured, encrypted on disk."""
+        self._memory.set(key, value)
+        if not self._disk_dir:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            token = self._cipher.encrypt_at_time(json.dumps(value).encode(), int(self._clock()))
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}{_TEMP_SUFFIX}"
+            with open(temp_path, "wb") as f:
+                f.write(token)
+            os.replace(temp_path, path)  # Readers never see a partial file
+        except OSError as e:
+            print(f"[WARN] Could not write {self.name} cache entry to disk: {e}")
+            return
+
+        with self._lock:
+            prune = self._prune_every is not None and self._writes % self._prune_every == 0
+            self._writes += 1
+        if prune:
+            self.prune()
+
+    def prune(self) -> int:
+        """Deletes expired disk entries, then the oldest beyond disk_max_entries; returns how many were deleted."""
+        if not self._disk_dir:
+            return 0
+        now = self._clock()
+        entries, removing = [], []
+        for directory, _, files in os.walk(self._disk_dir):
+            for file in files:
+                path = os.path.join(directory, file)
+                try:
+                    written = os.stat(path).st_mtime
+                except OSError:
+                    continue  # Removed by another worker
+                expired = self.disk_ttl is not None and now - written > self.disk_ttl
+                if file.endswith(_TEMP_SUFFIX):
+                    # Another worker may be mid-write; only leftovers of a crashed write go
+                    if expired:
+                        removing.append(path)
+                elif expired or not file.endswith(_ENTRY_SUFFIX):
+                    removing.append(path)
+                else:
+                    entries.append((written, path))
+
+        if self.disk_max_entries is not None and len(entries) > self.disk_max_entries:
+            entries.sort()
+            removing.extend(path for _, path in entries[:len(entries) - self.disk_max_entries])
+
+        for path in removing:
+            self._remove(path)
+        return len(removing)
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            self.disk_evictions += 1
+
+    def clear(self):
+        self._memory.clear()
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "size": len(self._memory),
+            "maxsize": self._memory.maxsize,
+            "disk": self._disk_dir is not None,
+            "disk_evictions": self.disk_evictions,
+        }
+
+
+def image_key(image_content: bytes) -> str:
+    return hashlib.sha256(image_content).hexdigest()
+
+
+def normalize_text(text: str) -> str:
+    """Collapses the whitespace and case differences OCR produces for the same label."""
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def text_key(text: str, namespace: str = "") -> str:
+    """Digest of the normalized text; `namespace` (model and prompt version) keeps old results from leaking."""
+    return hashlib.sha256(f"{namespace}|{normalize_text(text)}".encode()).hexdigest()
+
+
+# Level 1: image bytes -> OCR text; level 2: normalized OCR text -> structured extraction
+ocr_cache = ContentCache(
+    "ocr", EXTRACTION_CACHE_MAX_ENTRIES, EXTRACTION_CACHE_DIR,
+    EXTRACTION_CACHE_DISK_MAX_ENTRIES, EXTRACTION_CACHE_DISK_TTL_SECONDS
+)
+extraction_cache = ContentCache(
+    "extraction", EXTRACTION_CACHE_MAX_ENTRIES, EXTRACTION_CACHE_DIR,
+    EXTRACTION_CACHE_DISK_MAX_ENTRIES, EXTRACTION_CACHE_DISK_TTL_SECONDS
+)
+
+def extraction_cache_stats() -> dict:
+    return {"ocr": ocr_cache.stats(), "extraction": extraction_cache.stats()}
@@ -1,69 +1,144 @@
-import google.generativeai as genai
+import re
+import threading
+from functools import lru_cache
+from typing import List, Optional
+
+# The SDK is imported, and configured, when the first model is built
+from import_utils import LazyModule
 
 # Centralized configuration
 from Backend.config import GEMINI_API_KEY
 
-# Configure Google Gemini AI
-genai.configure(api_key=GEMINI_API_KEY)
+# Content-hash cache for extraction results
+from .extraction_cache import extraction_cache, text_key
+
+# Structured output: typed result, response schemas and parsers
+from .extraction import (
+    MedicineExtraction, EXTRACTION_SCHEMA, BATCH_EXTRACTION_SCHEMA,
+    parse_extraction, parse_batch_extraction, extraction_from_values
+)
+
+genai = LazyModule("google.generativeai")
+
+GEMINI_MODEL = "gemini-1.5-pro"
+# Bump when the prompt or output parsing changes, so cached extractions are not reused
+PROMPT_VERSION = 2
 
-def categorize_medicine_text(extracted_text: str) -> dict:
-    """Uses Google Gemini AI to categorize medicine text into structured data."""
-    
-    prompt = f"""
-Extract the following information from the text below:
+_INSTRUCTIONS = """
+Extract the following information from {subject}:
 
-1. Medicine Name
-2. Dosage
-3. Full Instructions (include dosage timing like 'twice daily' or 'every other day' as part of this field)
-4. Pill Count
-5. Frequency — a number representation of how often the medicine is taken per day:
+1. medicine_name — the medicine name
+2. dosage — the dosage
+3. instructions — the full instructions (include dosage timing like 'twice daily' or 'every other day' as part of this field)
+4. pill_count — the pill count, as a number
+5. frequency — a number representation of how often the medicine is taken per day:
    - Example: 'twice daily' = 2
    - Example: 'every other day' = 0.5
 
 Do not remove or paraphrase timing information like 'twice daily' from the instructions — keep it there.
-
-Text to extract from:
-{extracted_text}
-
-Return the output in this exact format:
-- Medicine Name: [medicine_name]
-- Dosage: [dosage]
-- Instructions: [full instructions with timing]
-- PillCount: [pill_count as a number]
-- Frequency: [frequency as a number]
+Use an empty string (or null for numbers) for anything the label does not say.
 """
 
-    model = genai.GenerativeModel("gemini-1.5-pro")
-    response = model.generate_content(prompt)
-
-    print(f"Raw response from Gemini AI: {response.text}")
-
-    try:
-        response_text = response.text
-
-        medicine_name = ""
-        dosage = ""
-        instructions = ""
-        pill_count = ""
-        frequency = ""
-
-        if "Medicine Name:" in response_text:
-            medicine_name = response_text.split("Medicine Name:")[1].split("\n")[0].strip()
-
-        if "Dosage:" in response_text:
-            dosage = response_text.split("Dosage:")[1].split("\n")[0].strip()
-
-        if "Instructions:" in response_text:
-            instructions = response_text.split("Instructions:")[1].split("\n")[0].strip()
-
-        if "PillCount:" in response_text:
-            pill_count = response_text.split("PillCount:")[1].split("\n")[0].strip()
-
-        if "Frequency:" in response_text:
-            frequency = response_text.split("Frequency:")[1].split("\n")[0].strip()
-        
-        return medicine_name, dosage, instructions, pill_count, frequency
-
-    except Exception as e:
-        print(f"Error extracting values: {e}")
-        return None, None, None
+# Prompt prefixes are built once; each call only appends the label text
+EXTRACTION_PROMPT = _INSTRUCTIONS.format(subject="the text below") + "\nText to extract from:\n"
+BATCH_EXTRACTION_PROMPT = _INSTRUCTIONS.format(
+    subject="each item below, which is the text of a different medicine label"
+) + (
+    "Use only the text of an item for that item's answer, and return one object per item "
+    "with its item number.\n\n"
+)
+
+_model = None
+_model_lock = threading.Lock()
+
+def get_model():
+    """The Gemini model, constructed (and the API key configured) on first use and reused by every call."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                genai.configure(api_key=GEMINI_API_KEY)
+                _model = genai.GenerativeModel(GEMINI_MODEL)
+    return _model
+
+
+@lru_cache(maxsize=None)
+def generation_config(batch: bool = False):
+    """JSON mode constrained to the extraction schema (the batch schema with batch=True)."""
+    return genai.GenerationConfig(
+        response_mime_type="application/json",
+        response_schema=BATCH_EXTRACTION_SCHEMA if batch else EXTRACTION_SCHEMA
+    )
+
+
+def categorize_medicine_text(extracted_text: str) -> MedicineExtraction:
+    """Uses Google Gemini AI to categorize medicine text into structured data.
+
+    Raises ExtractionParseError if the response holds no extraction.
+    """
+    response = get_model().generate_content(
+        EXTRACTION_PROMPT + extracted_text, generation_config=generation_config()
+    )
+
+    return parse_extraction(response.text)
+
+
+# Separates items in a packed prompt; label text that contains one would shift the items after it
+ITEM_MARKER = re.compile(r"^[ \t]*=+[ \t]*item[ \t]*\d+[ \t]*=+[ \t]*$", re.IGNORECASE | re.MULTILINE)
+
+def pack_items(extracted_texts: List[str]) -> str:
+    """One '=== Item N ===' section per text, with marker-like lines removed from the texts."""
+    return "\n\n".join(
+        f"=== Item {number} ===\n{ITEM_MARKER.sub('', text)}" for number, text in enumerate(extracted_texts, start=1)
+    )
+
+def categorize_medicine_texts(extracted_texts: List[str]) -> List[Optional[MedicineExtraction]]:
+    """Categorizes several label texts with a single Gemini call.
+
+    Returns one extraction per text, in order; None for an item the
+    response did not include.
+    """
+    response = get_model().generate_content(
+        BATCH_EXTRACTION_PROMPT + pack_items(extracted_texts), generation_config=generation_config(batch=True)
+    )
+
+    return parse_batch_extraction(response.text, len(extracted_texts))
+
+
+def _extraction_key(extracted_text: str) -> str:
+    return text_key(extracted_text, f"{GEMINI_MODEL}:{PROMPT_VERSION}")
+
+
+def categorize_medicine_text_cached(extracted_text: str):
+    """categorize_medicine_text, skipping Gemini for text (after normalization) it has already seen."""
+    key = _extraction_key(extracted_text)
+    cached = extraction_cache.get(key)
+    if cached is not None:
+        return extraction_from_values(cached)
+
+    result = categorize_medicine_text(extracted_text)
+    extraction_cache.set(key, list(result))
+    return result
+
+
+def categorize_medicine_texts_cached(extracted_texts: List[str]) -> list:
+    """categorize_medicine_texts, packing only the texts not already cached into the Gemini call."""
+    keys = [_extraction_key(text) for text in extracted_texts]
+    results = [extraction_cache.get(key) for key in keys]
+    results = [extraction_from_values(result) if result is not None else None for result in results]
+
+    # Labels repeated within the batch are sent once
+    pending = {}
+    for index, key in enumerate(keys):
+        if results[index] is None:
+            pending.setdefault(key, []).append(index)
+    if not pending:
+        return results
+
+    fresh = categorize_medicine_texts([extracted_texts[indexes[0]] for indexes in pending.values()])
+    for (key, indexes), result in zip(pending.items(), fresh):
+        if result is not None:
+            extraction_cache.set(key, list(result))
+        for index in indexes:
+            results[index] = result
+    return results
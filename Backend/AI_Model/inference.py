@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import io
+import re
+from typing import Optional, Tuple
+
+from import_utils import LazyModule
+
+from .extraction import MedicineExtraction
+
+# Imported on the first image the local engine preprocesses
+np = LazyModule("numpy")
+Image = LazyModule("PIL.Image")
+
+# Larger photos are scaled down before preprocessing; label text stays legible well below this
+MAX_IMAGE_SIDE = 2000
+
+# Skew angles searched by estimate_skew, in degrees
+MAX_SKEW_DEGREES = 10.0
+SKEW_STEP_DEGREES = 0.5
+
+
+# --- Image preprocessing -------------------------------------------------
+
+def load_image(image_content: bytes) -> np.ndarray:
+    """Decodes an image into an RGB uint8 array, scaled down to MAX_IMAGE_SIDE."""
+    with Image.open(io.BytesIO(image_content)) as image:
+        image = image.convert("RGB")
+        image.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+        return np.asarray(image)
+
+
+def to_grayscale(rgb: np.ndarray) -> np.ndarray:
+    """ITU-R 601 luma of an RGB array, as uint8."""
+    if rgb.ndim == 2:
+        return rgb.astype(np.uint8)
+    luma = rgb[..., :3].astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    return np.clip(luma + 0.5, 0, 255).astype(np.uint8)
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    """The grey level that best separates ink from background (Otsu's method)."""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    weight = np.cumsum(hist) / gray.size
+    mean = np.cumsum(hist * np.arange(256)) / gray.size
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mean[-1] * weight - mean) ** 2 / (weight * (1.0 - weight))
+    return int(np.nanargmax(np.nan_to_num(between, nan=0.0, posinf=0.0)))
+
+
+def binarize(gray: np.ndarray, threshold: Optional[int] = None) -> np.ndarray:
+    """Black text (0) on white (255); light text on a dark label is inverted first."""
+    threshold = otsu_threshold(gray) if threshold is None else threshold
+    ink = gray <= threshold
+    if ink.mean() > 0.5:  # More "ink" than background: the label is light-on-dark
+        ink = ~ink
+    return np.where(ink, 0, 255).astype(np.uint8)
+
+
+def estimate_skew(binary: np.ndarray, max_angle: float = MAX_SKEW_DEGREES,
+                  step: float = SKEW_STEP_DEGREES, max_points: int = 50_000) -> float:
+    """Angle in degrees (positive = clockwise) that the text lines are rotated by.
+
+    Projection-profile search: ink pixels are sheared by each candidate
+    angle and binned into rows; the angle that stacks them into the
+    sharpest row histogram is the one that lines the text up.
+    """
+    ys, xs = np.nonzero(binary == 0)
+    if len(ys) < 2:
+        return 0.0
+    if len(ys) > max_points:
+        keep = np.random.default_rng(0).choice(len(ys), max_points, replace=False)
+        ys, xs = ys[keep], xs[keep]
+    ys = ys.astype(np.float64)
+    xs = xs.astype(np.float64) - xs.mean()
+
+    best_angle, best_score = 0.0, -1.0
+    for angle in np.arange(-max_angle, max_angle + step / 2, step):
+        rows = np.rint(ys - xs * np.tan(np.deg2rad(angle))).astype(np.int64)
+        profile = np.bincount(rows - rows.min())
+        score = float(np.dot(profile, profile))
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
+
+
+def rotate(gray: np.ndarray, angle: float, fill: int = 255) -> np.ndarray:
+    """Rotates counter-clockwise by `angle` degrees about the centre (nearest neighbour, same size)."""
+    if abs(angle) < 1e-6:
+        return gray
+    theta = np.deg2rad(angle)
+    cos, sin = np.cos(theta), np.sin(theta)
+    height, width = gray.shape
+    ys, xs = np.indices((height, width), dtype=np.float32)
+    ys -= (height - 1) / 2
+    xs -= (width - 1) / 2
+    src_x = np.rint(cos * xs - sin * ys + (width - 1) / 2).astype(np.intp)
+    src_y = np.rint(sin * xs + cos * ys + (height - 1) / 2).astype(np.intp)
+    inside = (src_x >= 0) & (src_x < width) & (src_y >= 0) & (src_y < height)
+
+    rotated = np.full_like(gray, fill)
+    rotated[inside] = gray[src_y[inside], src_x[inside]]
+    return rotated
+
+
+def preprocess(image_content: bytes) -> Tuple[np.ndarray, float]:
+    """Grayscale, deskewed and thresholded label image ready for OCR, plus the skew removed."""
+    gray = to_grayscale(load_image(image_content))
+    threshold = otsu_threshold(gray)
+    skew = estimate_skew(binarize(gray, threshold))
+    # Rotate the grey image (not the binary one) so thresholding sees clean edges
+    return binarize(rotate(gray, skew), threshold), skew
+
+
+# --- Label text parsing --------------------------------------------------
+
+DOSAGE = re.compile(
+    r"(?<![\w.])(\d+(?:[.,]\d+)?)\s*(mg|mcg|µg|ug|g|ml|iu|units?|%)"
+    r"(?:\s*/\s*(\d+(?:\.\d+)?)\s*(ml))?(?![a-z])",
+    re.IGNORECASE
+)
+# "Qty: 30" or "# 30", but not the prescription number in "Rx# 0458123"
+QUANTITY = re.compile(r"(?:\b(?:qty|quantity|count)\b\s*[:.#]?|(?<![a-z])#)\s*(\d+)", re.IGNORECASE)
+UNIT_COUNT = re.compile(r"\b(\d+)\s*(?:tablets?|capsules?|caplets?|pills?|tabs?|caps?|softgels?)\b", re.IGNORECASE)
+DIRECTION = re.compile(
+    r"^\s*(take|use|apply|inhale|instill|place|insert|chew|dissolve|swallow|give|spray|inject)\b",
+    re.IGNORECASE
+)
+# Label lines that are never part of the name or the directions
+NOT_LABEL_TEXT = re.compile(
+    r"\b(pharmacy|rx|refills?|qty|quantity|dr|md|prescriber|date|exp|expires|discard|store|"
+    r"keep|warning|caution|ndc|patient)\b|\(\d{3}\)|\d{3}-\d{3}-\d{4}",
+    re.IGNORECASE
+)
+DOSAGE_FORMS = re.compile(
+    r"\b(tablets?|capsules?|caplets?|tabs?|caps?|softgels?|oral|solution|suspension|chewable)\b",
+    re.IGNORECASE
+)
+# Release forms and salts that keep their own casing when a name is re-cased
+NAME_ACRONYMS = {word.upper(): word for word in ("ER", "XR", "SR", "DR", "XL", "CR", "LA", "HCl", "HCT", "ODT", "DS")}
+
+# Checked in order, so "once a week" wins over "once" and "every 8 hours" over "every"
+FREQUENCIES = (
+    (re.compile(r"\b(once a week|once weekly|weekly|every week)\b", re.I), lambda m: 1 / 7),
+    (re.compile(r"\bevery other day\b", re.I), lambda m: 0.5),
+    (re.compile(r"\bevery\s+(\d+)\s*(?:-|to)\s*(\d+)\s*(?:hours|hrs?|h)\b", re.I), lambda m: 24 / int(m.group(2))),
+    (re.compile(r"\bevery\s+(\d+)\s*(?:hours|hrs?|h)\b", re.I), lambda m: 24 / int(m.group(1))),
+    (re.compile(r"\b(four times|4 times|qid)\b", re.I), lambda m: 4),
+    (re.compile(r"\b(three times|3 times|tid)\b", re.I), lambda m: 3),
+    (re.compile(r"\b(twice|two times|2 times|bid)\b", re.I), lambda m: 2),
+    (re.compile(
+        r"\b(once|one time|1 time|daily|every day|each day|qd|at bedtime|nightly|"
+        r"every (?:morning|evening|night))\b", re.I), lambda m: 1),
+)
+
+
+def _recase(text: str) -> str:
+    """Sentence case for text that OCR returned all in capitals."""
+    return text[:1].upper() + text[1:].lower() if text.isupper() else text
+
+
+def _recase_name(name: str) -> str:
+    if not name.isupper() and not name.islower():
+        return name
+    return " ".join(NAME_ACRONYMS.get(word.upper(), word.capitalize()) for word in name.split())
+
+
+def parse_dosage(text: str) -> str:
+    match = DOSAGE.search(text)
+    if not match:
+        return ""
+    amount, unit, per_amount, per_unit = match.groups()
+    unit = {"ml": "mL", "iu": "IU", "ug": "mcg", "µg": "mcg"}.get(unit.lower(), unit.lower())
+    dosage = f"{amount.replace(',', '.')} {unit}"
+    return f"{dosage}/{per_amount} mL" if per_amount else dosage
+
+
+def parse_pill_count(text: str) -> Optional[int]:
+    match = QUANTITY.search(text)
+    if match:
+        return int(match.group(1))
+    # "30 tablets", skipping the per-dose count in directions ("Take 1 tablet ...")
+    counts = [
+        int(m.group(1)) for m in UNIT_COUNT.finditer(text)
+        if not DIRECTION.search(text[text.rfind("\n", 0, m.start()) + 1:m.start()])
+    ]
+    return max(counts) if counts else None
+
+
+def parse_frequency(text: str) -> Optional[float]:
+    for pattern, doses_per_day in FREQUENCIES:
+        match = pattern.search(text)
+        if match:
+            return round(float(doses_per_day(match)), 2)
+    return None
+
+
+def parse_instructions(lines: list) -> str:
+    start = next((i for i, line in enumerate(lines) if DIRECTION.search(line)), None)
+    if start is None:
+        start = next((i for i, line in enumerate(lines) if parse_frequency(line) is not None), None)
+    if start is None:
+        return ""
+    collected = [lines[start]]
+    for line in lines[start + 1:]:
+        if not line or NOT_LABEL_TEXT.search(line) or QUANTITY.search(line) or DOSAGE.search(line) \
+                or UNIT_COUNT.match(line):
+            break
+        collected.append(line)
+    return _recase(" ".join(" ".join(collected).split()))
+
+
+def parse_name(lines: list) -> str:
+    for number, line in enumerate(lines):
+        match = DOSAGE.search(line)
+        if not match or DIRECTION.search(line):
+            continue
+        name = line[:match.start()]
+        if not re.search(r"[a-zA-Z]{3}", name) and number > 0:
+            name = lines[number - 1]  # Strength printed on its own line under the name
+        name = DOSAGE_FORMS.sub(" ", name)
+        name = " ".join(re.sub(r"[^A-Za-z0-9\- ]", " ", name).split())
+        if re.search(r"[a-zA-Z]{3}", name):
+            return _recase_name(name)
+
+    # No strength on the label: the first line that reads like a drug name
+    for line in lines:
+        if DIRECTION.search(line) or NOT_LABEL_TEXT.search(line):
+            continue
+        words = re.sub(r"[^A-Za-z\- ]", " ", DOSAGE_FORMS.sub(" ", line)).split()
+        if words and sum(len(word) for word in words) >= 4 and len(words) <= 4:
+            return _recase_name(" ".join(words))
+    return ""
+
+
+def parse_label_text(text: str) -> MedicineExtraction:
+    """Medicine name, dosage, instructions, pill count and frequency from label text.
+
+    Deterministic counterpart of the Gemini extraction, with the same
+    typed result; text fields that are not found are "" and numbers None.
+    """
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    instructions = parse_instructions(lines)
+    return MedicineExtraction(
+        parse_name(lines),
+        parse_dosage(text),
+        instructions,
+        parse_pill_count(text),
+        parse_frequency(instructions or text),
+    )
+
+
+# --- Local engine --------------------------------------------------------
+
+class TesseractBackend:
+    """OCR with a local tesseract binary through pytesseract."""
+
+    name = "tesseract"
+
+    def recognize(self, image: np.ndarray) -> str:
+        import pytesseract
+        # psm 6: a single uniform block of text, which suits a label
+        return pytesseract.image_to_string(Image.fromarray(image), config="--psm 6")
+
+
+def get_local_ocr_backend():
+    """The local OCR backend, or None if pytesseract or the tesseract binary is missing."""
+    # Optional; without it the engine can still parse text it is given
+    try:
+        import pytesseract
+    except ImportError:
+        return None
+    try:
+        pytesseract.get_tesseract_version()
+    except Exception:
+        return None
+    return TesseractBackend()
+
+
+class LocalExtractionEngine:
+    """CPU-only label extraction: preprocessing, local OCR, then the regex parser.
+
+    Used when the remote Vision + Gemini path is slow or unavailable.
+    Without an OCR backend the engine can still parse text that remote
+    OCR already produced (e.g. when only Gemini timed out).
+    """
+
+    def __init__(self, backend=None, detect_backend: bool = False):
+        self._backend = backend
+        # Look for tesseract on first use rather than at import (it runs the binary)
+        self._detect_backend = detect_backend
+
+    @property
+    def backend(self):
+        if self._detect_backend:
+            self._backend, self._detect_backend = get_local_ocr_backend(), False
+        return self._backend
+
+    @property
+    def available(self) -> bool:
+        return self.backend is not None
+
+    def read_text(self, image_content: bytes) -> str:
+        if self.backend is None:
+            raise RuntimeError("No local OCR backend is installed (pytesseract and tesseract)")
+        image, _ = preprocess(image_content)
+        return self.backend.recognize(image)
+
+    def parse(self, extracted_text: str) -> MedicineExtraction:
+        return parse_label_text(extracted_text)
+
+    def extract(self, image_content: bytes):
+        text = self.read_text(image_content)
+        if not text.strip():
+            return {"medicine_name": None, "dosage": None, "instructions": None}
+        return self.parse(text)
+
+
+local_engine = LocalExtractionEngine(detect_backend=True)
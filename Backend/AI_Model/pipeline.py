@@ -0,0 +1,343 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from metrics import LatencyHistogram
+
+# Centralized config values
+from Backend.config import (
+    EXTRACTION_MAX_CONCURRENCY, EXTRACTION_MAX_QUEUE, EXTRACTION_BATCH_SLOTS,
+    EXTRACTION_OCR_TIMEOUT_SECONDS, EXTRACTION_LLM_TIMEOUT_SECONDS,
+    EXTRACTION_LOCAL_TIMEOUT_SECONDS, EXTRACTION_STUB_CLIENTS, LOCAL_OCR_FALLBACK
+)
+
+from .extraction import EXTRACTION_FIELDS
+
+NO_TEXT_RESULT = {"medicine_name": None, "dosage": None, "instructions": None}
+_NO_LOCAL_OCR = object()
+
+
+class _Slot:
+    """A held concurrency slot. A call that timed out is kept in `pending`: the
+    slot is only released once that thread is done, so the pool never has
+    more calls than threads."""
+    __slots__ = ("pending",)
+
+    def __init__(self):
+        self.pending = None
+
+
+class ExtractionPipeline:
+    """Runs OCR then categorization for uploaded images without blocking the event loop.
+
+    Both stages are blocking client calls, so they run on a dedicated
+    thread pool sized to max_concurrency. A request waits for one of
+    max_concurrency slots; once max_queue requests are already waiting,
+    new ones are refused with a 503 instead of piling up. Each stage has
+    its own timeout (504 when exceeded) and latency histogram. A timed-out
+    call keeps running on its thread, and keeps its slot until it returns.
+
+    Batches are split into chunks; each chunk takes one slot and makes one
+    batch OCR call and one packed categorization call. Without batch
+    callables, the single-item ones are applied to each item in turn. A
+    batch holds or waits for at most batch_slots slots at once, so single
+    uploads are not starved behind it and the queue limit still holds.
+
+    With a `local` engine (AI_Model.inference.LocalExtractionEngine), a
+    remote failure or timeout is answered locally instead: the OCR text is
+    parsed if Vision already returned it, otherwise the image is read with
+    local OCR. The local engine runs on its own thread pool, so remote calls
+    that timed out cannot delay it, and gives up after local_timeout.
+    """
+
+    def __init__(self, ocr: Callable[[bytes], str], categorize: Callable[[str], object],
+                 ocr_batch: Optional[Callable[[List[bytes]], list]] = None,
+                 categorize_batch: Optional[Callable[[List[str]], list]] = None,
+                 local=None,
+                 max_concurrency: int = 4, max_queue: int = 16, batch_slots: int = 2,
+                 ocr_timeout: float = 10.0, llm_timeout: float = 20.0, local_timeout: float = 10.0):
+        self._ocr = ocr
+        self._categorize = categorize
+        self._ocr_batch = ocr_batch or (lambda images: [ocr(image) for image in images])
+        self._categorize_batch = categorize_batch or (lambda texts: [categorize(text) for text in texts])
+        self._local = local
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.batch_slots = max(1, min(batch_slots, max_concurrency))
+        self.ocr_timeout = ocr_timeout
+        self.llm_timeout = llm_timeout
+        self.local_timeout = local_timeout
+
+        self._executor = None
+        self._local_executor = None
+        self._slots = None
+        self._slots_loop = None
+        self.waiting = 0
+        self.active = 0
+        self.stuck = 0  # Timed-out calls still holding a slot
+        self.shed = 0
+        self.timeouts = {"ocr": 0, "llm": 0, "local": 0}
+        self.fallbacks = 0
+
+        self.queue_latency = LatencyHistogram()
+        self.ocr_latency = LatencyHistogram()
+        self.llm_latency = LatencyHistogram()
+        self.local_latency = LatencyHistogram()
+        self.total_latency = LatencyHistogram()
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        # One semaphore per event loop (test clients start a new loop each time)
+        loop = asyncio.get_running_loop()
+        if self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._slots_loop = loop
+        return self._slots
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="extraction")
+        return self._executor
+
+    def _get_local_executor(self) -> ThreadPoolExecutor:
+        if self._local_executor is None:
+            self._local_executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="extraction-local")
+        return self._local_executor
+
+    async def _run_stage(self, stage: str, histogram: LatencyHistogram, timeout: float, func, arg, slot: _Slot):
+        start = time.perf_counter()
+        future = self._get_executor().submit(func, arg)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            # The worker thread finishes in the background (its result is discarded) and holds the slot until then
+            slot.pending = future
+            self.timeouts[stage] += 1
+            raise HTTPException(status_code=504, detail=f"Image extraction timed out ({stage})")
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    def _admit(self, count: int = 1):
+        # A batch is admitted for as many chunks as it may have waiting at once
+        if self.waiting + count > self.max_queue:
+            self.shed += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Image extraction is busy, please try again shortly",
+                headers={"Retry-After": "1"}
+            )
+
+    @asynccontextmanager
+    async def _slot(self):
+        slots = self._get_slots()
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.queue_latency.observe(time.perf_counter() - start)
+
+        self.active += 1
+        slot = _Slot()
+        try:
+            yield slot
+        finally:
+            self.active -= 1
+            self.total_latency.observe(time.perf_counter() - start)
+            if slot.pending is None:
+                slots.release()
+            else:
+                self.stuck += 1
+                loop = asyncio.get_running_loop()
+                slot.pending.add_done_callback(lambda _: self._release_later(loop, slots))
+
+    def _release_later(self, loop, slots: asyncio.Semaphore):
+        # Runs on the worker thread that finally returned
+        def release():
+            self.stuck -= 1
+            slots.release()
+        try:
+            loop.call_soon_threadsafe(release)
+        except RuntimeError:
+            self.stuck -= 1  # That event loop is closed, and its semaphore with it
+
+    async def _run_local(self, image_content: bytes, extracted_text: Optional[str] = None):
+        """The local engine's answer after a remote stage failed, or None if it cannot give one in local_timeout."""
+        if self._local is None:
+            return None
+        if extracted_text:
+            func, arg = self._local.parse, extracted_text  # Vision answered; only Gemini failed
+        else:
+            func, arg = self._extract_locally, image_content
+        loop = asyncio.get_running_loop()
+        with self.local_latency.time():
+            try:
+                result = await asyncio.wait_for(loop.run_in_executor(self._get_local_executor(), func, arg), self.local_timeout)
+            except asyncio.TimeoutError:
+                self.fallbacks += 1
+                self.timeouts["local"] += 1
+                return None
+        if result is _NO_LOCAL_OCR:
+            return None
+        self.fallbacks += 1
+        return result
+
+    def _extract_locally(self, image_content: bytes):
+        # On the local pool: the engine's first availability check looks for the
+        # tesseract binary, which starts a subprocess
+        if not self._local.available:
+            return _NO_LOCAL_OCR
+        return self._local.extract(image_content)
+
+    async def extract(self, image_content: bytes):
+        self._admit()
+        async with self._slot() as slot:
+            extracted_text = None
+            try:
+                extracted_text = await self._run_stage(
+                    "ocr", self.ocr_latency, self.ocr_timeout, self._ocr, image_content, slot
+                )
+                if not extracted_text:
+                    return dict(NO_TEXT_RESULT)
+                return await self._run_stage(
+                    "llm", self.llm_latency, self.llm_timeout, self._categorize, extracted_text, slot
+                )
+            except Exception:
+                result = await self._run_local(image_content, extracted_text)
+                if result is None:
+                    raise
+                return result
+
+    @staticmethod
+    def _outcome(extraction) -> dict:
+        if isinstance(extraction, dict):  # No text on the label
+            return {"result": dict.fromkeys(EXTRACTION_FIELDS)}
+        if extraction is None or len(extraction) != len(EXTRACTION_FIELDS):
+            return {"error": "Could not extract medication details from this label"}
+        return {"result": dict(zip(EXTRACTION_FIELDS, extraction))}
+
+    async def _extract_chunk(self, start: int, images: List[bytes]) -> List[Tuple[int, dict]]:
+        results, texts = {}, {}
+        async with self._slot() as slot:
+            try:
+                ocr_results = await self._run_stage(
+                    "ocr", self.ocr_latency, self.ocr_timeout, self._ocr_batch, images, slot
+                )
+                for index, text in enumerate(ocr_results, start=start):
+                    if isinstance(text, Exception):
+                        results[index] = {"error": str(text)}
+                    elif not text:
+                        results[index] = self._outcome(dict(NO_TEXT_RESULT))
+                    else:
+                        texts[index] = text
+
+                if texts:
+                    extractions = await self._run_stage(
+                        "llm", self.llm_latency, self.llm_timeout, self._categorize_batch, list(texts.values()), slot
+                    )
+                    for index, extraction in zip(texts, extractions):
+                        results[index] = self._outcome(extraction)
+            except Exception as e:
+                error = {"error": e.detail if isinstance(e, HTTPException) else f"Image extraction failed: {e}"}
+                # The whole chunk failed (timeout or client error); fall back for every image still without a result
+                for index in range(start, start + len(images)):
+                    if index in results:
+                        continue
+                    try:
+                        extraction = await self._run_local(images[index - start], texts.get(index))
+                    except Exception:
+                        extraction = None
+                    results[index] = error if extraction is None else self._outcome(extraction)
+        return sorted(results.items())
+
+    def extract_batch(self, images: List[bytes], chunk_size: int = 8) -> AsyncIterator[Tuple[int, dict]]:
+        """Yields (image index, {"result": {...}} or {"error": "..."}) as each chunk completes.
+
+        Raises the 503 immediately when the queue is full, so it surfaces
+        before a streaming response has started.
+        """
+        chunks = -(-len(images) // chunk_size)
+        self._admit(min(self.batch_slots, chunks))
+        return self._stream_batch(images, chunk_size)
+
+    async def _extract_chunk_shared(self, share: asyncio.Semaphore, start: int, images: List[bytes]):
+        async with share:
+            return await self._extract_chunk(start, images)
+
+    async def _stream_batch(self, images: List[bytes], chunk_size: int):
+        share = asyncio.Semaphore(self.batch_slots)
+        tasks = [
+            asyncio.create_task(self._extract_chunk_shared(share, start, images[start:start + chunk_size]))
+            for start in range(0, len(images), chunk_size)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for item in await next_done:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def shutdown(self):
+        for executor in (self._executor, self._local_executor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._local_executor = None
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "batch_slots": self.batch_slots,
+            "active": self.active,
+            "stuck": self.stuck,
+            "waiting": self.waiting,
+            "shed": self.shed,
+            "timeouts": dict(self.timeouts),
+            "fallbacks": self.fallbacks,
+            "queue": self.queue_latency.snapshot(),
+            "ocr": self.ocr_latency.snapshot(),
+            "llm": self.llm_latency.snapshot(),
+            "local": self.local_latency.snapshot(),
+            "total": self.total_latency.snapshot(),
+        }
+
+
+def _default_clients():
+    if EXTRACTION_STUB_CLIENTS:
+        from .stubs import StubExtractionClients
+        stub = StubExtractionClients()
+        return {
+            "ocr": stub.ocr, "categorize": stub.categorize,
+            "ocr_batch": stub.ocr_batch, "categorize_batch": stub.categorize_batch,
+        }
+    # Imported here so stub mode needs neither the service account file nor the Gemini key
+    from .vision import ocr_image_cached, ocr_images_cached
+    from .gemini import categorize_medicine_text_cached, categorize_medicine_texts_cached
+    from .inference import local_engine
+    return {
+        "ocr": ocr_image_cached, "categorize": categorize_medicine_text_cached,
+        "ocr_batch": ocr_images_cached, "categorize_batch": categorize_medicine_texts_cached,
+        "local": local_engine if LOCAL_OCR_FALLBACK else None,
+    }
+
+
+extraction_pipeline = ExtractionPipeline(
+    **_default_clients(),
+    max_concurrency=EXTRACTION_MAX_CONCURRENCY,
+    max_queue=EXTRACTION_MAX_QUEUE,
+    batch_slots=EXTRACTION_BATCH_SLOTS,
+    ocr_timeout=EXTRACTION_OCR_TIMEOUT_SECONDS,
+    llm_timeout=EXTRACTION_LLM_TIMEOUT_SECONDS,
+    local_timeout=EXTRACTION_LOCAL_TIMEOUT_SECONDS
+)
+
+def shutdown_extraction_pipeline():
+    extraction_pipeline.shutdown()
+
+def extraction_pipeline_stats() -> dict:
+    return extraction_pipeline.stats()
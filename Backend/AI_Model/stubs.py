@@ -0,0 +1,49 @@
+import time
+
+from .extraction import MedicineExtraction
+
+STUB_LABEL_TEXT = "ASPIRIN 81 MG\nTake 1 tablet by mouth once daily\nQty: 30 tablets"
+STUB_EXTRACTION = MedicineExtraction("Aspirin", "81 mg", "Take 1 tablet by mouth once daily", 30, 1.0)
+
+
+class StubExtractionClients:
+    """Offline stand-ins for Vision OCR and Gemini categorization.
+
+    Returns canned results after an optional delay per call (a batch
+    call costs one delay, like one remote round trip), so the
+    extraction pipeline's concurrency limits, timeouts and load shedding
+    can be exercised without credentials or network access.
+    """
+
+    def __init__(self, ocr_delay: float = 0.0, llm_delay: float = 0.0,
+                 text: str = STUB_LABEL_TEXT, extraction: MedicineExtraction = STUB_EXTRACTION):
+        self.ocr_delay = ocr_delay
+        self.llm_delay = llm_delay
+        self.text = text
+        self.extraction = extraction
+        self.ocr_calls = 0
+        self.llm_calls = 0
+
+    def ocr(self, image_content: bytes) -> str:
+        self.ocr_calls += 1
+        if self.ocr_delay:
+            time.sleep(self.ocr_delay)
+        return self.text
+
+    def categorize(self, extracted_text: str):
+        self.llm_calls += 1
+        if self.llm_delay:
+            time.sleep(self.llm_delay)
+        return self.extraction
+
+    def ocr_batch(self, image_contents: list) -> list:
+        self.ocr_calls += 1
+        if self.ocr_delay:
+            time.sleep(self.ocr_delay)
+        return [self.text for _ in image_contents]
+
+    def categorize_batch(self, extracted_texts: list) -> list:
+        self.llm_calls += 1
+        if self.llm_delay:
+            time.sleep(self.llm_delay)
+        return [self.extraction for _ in extracted_texts]
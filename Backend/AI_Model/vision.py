@@ -1,30 +1,86 @@
 import os
-from google.cloud import vision
-from .gemini import categorize_medicine_text
+import threading
+from typing import List
+from import_utils import LazyModule
+from .extraction_cache import ocr_cache, image_key
 
 # Config
 from Backend.config import SDK_KEY
 
-# Google Vision setup
-if not SDK_KEY or not os.path.exists(SDK_KEY):
-    raise FileNotFoundError(f"Google Cloud service account file not found: {SDK_KEY}")
+# The Vision SDK is imported on the first OCR call
+vision = LazyModule("google.cloud.vision")
 
-vision_client = vision.ImageAnnotatorClient.from_service_account_json(SDK_KEY)
+_vision_client = None
+_vision_client_lock = threading.Lock()
 
-def extract_text_from_image(image_content: bytes) -> dict:
-    """Extracts text using Google Vision and categorizes it using Gemini AI."""
+def get_vision_client():
+    """The Google Vision client, created on first use so the app can start without the service account file."""
+    global _vision_client
+    with _vision_client_lock:
+        if _vision_client is None:
+            if not SDK_KEY or not os.path.exists(SDK_KEY):
+                raise FileNotFoundError(f"Google Cloud service account file not found: {SDK_KEY}")
+            _vision_client = vision.ImageAnnotatorClient.from_service_account_json(SDK_KEY)
+    return _vision_client
+
+def ocr_image(image_content: bytes) -> str:
+    """Runs Vision text detection; returns the full text, or "" if the image has none."""
     image = vision.Image(content=image_content)
 
     # Perform OCR
-    response = vision_client.text_detection(image=image)
+    response = get_vision_client().text_detection(image=image)
 
     if response.error.message:
         raise Exception(f"Error from Vision API: {response.error.message}")
 
     texts = response.text_annotations
+    return texts[0].description if texts else ""
+
+# Most images Vision accepts in one batch_annotate_images request
+VISION_BATCH_MAX_IMAGES = 16
+
+def ocr_images(image_contents: List[bytes]) -> list:
+    """Runs text detection on many images with one Vision request per 16 images.
+
+    Returns one item per image, in order: the full text ("" if none), or
+    an Exception for an image Vision could not process.
+    """
+    results = []
+    for start in range(0, len(image_contents), VISION_BATCH_MAX_IMAGES):
+        requests = [
+            vision.AnnotateImageRequest(
+                image=vision.Image(content=content),
+                features=[vision.Feature(type_=vision.Feature.Type.TEXT_DETECTION)]
+            )
+            for content in image_contents[start:start + VISION_BATCH_MAX_IMAGES]
+        ]
+        response = get_vision_client().batch_annotate_images(requests=requests)
+
+        for item in response.responses:
+            if item.error.message:
+                results.append(Exception(f"Error from Vision API: {item.error.message}"))
+            else:
+                texts = item.text_annotations
+                results.append(texts[0].description if texts else "")
+    return results
 
-    if not texts:
-        return {"medicine_name": None, "dosage": None, "instructions": None}
+def ocr_images_cached(image_contents: List[bytes]) -> list:
+    """ocr_images, sending only the images not already in the OCR cache to Vision."""
+    keys = [image_key(content) for content in image_contents]
+    results = [ocr_cache.get(key) for key in keys]
+    missing = [index for index, text in enumerate(results) if text is None]
+    if missing:
+        for index, text in zip(missing, ocr_images([image_contents[index] for index in missing])):
+            results[index] = text
+            if not isinstance(text, Exception):
+                ocr_cache.set(keys[index], text)
+    return results
 
-    extracted_text = texts[0].description
-    return categorize_medicine_text(extracted_text)
+def ocr_image_cached(image_content: bytes) -> str:
+    """ocr_image, skipping Vision for image bytes it has already seen."""
+    key = image_key(image_content)
+    extracted_text = ocr_cache.get(key)
+    if extracted_text is None:
+        extracted_text = ocr_image(image_content)
+        ocr_cache.set(key, extracted_text)
+    return extracted_text
@@ -0,0 +1,82 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException
+
+# Auth
+from Users.routes import get_current_user
+
+# Models
+from .model import DoseEventBatch
+
+# Logging
+from Security.security_logging import log_security_event
+
+# Data access
+from SDK_Database.Adherence import (
+    record_dose_events, get_adherence_summary, get_adherence_day,
+    adherence_percentage, current_streak, empty_counts
+)
+
+# Centralized config values
+from Backend.config import DOSE_EVENT_BATCH_MAX
+
+router = APIRouter()
+
+async def get_taken_today(user_id: str) -> set:
+    """IDs of the medications with a dose taken (on time or late) today."""
+    day = await get_adherence_day(user_id, date.today().isoformat())
+    return {
+        med_id for med_id, counts in day.get("meds", {}).items()
+        if counts.get("taken", 0) + counts.get("late", 0) > 0
+    }
+
+# Record dose events; phones send their offline queue in one call
+@router.post("/doses/events")
+async def ingest_dose_events(batch: DoseEventBatch, current_user: dict = Depends(get_current_user)):
+    if not batch.events:
+        return {"accepted": 0, "duplicates": 0}
+    if len(batch.events) > DOSE_EVENT_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {DOSE_EVENT_BATCH_MAX} events per request")
+
+    events = []
+    for event in batch.events:
+        record = event.model_dump()
+        record["scheduled_date"] = event.scheduled_date.isoformat()
+        events.append(record)
+
+    accepted, duplicates, unknown_med_ids = await record_dose_events(current_user["id"], events)
+
+    log_security_event(
+        user=current_user["id"],
+        event_type="API_REQUEST",
+        action="RECORD_DOSE_EVENTS",
+        status="SUCCESS",
+        details=f"Recorded {accepted} dose events ({duplicates} duplicates ignored, "
+                f"{len(unknown_med_ids)} unknown medications)"
+    )
+    # Events for unknown (e.g. since deleted) medications are dropped, not retried, by the app
+    return {"accepted": accepted, "duplicates": duplicates, "unknown_med_ids": unknown_med_ids}
+
+# Adherence percentage and streak, read from the pre-aggregated summary
+@router.get("/adherence")
+async def get_adherence(current_user: dict = Depends(get_current_user)):
+    summary = await get_adherence_summary(current_user["id"])
+    totals = summary.get("totals", empty_counts())
+
+    log_security_event(
+        user=current_user["id"],
+        event_type="READ",
+        action="GET_ADHERENCE",
+        status="SUCCESS",
+        details="Fetched adherence summary"
+    )
+    return {
+        "totals": totals,
+        "percentage": adherence_percentage(totals),
+        "current_streak": current_streak(summary, date.today()),
+        "longest_streak": summary.get("longest_streak", 0),
+        "medications": {
+            med_id: {**counts, "percentage": adherence_percentage(counts)}
+            for med_id, counts in summary.get("meds", {}).items()
+        }
+    }
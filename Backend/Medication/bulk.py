@@ -0,0 +1,172 @@
+import csv
+import io
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import ValidationError
+
+# Auth
+from Users.routes import get_current_user
+
+# Models
+from .model import MedicationCreate
+from .schedule import invalidate_schedule
+
+# Logging
+from Security.security_logging import log_security_event
+
+# Data access and streaming
+from SDK_Database.Create import BulkWriteError, build_medication_record, add_medications_bulk
+from SDK_Database.read import stream_medication_tree
+from http_utils import ndjson_response
+
+# Centralized config values
+from Backend.config import BULK_IMPORT_MAX_ROWS
+
+router = APIRouter()
+
+ALL_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# CSV cells holding lists use ";" between items, e.g. "08:00;20:00"
+CSV_LIST_FIELDS = ("times", "days")
+
+
+def parse_rows(body: bytes, content_type: str) -> list:
+    """Raw rows from a JSON array or a CSV file with a header line."""
+    if content_type.startswith("text/csv"):
+        rows = list(csv.DictReader(io.StringIO(body.decode("utf-8-sig"))))
+        for row in rows:
+            for field in CSV_LIST_FIELDS:
+                if row.get(field) is not None:
+                    row[field] = [item.strip() for item in row[field].split(";") if item.strip()]
+        return rows
+
+    try:
+        rows = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or CSV")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array of medications")
+    return rows
+
+
+def validate_rows(rows: list):
+    """Splits rows into medication documents and per-row errors (rows are numbered from 1)."""
+    records, errors, seen = [], [], set()
+    for number, row in enumerate(rows, start=1):
+        try:
+            med = MedicationCreate.model_validate(row)
+        except ValidationError as e:
+            errors.append({"row": number, "errors": [
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            ]})
+            continue
+        if med.frequency < 1:
+            errors.append({"row": number, "errors": ["frequency: must be at least 1"]})
+            continue
+        if med.name.lower() in seen:
+            errors.append({"row": number, "errors": [f"name: duplicate of an earlier row ({med.name})"]})
+            continue
+        seen.add(med.name.lower())
+
+        if "Everyday" in med.days:
+            med.days = ALL_DAYS
+        records.append(build_medication_record(
+            med.name, med.dosage, med.frequency, med.instructions, med.pillcount, med.times, med.days,
+            med.pillShape, med.pillColorLeft, med.pillColorRight, med.pillColor, med.backgroundColor
+        ))
+    return records, errors
+
+
+def resolve_target_user(current_user: dict, user_id: Optional[str], action: str) -> str:
+    """The user whose medications are written: the caller, or a dependent they are caretaker for."""
+    if current_user["role"] == "dependent":
+        log_security_event(
+            user=current_user["id"],
+            event_type="AUTHZ",
+            action=action,
+            status="DENIED",
+            details="Dependent attempted to add medications"
+        )
+        raise HTTPException(status_code=403, detail="Dependents cannot add medications.")
+
+    if user_id is None or user_id == current_user["id"]:
+        return current_user["id"]
+
+    caretaker_for = [uid for uid, role in current_user["connected_users"].items() if role == "caretaker"]
+    if user_id not in caretaker_for:
+        log_security_event(
+            user=current_user["id"],
+            event_type="AUTHZ",
+            action=action,
+            status="DENIED",
+            details=f"Unauthorized attempt to add medications for user {user_id}"
+        )
+        raise HTTPException(status_code=403, detail="You are not a caretaker for this user.")
+    return user_id
+
+
+# Import many medications at once (JSON array or CSV); invalid rows are reported, valid rows written
+@router.post("/medications/bulk")
+async def bulk_add_medications(
+    request: Request,
+    user_id: Optional[str] = None,  # Optional user_id for caretakers adding for dependents
+    current_user: dict = Depends(get_current_user)
+):
+    target_user_id = resolve_target_user(current_user, user_id, "BULK_ADD_MEDICATION_ATTEMPT")
+
+    rows = parse_rows(await request.body(), request.headers.get("content-type", "application/json"))
+    if len(rows) > BULK_IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_IMPORT_MAX_ROWS} medications per import")
+
+    records, errors = validate_rows(rows)
+    try:
+        created = await add_medications_bulk(target_user_id, records) if records else 0
+    except BulkWriteError as e:
+        # The earlier batches are committed; the client can resend the rest (or everything)
+        invalidate_schedule(target_user_id)
+        log_security_event(
+            user=current_user["id"],
+            event_type="API_REQUEST",
+            action="BULK_ADD_MEDICATION",
+            status="FAILURE",
+            details=f"Imported {len(e.written)} of {len(records)} medications for user {target_user_id} before a write failed"
+        )
+        raise HTTPException(status_code=503, detail={
+            "message": "Import stopped at a failed write; resending the import is safe",
+            "created": len(e.written),
+            "written": e.written,
+            "not_written": e.not_written,
+            "errors": errors
+        }, headers={"Retry-After": "1"})
+    invalidate_schedule(target_user_id)
+
+    log_security_event(
+        user=current_user["id"],
+        event_type="API_REQUEST",
+        action="BULK_ADD_MEDICATION",
+        status="SUCCESS" if not errors else "PARTIAL",
+        details=f"Imported {created} medications for user {target_user_id} ({len(errors)} rows rejected)"
+    )
+    return {"created": created, "errors": errors}
+
+
+# Export the current user's medications and their reminders, one JSON document per line
+@router.get("/medications/export")
+async def export_medications(current_user: dict = Depends(get_current_user)):
+    log_security_event(
+        user=current_user["id"],
+        event_type="READ",
+        action="EXPORT_MEDICATIONS",
+        status="SUCCESS",
+        details="Exported medication and reminder data"
+    )
+
+    async def lines():
+        async for med_id, med, reminders in stream_medication_tree(current_user["id"]):
+            yield {"type": "medication", "id": med_id, **med}
+            for reminder_id, reminder in reminders:
+                yield {"type": "reminder", "id": reminder_id, "medication_id": med_id, **reminder}
+
+    return ndjson_response(lines())
@@ -1,8 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Dict
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, Literal
 
+# Centralized config values
+from Backend.config import DOSE_EVENT_ID_MAX_LENGTH, MEDICATION_ID_MAX_LENGTH
+
 class MedicationCreate(BaseModel):
     name: str
     dosage: str
@@ -42,4 +45,22 @@ class MedicationInfo(BaseModel):
     dosage: str
     instructions: str
     startDate: datetime
-    endDate: datetime
\ No newline at end of file
+    endDate: datetime
+
+# Values used as Firestore document IDs: no "/", not "." or "..", not __reserved__
+DOCUMENT_ID_PATTERN = r"^(?!\.\.?$)(?!__.*__$)[^/]+$"
+
+class DoseEvent(BaseModel):
+    model_config = ConfigDict(regex_engine="python-re")  # DOCUMENT_ID_PATTERN needs lookaheads
+
+    # Generated on the device, so resent batches are not double-counted
+    event_id: str = Field(min_length=1, max_length=DOSE_EVENT_ID_MAX_LENGTH, pattern=DOCUMENT_ID_PATTERN)
+    med_id: str = Field(min_length=1, max_length=MEDICATION_ID_MAX_LENGTH, pattern=DOCUMENT_ID_PATTERN)
+    status: Literal["taken", "skipped", "late"]
+    scheduled_date: date  # Day of the dose in the user's calendar
+    scheduled_time: Optional[str] = None  # e.g., "08:00"
+    timestamp: datetime  # When the dose was taken or skipped
+
+
+class DoseEventBatch(BaseModel):
+    events: List[DoseEvent]
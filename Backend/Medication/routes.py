@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from datetime import date
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from typing import List, Literal, Optional
 
 # Auth & Permissions
 from Users.routes import get_current_user, check_permissions
@@ -7,37 +8,56 @@ from Users.models import users_db
 
 # Medication models
 from .model import Medication, MedicationCreate, MedicationInfo
+from .views import MedicationView, MEDICATION_LIST_VIEW, MEDICATION_PAGE_VIEW
+from .schedule import invalidate_schedule
+from .adherence import get_taken_today
 
 # Logging
 from Security.security_logging import log_security_event
 
 # External services and SDKs
-from google.cloud import firestore
 from SDK_Database.Create import add_medication
-from SDK_Database.firebase_config import db
+from SDK_Database.Delete_Med import delete_medication as delete_medication_record
+from SDK_Database.read import (
+    stream_user_medications, page_collection, iterate_collection, stream_medications_for_users
+)
+from SDK_Database.versions import read_meds_version
+from SDK_Database.listener_cache import medication_listeners
+from Reminders.scheduler import reminder_scheduler
+
+# Pagination and streaming
+from Backend.config import PAGE_SIZE_MAX, DEPENDENT_FANOUT_CONCURRENCY, REMINDER_SCHEDULER_ENABLED
+from http_utils import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor, page_size, ndjson_response
+from http_utils import etag_for, etag_matches, etag_headers, not_modified
 
 
 router = APIRouter()
 
-# Get all medications for the current user (or all if admin)
-@router.get("/medications/", response_model=List[dict])
-def get_medications(current_user: dict = Depends(get_current_user)):
-    medications = []
-
-    def transform_for_frontend(med: dict) -> dict:
-        return {
-            "name": med.get("name", ""),
-            "dosage": med.get("dosage", ""),
-            "times": med.get("times", []),
-            "days": med.get("days", []),
-            "taken": False,  # Set this based on your logic later
-            "pillShape": med.get("pillShape", "circle"),
-            "pillColorLeft": med.get("pillColorLeft", "#FFFFFF"),
-            "pillColorRight": med.get("pillColorRight", "#FFFFFF"),
-            "pillColor": med.get("pillColor", "#FFFFFF"),
-            "backgroundColor": med.get("backgroundColor", "#D9D9D9")
-        }
+ALL_MEDICATIONS_PATH = "medications"
 
+async def list_medications(
+    current_user: dict,
+    view: MedicationView,
+    response: Response,
+    limit: Optional[int],
+    cursor: Optional[str],
+    format: str,
+    if_none_match: Optional[str] = None
+):
+    """Shared read path: projected, paginated or streamed, each document rendered through `view`.
+
+    The admin listing always pages (PAGE_SIZE_DEFAULT when no limit is
+    given); a user's own list is returned whole unless a limit or cursor
+    is passed. The next page's cursor is sent in the X-Next-Cursor header.
+    With format=ndjson the listing is streamed to the end instead.
+
+    A user's own listing carries a strong ETag built from their medication
+    version (bumped by every medication, reminder and dose write), the
+    view, the query and today's date. A matching If-None-Match gets a 304
+    after reading only that version.
+    """
+    etag = None
+    meds_changed_at = None
     # Admins see all meds
     if current_user["role"] == "admin":
         log_security_event(
@@ -47,90 +67,85 @@ def get_medications(current_user: dict = Depends(get_current_user)):
             status="SUCCESS",
             details="Admin fetched all medications"
         )
-        meds_ref = db.collection("medications")
-        meds = meds_ref.stream()
-        medications = [transform_for_frontend(med.to_dict()) for med in meds]
-        return medications
-
-    # Regular users see their own meds
-    log_security_event(
-        user=current_user["id"],
-        event_type="READ",
-        action="GET_MEDICATIONS",
-        status="SUCCESS",
-        details="User fetched their medication list"
-    )
-
-    meds_ref = db.collection(f"users/{current_user['id']}/medications")
-    meds = meds_ref.stream()
-
-    for med in meds:
-        med_dict = med.to_dict()
-        med_dict["id"] = med.id
-        med_dict["user_id"] = current_user["id"]
-        medications.append(transform_for_frontend(med_dict))
-
-    return medications
-
-@router.get("/medicationsmedpage/", response_model=List[dict])
-def get_medications(current_user: dict = Depends(get_current_user)):
-    medications = []
-
-    def transform_for_frontend(med: dict) -> dict:
-        return {
-            "name": med.get("name", ""),
-            "dosage": med.get("dosage", ""),
-            "quantity": med.get("pill_count", 0),
-            "timesPerDay": med.get("frequency", 0),
-            "times": med.get("times", []),
-            "days": med.get("days", []),
-            "startDate": med.get("start_date", ""),
-            "endDate": med.get("end_date", ""),
-            "taken": False,  # Set this based on your logic later
-            "pillShape": med.get("pillShape", "circle"),
-            "pillColorLeft": med.get("pillColorLeft", "#FFFFFF"),
-            "pillColorRight": med.get("pillColorRight", "#FFFFFF"),
-            "pillColor": med.get("pillColor", "#FFFFFF"),
-            "backgroundColor": med.get("backgroundColor", "#D9D9D9")
-        }
-
-    # Admins see all meds
-    if current_user["role"] == "admin":
+        path = ALL_MEDICATIONS_PATH
+        paginate = True
+        taken_today = set()
+    else:
+        # Regular users see their own meds
         log_security_event(
             user=current_user["id"],
             event_type="READ",
             action="GET_MEDICATIONS",
             status="SUCCESS",
-            details="Admin fetched all medications"
+            details="User fetched their medication list"
         )
-        meds_ref = db.collection("medications")
-        meds = meds_ref.stream()
-        medications = [transform_for_frontend(med.to_dict()) for med in meds]
-        return medications
-
-    # Regular users see their own meds
-    log_security_event(
-        user=current_user["id"],
-        event_type="READ",
-        action="GET_MEDICATIONS",
-        status="SUCCESS",
-        details="User fetched their medication list"
-    )
-
-    meds_ref = db.collection(f"users/{current_user['id']}/medications")
-    meds = meds_ref.stream()
+        path = f"users/{current_user['id']}/medications"
+        paginate = limit is not None or cursor is not None
+
+        # Read before the documents: a write in between only makes the ETag older than the body
+        version, meds_changed_at = await read_meds_version(current_user["id"])
+        etag = etag_for(current_user["id"], version, view.name, date.today().isoformat(), limit, cursor, format)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers.update(etag_headers(etag))
+
+        # One read of today's adherence counters, not one per medication
+        taken_today = await get_taken_today(current_user["id"])
+
+    def render(med_id, med):
+        out = view.render(med)
+        out["taken"] = med_id in taken_today
+        return out
+
+    start_after = decode_cursor(cursor)
+
+    if format == "ndjson":
+        docs = iterate_collection(path, start_after, view.source_fields, chunk_size=PAGE_SIZE_MAX)
+        streamed = ndjson_response(render(med_id, med) async for med_id, med in docs)
+        if etag is not None:
+            streamed.headers.update(etag_headers(etag))
+        return streamed
+
+    if not paginate:
+        # Recently active users are served from their snapshot listener's in-memory copy,
+        # once it has seen the last medication write (else it is older than the ETag)
+        cached = medication_listeners.get(current_user["id"], not_before=meds_changed_at)
+        if cached is not None:
+            return [render(med_id, med) for med_id, med in cached]
+        return [render(med_id, med) async for med_id, med in stream_user_medications(current_user["id"], view.source_fields)]
+
+    docs, next_start = await page_collection(path, page_size(limit), start_after, view.source_fields)
+    if next_start is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(next_start)
+    return [render(med_id, med) for med_id, med in docs]
 
-    for med in meds:
-        med_dict = med.to_dict()
-        med_dict["id"] = med.id
-        med_dict["user_id"] = current_user["id"]
-        medications.append(transform_for_frontend(med_dict))
+# Get all medications for the current user (or all if admin)
+@router.get("/medications/", response_model=List[dict])
+async def get_medications(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    return await list_medications(current_user, MEDICATION_LIST_VIEW, response, limit, cursor, format, if_none_match)
 
-    return medications
+# Same list with the extra fields shown on the medication page
+@router.get("/medicationsmedpage/", response_model=List[dict])
+async def get_medications_medpage(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    return await list_medications(current_user, MEDICATION_PAGE_VIEW, response, limit, cursor, format, if_none_match)
 
 # Add new medication for the current user
 @router.post("/medications/")
-def add_medication_route(
+async def add_medication_route(
     med: MedicationCreate, 
     current_user: dict = Depends(get_current_user),
     user_id: str = None  # Optional user_id for caretakers adding for dependents
@@ -176,12 +191,13 @@ def add_medication_route(
         med.days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
     
     # Add medication
-    add_medication(target_user_id, med.name, med.dosage, med.frequency, med.instructions, med.pillcount, med.times, med.days, med.pillShape, med.pillColorLeft, med.pillColorRight, med.pillColor, med.backgroundColor)  # Call add_medication from SDK_Database
+    await add_medication(target_user_id, med.name, med.dosage, med.frequency, med.instructions, med.pillcount, med.times, med.days, med.pillShape, med.pillColorLeft, med.pillColorRight, med.pillColor, med.backgroundColor)  # Call add_medication from SDK_Database
+    invalidate_schedule(target_user_id)
     return {"message": f"Medication {med.name} added for user {target_user_id}."}
 
 
 @router.delete("/medications/")
-def delete_medication(
+async def delete_medication(
     med_name: str, 
     current_user: dict = Depends(get_current_user), 
     user_id: str = None  # Optional user_id for caretakers deleting for dependents
@@ -220,16 +236,11 @@ def delete_medication(
                 detail="You are not a caretaker for this user."
             )
         target_user_id = user_id
-    print(target_user_id)
 
-    # Find the medication by name and user_id
-    med_to_delete = None
-    for med_id, med in medication_db.items():
-        if med.user_id == target_user_id and med.name.lower() == med_name.lower():
-            med_to_delete = med_id
-            break
+    # Medications are stored under their name; tombstones let /sync report the delete
+    deleted_reminders = await delete_medication_record(target_user_id, med_name)
 
-    if med_to_delete is None:
+    if deleted_reminders is None:
         log_security_event(
             user=current_user["id"],
             event_type="API_REQUEST",
@@ -239,8 +250,11 @@ def delete_medication(
         )
         raise HTTPException(status_code=404, detail="Medication not found.")
 
-    # Delete the medication
-    del medication_db[med_to_delete]
+    invalidate_schedule(target_user_id)
+    # Drop the deleted reminders from the due-index instead of waiting for the next refresh
+    if REMINDER_SCHEDULER_ENABLED:
+        for reminder_id in deleted_reminders:
+            reminder_scheduler.remove(f"users/{target_user_id}/medications/{med_name}/reminders/{reminder_id}")
     log_security_event(
         user=current_user["id"],
         event_type="API_REQUEST",
@@ -253,7 +267,10 @@ def delete_medication(
 
 # Get medications for the connected user (for Basic User and Caretaker User)
 @router.get("/connected_user_medications/", response_model=List[Medication])
-def get_connected_user_medications(current_user: dict = Depends(get_current_user)):
+async def get_connected_user_medications(
+    format: Literal["json", "ndjson"] = "json",
+    current_user: dict = Depends(get_current_user)
+):
     check_permissions(current_user, ["basic", "caretaker"], "GET_CONNECTED_USER_MEDICATIONS_ATTEMPT")
 
     connected_users = current_user["connected_users"]  # Dict {user_id: role}
@@ -268,9 +285,6 @@ def get_connected_user_medications(current_user: dict = Depends(get_current_user
     if not authorized_users:
         raise HTTPException(status_code=403, detail="No caretaker access to connected users")
 
-    connected_user_medications = [
-        med for med in db.values() if med.user_id in authorized_users
-    ]
     log_security_event(
         user=current_user["id"],
         event_type="READ",
@@ -278,4 +292,16 @@ def get_connected_user_medications(current_user: dict = Depends(get_current_user
         status="SUCCESS",
         details="Fetched medications for connected users"
     )
-    return connected_user_medications
+
+    # Every dependent is read concurrently; results arrive in completion order
+    async def connected_user_medications():
+        async for user_id, med_id, med in stream_medications_for_users(
+            authorized_users, concurrency=DEPENDENT_FANOUT_CONCURRENCY
+        ):
+            med["id"] = med_id
+            med["user_id"] = user_id
+            yield med
+
+    if format == "ndjson":
+        return ndjson_response(connected_user_medications())
+    return [med async for med in connected_user_medications()]
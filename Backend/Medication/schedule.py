@@ -0,0 +1,186 @@
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+# Auth
+from Users.routes import get_current_user
+
+# Logging
+from Security.security_logging import log_security_event
+
+# Data access and caching
+from SDK_Database.read import stream_user_medications
+from SDK_Database.versions import get_meds_version
+from cache_utils import TTLCache
+from .views import MedicationView
+
+# Centralized config values
+from Backend.config import (
+    SCHEDULE_CACHE_TTL_SECONDS, SCHEDULE_CACHE_MAX_ENTRIES,
+    SCHEDULE_HORIZON_DAYS, SCHEDULE_MAX_RANGE_DAYS
+)
+
+MINUTES_PER_DAY = 24 * 60
+
+WEEKDAYS = {name: index for index, name in enumerate(
+    ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+)}
+
+# What each dose carries back to the frontend; times/days/dates only drive the expansion
+SCHEDULE_VIEW = MedicationView(
+    "schedule",
+    (
+        ("name", "name", ""),
+        ("dosage", "dosage", ""),
+        ("pillShape", "pillShape", "circle"),
+        ("pillColorLeft", "pillColorLeft", "#FFFFFF"),
+        ("pillColorRight", "pillColorRight", "#FFFFFF"),
+        ("pillColor", "pillColor", "#FFFFFF"),
+        ("backgroundColor", "backgroundColor", "#D9D9D9"),
+    ),
+)
+SCHEDULE_SOURCE_FIELDS = SCHEDULE_VIEW.source_fields + ("times", "days", "start_date", "end_date")
+
+
+def parse_time(value: str) -> Optional[int]:
+    """Minutes after midnight for "08:00", "8:00" or "8:00 PM"; None if unparseable."""
+    text = str(value).strip().upper()
+    # Fast path for the stored "HH:MM" form
+    hours, sep, minutes = text.partition(":")
+    if sep and hours.isdigit() and minutes.isdigit() and len(minutes) == 2:
+        hour, minute = int(hours), int(minutes)
+        return hour * 60 + minute if hour < 24 and minute < 60 else None
+    for fmt in ("%H:%M", "%I:%M %p", "%I:%M%p"):
+        try:
+            parsed = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        return parsed.hour * 60 + parsed.minute
+    return None
+
+
+def parse_days(values) -> set:
+    """Weekday numbers (Monday=0) for names like "Monday", "mon" or "Everyday"."""
+    weekdays = set()
+    for value in values or []:
+        text = str(value).strip().lower()
+        if text in ("everyday", "daily"):
+            return set(range(7))
+        for name, index in WEEKDAYS.items():
+            if len(text) >= 3 and name.startswith(text):
+                weekdays.add(index)
+    return weekdays
+
+
+def parse_date(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+class DoseTimeline:
+    """Every scheduled dose of one user, sorted by time in two parallel arrays.
+
+    A dose is stored as (date ordinal * 1440 + minute of day) plus the index
+    of its medication, so a date range is answered by two binary searches
+    and a slice. Medications without an end date are expanded horizon_days
+    past their start (or past `today` when the start is unknown too).
+    """
+
+    def __init__(self, medications: List[dict], horizon_days: int = 366, today: Optional[date] = None):
+        today = today or date.today()
+        doses = []
+        self.medications = []
+
+        for med in medications:
+            minutes = sorted({m for m in map(parse_time, med.get("times") or []) if m is not None})
+            weekdays = parse_days(med.get("days"))
+            if not minutes or not weekdays:
+                continue
+
+            start = parse_date(med.get("start_date")) or today
+            end = parse_date(med.get("end_date")) or start + timedelta(days=horizon_days)
+            index = len(self.medications)
+            self.medications.append(SCHEDULE_VIEW.render(med))
+
+            for ordinal in range(start.toordinal(), end.toordinal() + 1):
+                if (ordinal - 1) % 7 in weekdays:  # date.fromordinal(1) is a Monday
+                    base = ordinal * MINUTES_PER_DAY
+                    doses.extend((base + minute, index) for minute in minutes)
+
+        doses.sort()
+        self.stamps = array("q", (stamp for stamp, _ in doses))
+        self.med_index = array("I", (index for _, index in doses))
+
+    def __len__(self) -> int:
+        return len(self.stamps)
+
+    def between(self, start: date, end: date) -> List[dict]:
+        """Doses from the start of `start` through the end of `end`, in time order."""
+        low = bisect_left(self.stamps, start.toordinal() * MINUTES_PER_DAY)
+        high = bisect_left(self.stamps, (end.toordinal() + 1) * MINUTES_PER_DAY)
+        doses = []
+        for position in range(low, high):
+            ordinal, minute = divmod(self.stamps[position], MINUTES_PER_DAY)
+            dose = {
+                "date": date.fromordinal(ordinal).isoformat(),
+                "time": f"{minute // 60:02d}:{minute % 60:02d}",
+            }
+            dose.update(self.medications[self.med_index[position]])
+            doses.append(dose)
+        return doses
+
+
+# Built timelines per user as (meds_version, timeline). The version is read on every
+# request, so a write made by any worker is seen at once; medication writes handled
+# here also call invalidate_schedule() to drop the entry early.
+schedule_cache = TTLCache(maxsize=SCHEDULE_CACHE_MAX_ENTRIES, ttl=SCHEDULE_CACHE_TTL_SECONDS)
+
+def invalidate_schedule(user_id: str):
+    schedule_cache.pop(user_id)
+
+async def get_dose_timeline(user_id: str) -> DoseTimeline:
+    version = await get_meds_version(user_id)
+    cached = schedule_cache.get(user_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    medications = [med async for _, med in stream_user_medications(user_id, SCHEDULE_SOURCE_FIELDS)]
+    timeline = DoseTimeline(medications, horizon_days=SCHEDULE_HORIZON_DAYS)
+    schedule_cache.set(user_id, (version, timeline))
+    return timeline
+
+
+router = APIRouter()
+
+# Doses for the current user between two dates (inclusive), in time order
+@router.get("/schedule")
+async def get_schedule(
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    current_user: dict = Depends(get_current_user)
+):
+    from_date = from_date or date.today()
+    to_date = to_date or from_date
+    if to_date < from_date:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (to_date - from_date).days >= SCHEDULE_MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {SCHEDULE_MAX_RANGE_DAYS} days")
+
+    timeline = await get_dose_timeline(current_user["id"])
+
+    log_security_event(
+        user=current_user["id"],
+        event_type="READ",
+        action="GET_SCHEDULE",
+        status="SUCCESS",
+        details=f"Fetched dose schedule from {from_date} to {to_date}"
+    )
+    return timeline.between(from_date, to_date)
@@ -0,0 +1,141 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+
+# Auth
+from Users.routes import get_current_user
+
+# Views
+from .views import MEDICATION_LIST_VIEW
+from .adherence import get_taken_today
+
+# Logging
+from Security.security_logging import log_security_event
+
+# Data access
+from SDK_Database.read import stream_changed_medications, stream_changed_reminders, stream_tombstones
+from SDK_Database.versions import get_meds_version
+
+# Centralized config values
+from Backend.config import SYNC_TOMBSTONE_TTL_DAYS
+from http_utils import encode_cursor, decode_cursor
+
+router = APIRouter()
+
+REMINDER_FIELDS = ("med_id", "times", "days", "status")
+# Cursor keys: high-water marks of the medication, reminder and tombstone streams
+STREAMS = ("m", "r", "t")
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _latest(current: Optional[datetime], values) -> Optional[datetime]:
+    return max((value for value in (current, *values) if value is not None), default=None)
+
+
+def read_sync_cursor(cursor: Optional[str]) -> Optional[dict]:
+    """Decodes a /sync cursor; 400 if it is malformed, 410 once deletes it may have missed have expired."""
+    position = decode_cursor(cursor)
+    if position is None:
+        return None
+    try:
+        expired = _parse_time(position["at"]) < datetime.now(timezone.utc) - timedelta(days=SYNC_TOMBSTONE_TTL_DAYS)
+        position = {
+            "v": int(position["v"]),
+            "d": str(position["d"]),
+            **{stream: _parse_time(position[stream]) for stream in STREAMS},
+        }
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if expired:
+        raise HTTPException(status_code=410, detail="Sync cursor expired; sync again without a cursor.")
+    return position
+
+
+def write_sync_cursor(position: dict) -> str:
+    return encode_cursor({
+        "v": position["v"],
+        "d": position["d"],
+        **{stream: position[stream].isoformat() if position[stream] else None for stream in STREAMS},
+        "at": datetime.now(timezone.utc).isoformat(),
+    })
+
+
+# Changes to the caller's medications and reminders since a previous sync
+@router.get("/sync")
+async def sync(since: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    """Returns the medications and reminders created, updated or deleted since the `since` cursor.
+
+    Without a cursor every medication and reminder is returned. Clients
+    apply `deleted` before the upserts (a medication deleted and added
+    again appears in both) and keep `cursor` for the next call.
+    `taken_today` lists every medication taken today (null when nothing
+    changed since the cursor).
+
+    Each stream resumes after the latest server timestamp it returned.
+    The cursor also carries the user's medication version, so a sync with
+    nothing changed since costs one field read.
+    """
+    user_id = current_user["id"]
+    position = read_sync_cursor(since)
+
+    # Read before the changes: a write in between only makes the next sync re-read it
+    version = await get_meds_version(user_id)
+    today = date.today().isoformat()
+    if position is not None and position["v"] == version and position["d"] == today:
+        return {"medications": [], "reminders": [], "deleted": [], "taken_today": None, "cursor": write_sync_cursor(position)}
+
+    position = position or {"v": 0, "d": today, "m": None, "r": None, "t": None}
+
+    async def collect(stream):
+        return [item async for item in stream]
+
+    async def no_deletes():
+        # A full sync replaces the client's copy, so earlier deletes are not news
+        return []
+
+    meds, reminders, tombstones, taken_today = await asyncio.gather(
+        collect(stream_changed_medications(user_id, position["m"], MEDICATION_LIST_VIEW.source_fields)),
+        collect(stream_changed_reminders(user_id, position["r"])),
+        collect(stream_tombstones(user_id, position["t"])) if since else no_deletes(),
+        get_taken_today(user_id),
+    )
+
+    changed = {
+        "v": version,
+        "d": today,
+        "m": _latest(position["m"], (med.get("updated_at") for _, med in meds)),
+        "r": _latest(position["r"], (reminder.get("updated_at") for _, reminder in reminders)),
+        "t": _latest(position["t"], (tombstone.get("deleted_at") for tombstone in tombstones)),
+    }
+    if since is None:
+        # Anything deleted after the documents above were read is newer than all of them
+        changed["t"] = _latest(changed["t"], (changed["m"], changed["r"]))
+
+    log_security_event(
+        user=user_id,
+        event_type="READ",
+        action="SYNC_MEDICATIONS",
+        status="SUCCESS",
+        details=f"Synced {len(meds)} medications, {len(reminders)} reminders, {len(tombstones)} deletions"
+    )
+    return {
+        "medications": [
+            {"id": med_id, **MEDICATION_LIST_VIEW.render(med), "taken": med_id in taken_today}
+            for med_id, med in meds
+        ],
+        "reminders": [
+            {"id": reminder_id, **{field: reminder.get(field) for field in REMINDER_FIELDS}}
+            for reminder_id, reminder in reminders
+        ],
+        "deleted": [
+            {"kind": tombstone["kind"], "id": tombstone["id"], "med_id": tombstone.get("med_id")}
+            for tombstone in tombstones
+        ],
+        "taken_today": sorted(taken_today),
+        "cursor": write_sync_cursor(changed),
+    }
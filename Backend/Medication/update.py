@@ -1,13 +1,38 @@
 from fastapi import APIRouter, Depends, HTTPException
-from SDK_Database.Create import add_medication
+from import_utils import LazyModule
+from SDK_Database.Update_Med import update_medication
 from .routes import get_current_user
 from .model import MedicationCreate
+from .schedule import invalidate_schedule
+from Reminders.create import ALL_DAYS
 
 router = APIRouter()
 
+# Loads gRPC; only needed once an update fails
+api_exceptions = LazyModule("google.api_core.exceptions")
+
+def stored_fields(med: MedicationCreate) -> dict:
+    """The request's fields under their stored names (see build_medication_record)."""
+    return {
+        "dosage": med.dosage,
+        "frequency": med.frequency,
+        "instructions": med.instructions,
+        "pill_count": med.pillcount,
+        "times": med.times,
+        "days": list(ALL_DAYS) if "Everyday" in med.days else med.days,
+        "pillShape": med.pillShape,
+        "pillColorLeft": med.pillColorLeft,
+        "pillColorRight": med.pillColorRight,
+        "pillColor": med.pillColor,
+        "backgroundColor": med.backgroundColor,
+    }
+
 @router.put("/medications/{name}/")
-def update_medication_info(name: str, updated_medication: MedicationCreate, current_user: dict = Depends(get_current_user)):
-    # Pass the entire medication object to the update function
-    result = add_medication(current_user["id"], name, updated_medication)
+async def update_medication_info(name: str, updated_medication: MedicationCreate, current_user: dict = Depends(get_current_user)):
+    try:
+        result = await update_medication(current_user["id"], name, stored_fields(updated_medication))
+    except api_exceptions.NotFound:
+        raise HTTPException(status_code=404, detail="Medication not found.")
+    invalidate_schedule(current_user["id"])
     
     return result
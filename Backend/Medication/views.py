@@ -0,0 +1,68 @@
+from typing import Tuple
+
+# (response key, stored Firestore field, default when the field is missing)
+FieldSpec = Tuple[str, str, object]
+
+
+class MedicationView:
+    """A precomputed mapping from stored medication documents to one frontend shape.
+
+    `source_fields` is what the read path asks Firestore for (a select()
+    projection), so documents arrive carrying only what the view uses.
+    Constants are fields the frontend expects but that are not read from
+    the document.
+    """
+
+    def __init__(self, name: str, fields: Tuple[FieldSpec, ...], constants: dict = None):
+        self.name = name
+        self.source_fields = tuple(dict.fromkeys(source for _, source, _ in fields))
+        # List defaults are copied per document so responses never share them
+        self._fields = tuple((key, source, default, isinstance(default, list)) for key, source, default in fields)
+        self._constants = tuple((constants or {}).items())
+
+    def render(self, med: dict) -> dict:
+        get = med.get
+        out = {}
+        for key, source, default, copy_default in self._fields:
+            value = get(source, default)
+            out[key] = list(value) if copy_default and value is default else value
+        for key, value in self._constants:
+            out[key] = value
+        return out
+
+
+_PILL_APPEARANCE = (
+    ("pillShape", "pillShape", "circle"),
+    ("pillColorLeft", "pillColorLeft", "#FFFFFF"),
+    ("pillColorRight", "pillColorRight", "#FFFFFF"),
+    ("pillColor", "pillColor", "#FFFFFF"),
+    ("backgroundColor", "backgroundColor", "#D9D9D9"),
+)
+
+# Home screen list (/medications/)
+MEDICATION_LIST_VIEW = MedicationView(
+    "list",
+    (
+        ("name", "name", ""),
+        ("dosage", "dosage", ""),
+        ("times", "times", []),
+        ("days", "days", []),
+    ) + _PILL_APPEARANCE,
+    constants={"taken": False},  # Filled from today's dose events by list_medications
+)
+
+# Medication page (/medicationsmedpage/)
+MEDICATION_PAGE_VIEW = MedicationView(
+    "page",
+    (
+        ("name", "name", ""),
+        ("dosage", "dosage", ""),
+        ("quantity", "pill_count", 0),
+        ("timesPerDay", "frequency", 0),
+        ("times", "times", []),
+        ("days", "days", []),
+        ("startDate", "start_date", ""),
+        ("endDate", "end_date", ""),
+    ) + _PILL_APPEARANCE,
+    constants={"taken": False},  # Filled from today's dose events by list_medications
+)
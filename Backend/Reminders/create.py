@@ -1,26 +1,43 @@
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from typing import List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from SDK_Database.Create import add_reminder  # Import your function
 from Users.routes import get_current_user  # Assuming you have authentication
+from .scheduler import reminder_scheduler
+from Backend.config import REMINDER_SCHEDULER_ENABLED
 
 router = APIRouter()
 
 ALL_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
 @router.post("/users/{user_id}/medications/{med_id}/reminders/")
-def create_reminder(
+async def create_reminder(
     user_id: str,
     med_id: str,
     times: List[str],
     days: List[str],
+    timezone: Optional[str] = None,  # The user's IANA timezone, e.g. "Europe/Berlin"
     current_user: dict = Depends(get_current_user)
 ):
     # Ensure user is authorized to add reminders
     if current_user["id"] != user_id and current_user["role"] not in ["admin", "caretaker"]:
         raise HTTPException(status_code=403, detail="Not authorized to add reminders for this user.")
+
+    if timezone is not None:
+        try:
+            ZoneInfo(timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise HTTPException(status_code=400, detail=f"Unknown timezone '{timezone}'")
     
     if "Everyday" in days:
         days = ALL_DAYS  # Expand "Everyday" to all days of the week
     
-    add_reminder(user_id, med_id, times, days)
+    reminder_id = await add_reminder(user_id, med_id, times, days, timezone)
+
+    # Make the new reminder due right away instead of at the next index refresh
+    if REMINDER_SCHEDULER_ENABLED:
+        reminder_scheduler.upsert(
+            f"users/{user_id}/medications/{med_id}/reminders/{reminder_id}",
+            {"user_id": user_id, "med_id": med_id, "times": times, "days": days, "timezone": timezone, "status": "active"}
+        )
     return {"message": f"Reminder set for medication {med_id} on {days} at {times}."}
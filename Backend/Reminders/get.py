@@ -1,22 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from Users.routes import get_current_user
 from SDK_Database.read import get_reminder  # Import Firestore query function
+from SDK_Database.versions import get_meds_version
+from http_utils import etag_for, etag_matches, etag_headers, not_modified
 
 router = APIRouter()
 
 @router.get("/users/{user_id}/medications/{med_id}/reminders/")
-def get_medication_reminder(
+async def get_medication_reminder(
     user_id: str,
     med_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user)
 ):
     # Ensure user is authorized to view reminders
-    if current_user["user_id"] != user_id and current_user["role"] not in ["admin", "caretaker"]:
+    if current_user["id"] != user_id and current_user["role"] not in ["admin", "caretaker"]:
         raise HTTPException(status_code=403, detail="Not authorized to view this reminder.")
+
+    # Reminder writes bump the owner's medication version; an unchanged version means an unchanged reminder
+    etag = etag_for(user_id, await get_meds_version(user_id), "reminder", med_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     
-    reminder = get_reminder(user_id, med_id)
+    reminder = await get_reminder(user_id, med_id)
     
     if not reminder:
         raise HTTPException(status_code=404, detail="No reminder found for this medication.")
     
+    response.headers.update(etag_headers(etag))
     return reminder
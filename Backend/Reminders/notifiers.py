@@ -0,0 +1,32 @@
+import logging
+from datetime import datetime
+from typing import List, Tuple
+
+logger = logging.getLogger("reminders")
+
+
+class Notifier:
+    """Delivers a due reminder to the user (push, SMS, ...)."""
+
+    async def send(self, reminder: dict, due_at: datetime):
+        raise NotImplementedError
+
+
+class LogNotifier(Notifier):
+    """Default notifier: writes each due reminder to the application log."""
+
+    async def send(self, reminder: dict, due_at: datetime):
+        logger.info(
+            "Reminder due at %s for user %s: medication %s",
+            due_at.isoformat(timespec="minutes"), reminder.get("user_id"), reminder.get("med_id")
+        )
+
+
+class InMemoryNotifier(Notifier):
+    """Collects (reminder, due_at) pairs instead of delivering them; for tests and local runs."""
+
+    def __init__(self):
+        self.sent: List[Tuple[dict, datetime]] = []
+
+    async def send(self, reminder: dict, due_at: datetime):
+        self.sent.append((reminder, due_at))
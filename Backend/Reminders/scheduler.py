@@ -0,0 +1,294 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime, timezone, tzinfo
+from typing import Callable, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from Medication.schedule import MINUTES_PER_DAY, parse_days, parse_time
+from SDK_Database.read import stream_active_reminders
+from .notifiers import Notifier, LogNotifier
+
+# Centralized config values
+from Backend.config import (
+    REMINDER_SCHEDULER_ENABLED, REMINDER_REFRESH_SECONDS, REMINDER_TICK_SECONDS, DEFAULT_TIMEZONE
+)
+
+logger = logging.getLogger("reminders")
+
+UTC = timezone.utc
+
+
+def minute_stamp(moment: datetime) -> int:
+    """Minutes since 0001-01-01 of a datetime's wall clock (its own timezone is ignored); one bucket per minute."""
+    return moment.toordinal() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def stamp_to_datetime(stamp: int, tz: Optional[tzinfo] = None) -> datetime:
+    ordinal, minute = divmod(stamp, MINUTES_PER_DAY)
+    return datetime.fromordinal(ordinal).replace(hour=minute // 60, minute=minute % 60, tzinfo=tz)
+
+
+def utc_stamp(moment: datetime) -> int:
+    """Minute stamp of an aware datetime in UTC, the scheduler's own clock."""
+    if moment.tzinfo is None:
+        raise ValueError("The reminder scheduler needs timezone-aware datetimes")
+    return minute_stamp(moment.astimezone(UTC))
+
+
+def reminder_zone(name: Optional[str]) -> tzinfo:
+    """The timezone a reminder's times are in: its IANA "timezone", else DEFAULT_TIMEZONE."""
+    for candidate in (name, DEFAULT_TIMEZONE):
+        if candidate == "UTC":
+            return UTC
+        try:
+            return ZoneInfo(candidate)
+        except (ZoneInfoNotFoundError, ValueError, TypeError):
+            continue
+    return UTC
+
+
+def next_occurrence(minutes: Tuple[int, ...], weekday_mask: int, after: int) -> int:
+    """First minute stamp strictly after `after` at one of `minutes` on a weekday in the mask (bit 0 = Monday)."""
+    ordinal, minute = divmod(after, MINUTES_PER_DAY)
+    for offset in range(8):
+        day = ordinal + offset
+        if not weekday_mask >> ((day - 1) % 7) & 1:  # date.fromordinal(1) is a Monday
+            continue
+        for candidate in minutes:
+            if offset or candidate > minute:
+                return day * MINUTES_PER_DAY + candidate
+    raise ValueError("reminder has no times or days")
+
+
+def next_occurrence_in(schedule: Tuple[Tuple[int, ...], int], zone: tzinfo, after: int) -> int:
+    """First UTC minute stamp strictly after the UTC stamp `after` at which the schedule comes round in `zone`.
+
+    A time skipped by a DST change fires at the same offset after the
+    change (02:30 becomes 03:30); a repeated time fires on its first pass.
+    """
+    if zone is UTC:
+        return next_occurrence(*schedule, after)
+    local = minute_stamp(stamp_to_datetime(after, UTC).astimezone(zone))
+    while True:
+        local = next_occurrence(*schedule, local)
+        due = utc_stamp(stamp_to_datetime(local, zone))
+        if due > after:
+            return due
+
+
+class ReminderScheduler:
+    """In-process due-index of active reminders, ordered by their next minute bucket.
+
+    A min-heap holds (next due minute, key, version). Popping a due
+    reminder is O(log n) and it is pushed straight back at its next
+    occurrence. Updates and removals bump the key's version instead of
+    searching the heap; stale entries are skipped when they surface and
+    the heap is compacted once they outnumber the live ones.
+
+    Parsed schedules (times, weekday bitmask) are shared between reminders
+    with the same times and days, which keeps rebuilds of 100k+ reminders
+    fast and small. Rebuilds run off the event loop into new structures;
+    upserts and removals made meanwhile are replayed after the swap.
+
+    The heap is ordered by UTC minute; each reminder's times and days are
+    read in its own timezone (see reminder_zone), so a reminder at 08:00
+    fires at 08:00 where its user is, across DST changes. Datetimes passed
+    in must be timezone-aware; notifiers get due times in the reminder's zone.
+    """
+
+    MAX_SHARED_SCHEDULES = 100_000
+
+    def __init__(self, notifier: Notifier, clock: Callable[[], datetime] = lambda: datetime.now(UTC)):
+        self.notifier = notifier
+        self._clock = clock
+        self._heap = []
+        self._entries = {}  # key -> (version, reminder, (minutes, weekday_mask), zone)
+        self._schedules = {}  # (times, days) -> (minutes, weekday_mask) or None
+        # Shared with rebuilds on a worker thread, so versions never repeat for a key
+        self._versions = itertools.count(1)
+        self._pending = None  # key -> reminder (None = removed) while a rebuild runs
+        self._dispatched_through = None  # Last UTC minute stamp handed to pop_due
+        self.dispatched = 0
+        self.failed = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _schedule(self, times, days):
+        cache_key = (tuple(times or ()), tuple(days or ()))
+        schedule = self._schedules.get(cache_key, False)
+        if schedule is False:
+            minutes = tuple(sorted({m for m in map(parse_time, cache_key[0]) if m is not None}))
+            weekday_mask = sum(1 << day for day in parse_days(cache_key[1]))
+            schedule = (minutes, weekday_mask) if minutes and weekday_mask else None
+            if len(self._schedules) >= self.MAX_SHARED_SCHEDULES:
+                self._schedules.clear()
+            self._schedules[cache_key] = schedule
+        return schedule
+
+    def _compile(self, key: str, reminder: dict):
+        if reminder.get("status", "active") != "active":
+            return None
+        schedule = self._schedule(reminder.get("times"), reminder.get("days"))
+        if schedule is None:
+            return None
+        return (next(self._versions), reminder, schedule, reminder_zone(reminder.get("timezone")))
+
+    def _scheduled_after(self) -> int:
+        # The last dispatched minute, not now: an occurrence in a minute the
+        # dispatch loop has not reached yet is still due in its next pass
+        if self._dispatched_through is not None:
+            return self._dispatched_through
+        return utc_stamp(self._clock())
+
+    def upsert(self, key: str, reminder: dict, now: Optional[datetime] = None):
+        """Adds or replaces a reminder; inactive or unschedulable reminders are removed."""
+        if self._pending is not None:
+            self._pending[key] = reminder
+        entry = self._compile(key, reminder)
+        if entry is None:
+            self.remove(key)
+            return
+        self._entries[key] = entry
+        after = utc_stamp(now) if now is not None else self._scheduled_after()
+        heapq.heappush(self._heap, (next_occurrence_in(entry[2], entry[3], after), key, entry[0]))
+        if len(self._heap) > 2 * len(self._entries) + 1024:
+            self._compact()
+
+    def remove(self, key: str):
+        if self._pending is not None:
+            self._pending[key] = None
+        self._entries.pop(key, None)
+
+    def _build(self, reminders: Iterable[Tuple[str, dict]], current: int):
+        entries = {}
+        heap = []
+        due_by_schedule = {}  # Reminders sharing a schedule and zone share their next occurrence
+        for key, reminder in reminders:
+            entry = self._compile(key, reminder)
+            if entry is not None:
+                entries[key] = entry
+                schedule_key = (entry[2], entry[3])
+                due = due_by_schedule.get(schedule_key)
+                if due is None:
+                    due = due_by_schedule[schedule_key] = next_occurrence_in(entry[2], entry[3], current)
+                heap.append((due, key, entry[0]))
+        heapq.heapify(heap)
+        return entries, heap
+
+    def load(self, reminders: Iterable[Tuple[str, dict]], now: Optional[datetime] = None):
+        """Replaces the whole index, e.g. from a fresh Firestore snapshot, in O(n)."""
+        self._entries, self._heap = self._build(reminders, utc_stamp(now or self._clock()))
+
+    async def reload(self, loader: Callable):
+        """Replaces the index from `loader` without blocking the event loop or losing concurrent updates."""
+        self._pending = {}
+        try:
+            reminders = [item async for item in loader()]
+            # Scheduled after the last dispatched minute, not after now: a minute that
+            # comes due while this runs is still dispatched by the next pass
+            after = self._scheduled_after()
+            # Built off the event loop (over a second per 100k reminders), then swapped in
+            entries, heap = await asyncio.to_thread(self._build, reminders, after)
+        finally:
+            pending, self._pending = self._pending, None
+        self._entries, self._heap = entries, heap
+        for key, reminder in pending.items():
+            if reminder is None:
+                self.remove(key)
+            else:
+                self.upsert(key, reminder)
+
+    def _compact(self):
+        entries = self._entries
+        self._heap = [item for item in self._heap if item[1] in entries and entries[item[1]][0] == item[2]]
+        heapq.heapify(self._heap)
+
+    def _drop_stale_head(self):
+        heap, entries = self._heap, self._entries
+        while heap:
+            _, key, version = heap[0]
+            entry = entries.get(key)
+            if entry is not None and entry[0] == version:
+                return
+            heapq.heappop(heap)
+
+    def next_due(self) -> Optional[datetime]:
+        self._drop_stale_head()
+        return stamp_to_datetime(self._heap[0][0], UTC) if self._heap else None
+
+    def pop_due(self, now: Optional[datetime] = None) -> List[Tuple[str, dict, datetime]]:
+        """Removes and returns every reminder due at or before `now`, rescheduling each one."""
+        current = utc_stamp(now or self._clock())
+        self._dispatched_through = current
+        heap, entries = self._heap, self._entries
+        due = []
+        while True:
+            self._drop_stale_head()
+            if not heap or heap[0][0] > current:
+                return due
+            stamp, key, version = heapq.heappop(heap)
+            _, reminder, schedule, zone = entries[key]
+            due.append((key, reminder, stamp_to_datetime(stamp, UTC).astimezone(zone)))
+            # Missed occurrences (e.g. while the process was down) fire once, not once per minute
+            heapq.heappush(heap, (next_occurrence_in(schedule, zone, max(stamp, current)), key, version))
+
+    async def dispatch_due(self, now: Optional[datetime] = None) -> int:
+        due = self.pop_due(now)
+        for key, reminder, due_at in due:
+            try:
+                await self.notifier.send(reminder, due_at)
+                self.dispatched += 1
+            except Exception as e:
+                self.failed += 1
+                logger.warning("Failed to send reminder %s: %s", key, e)
+        return len(due)
+
+    async def run(self, loader: Callable, refresh_seconds: float = 300, tick_seconds: float = 30):
+        """Dispatches reminders until cancelled, reloading the index from `loader` periodically."""
+        next_refresh = 0.0
+        while True:
+            # Dispatch first: the reminders due this minute come from the index they were scheduled in
+            await self.dispatch_due()
+
+            if time.monotonic() >= next_refresh:
+                try:
+                    await self.reload(loader)
+                    logger.info("Reminder index loaded with %d active reminders", len(self))
+                except Exception as e:
+                    logger.warning("Failed to reload reminders: %s", e)
+                next_refresh = time.monotonic() + refresh_seconds
+
+            # Wake at the next due minute, but at least every tick to pick up new reminders
+            delay = tick_seconds
+            upcoming = self.next_due()
+            if upcoming is not None:
+                delay = min(delay, max(0.0, (upcoming - self._clock()).total_seconds()))
+            await asyncio.sleep(max(delay, 0.5))
+
+
+reminder_scheduler = ReminderScheduler(LogNotifier())
+_scheduler_task = None
+
+def start_reminder_scheduler():
+    """Starts the dispatch loop when REMINDER_SCHEDULER_ENABLED is set; call from the running event loop."""
+    global _scheduler_task
+    if REMINDER_SCHEDULER_ENABLED and _scheduler_task is None:
+        _scheduler_task = asyncio.create_task(reminder_scheduler.run(
+            stream_active_reminders,
+            refresh_seconds=REMINDER_REFRESH_SECONDS,
+            tick_seconds=REMINDER_TICK_SECONDS
+        ))
+
+async def stop_reminder_scheduler():
+    global _scheduler_task
+    if _scheduler_task is not None:
+        _scheduler_task.cancel()
+        try:
+            await _scheduler_task
+        except asyncio.CancelledError:
+            pass
+        _scheduler_task = None
@@ -0,0 +1,184 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from .firebase_config import async_db, firestore
+from .versions import bump_meds_version
+
+# Dose events are immutable records in users/{id}/dose_events/{event_id}.
+# Counters live in two aggregate documents that every write updates in the
+# same transaction, so reads never scan the event history:
+#   users/{id}/adherence/summary        totals, per-medication counts, streak
+#   users/{id}/adherence_days/{date}    totals and per-medication counts for one day
+DOSE_STATUSES = ("taken", "skipped", "late")
+
+# Adherent-day ranges kept in the summary; older ones only live on in longest_streak
+STREAK_RANGES_KEPT = 400
+
+
+# === Pure aggregate logic ===
+def empty_counts() -> dict:
+    return {status: 0 for status in DOSE_STATUSES}
+
+def add_to_counts(doc: dict, med_id: str, status: str):
+    """Counts one event in an aggregate document's totals and per-medication counts."""
+    doc.setdefault("totals", empty_counts())[status] += 1
+    doc.setdefault("meds", {}).setdefault(med_id, empty_counts())[status] += 1
+
+def is_adherent_day(totals: dict) -> bool:
+    """A day counts toward the streak once a dose was taken and none were skipped."""
+    return totals.get("taken", 0) + totals.get("late", 0) > 0 and totals.get("skipped", 0) == 0
+
+def adherence_percentage(counts: dict) -> Optional[float]:
+    total = sum(counts.get(status, 0) for status in DOSE_STATUSES)
+    if total == 0:
+        return None
+    return round(100 * (counts.get("taken", 0) + counts.get("late", 0)) / total, 1)
+
+def _streak_ranges(summary: dict) -> list:
+    if "streak_ranges" in summary:
+        return [(date.fromisoformat(r["start"]), date.fromisoformat(r["end"])) for r in summary["streak_ranges"]]
+    if summary.get("streak_start"):
+        # Summaries written before the ranges were kept hold only the latest one
+        return [(date.fromisoformat(summary["streak_start"]), date.fromisoformat(summary["streak_end"]))]
+    return []
+
+def apply_day_to_streak(summary: dict, day: date, adherent: bool):
+    """Updates the streaks of consecutive adherent days after `day` changed.
+
+    Adherent days are kept as sorted, non-adjacent inclusive ranges of ISO
+    dates (streak_ranges, the latest STREAK_RANGES_KEPT of them). Days may
+    arrive out of order (queued offline events): an adherent day joins the
+    range next to it or bridges the two around it, and a non-adherent day
+    splits the range holding it. streak_start/streak_end mirror the latest
+    range and last_missed_day is the latest non-adherent day.
+    """
+    pieces = []
+    for start, end in _streak_ranges(summary):
+        if start <= day <= end:
+            if start < day:
+                pieces.append((start, day - timedelta(days=1)))
+            if day < end:
+                pieces.append((day + timedelta(days=1), end))
+        else:
+            pieces.append((start, end))
+    if adherent:
+        pieces.append((day, day))
+    elif not summary.get("last_missed_day") or day.isoformat() > summary["last_missed_day"]:
+        summary["last_missed_day"] = day.isoformat()
+
+    merged = []
+    for start, end in sorted(pieces):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    merged = merged[-STREAK_RANGES_KEPT:]
+
+    summary["streak_ranges"] = [{"start": start.isoformat(), "end": end.isoformat()} for start, end in merged]
+    latest = merged[-1] if merged else (None, None)
+    summary["streak_start"] = latest[0].isoformat() if latest[0] else None
+    summary["streak_end"] = latest[1].isoformat() if latest[1] else None
+    if merged:
+        longest = max((end - start).days + 1 for start, end in merged)
+        summary["longest_streak"] = max(summary.get("longest_streak", 0), longest)
+
+def current_streak(summary: dict, today: date) -> int:
+    """Length of the latest streak if it is still alive (ended today or yesterday, no miss since), else 0."""
+    if not summary.get("streak_end"):
+        return 0
+    end = date.fromisoformat(summary["streak_end"])
+    if end < today - timedelta(days=1) or summary.get("last_missed_day", "") > summary["streak_end"]:
+        return 0
+    return (end - date.fromisoformat(summary["streak_start"])).days + 1
+
+
+# === Firestore access ===
+def async_transactional(func):
+    """firestore.async_transactional, looked up on first use so importing this module does not load the SDK."""
+    return firestore.async_transactional(func)
+
+def _summary_ref(user_id):
+    return async_db.collection(f"users/{user_id}/adherence").document("summary")
+
+def _day_ref(user_id, day: str):
+    return async_db.collection(f"users/{user_id}/adherence_days").document(day)
+
+def _event_ref(user_id, event_id: str):
+    return async_db.collection(f"users/{user_id}/dose_events").document(event_id)
+
+def _medication_ref(user_id, med_id: str):
+    return async_db.collection(f"users/{user_id}/medications").document(med_id)
+
+async def record_dose_events(user_id, events):
+    """Appends dose events and updates the aggregates in one transaction.
+
+    `events` are dicts with event_id, med_id, status, scheduled_date (ISO
+    date) and timestamp. Event IDs are client-generated (and validated as
+    document IDs by the DoseEvent model), so a batch that is resent after a
+    dropped response is recorded once. Events for medications the user
+    does not have are not recorded. Returns (accepted, duplicates,
+    unknown_med_ids).
+    """
+    # Keep the first occurrence of every event ID in the batch
+    unique = list({event["event_id"]: event for event in reversed(events)}.values())[::-1]
+    days = sorted({event["scheduled_date"] for event in unique})
+    med_ids = sorted({event["med_id"] for event in unique})
+
+    @async_transactional
+    async def apply(transaction):
+        refs = [_summary_ref(user_id)] + [_day_ref(user_id, day) for day in days] \
+            + [_event_ref(user_id, event["event_id"]) for event in unique] \
+            + [_medication_ref(user_id, med_id) for med_id in med_ids]
+        snapshots = {snapshot.reference.path: snapshot async for snapshot in async_db.get_all(refs, transaction=transaction)}
+
+        def exists(ref):
+            snapshot = snapshots.get(ref.path)
+            return snapshot is not None and snapshot.exists
+
+        def current(ref):
+            return snapshots[ref.path].to_dict() if exists(ref) else None
+
+        # Aggregates are keyed by med_id, so only the user's own medications get counters
+        unknown = [med_id for med_id in med_ids if not exists(_medication_ref(user_id, med_id))]
+        new_events = [
+            event for event in unique
+            if event["med_id"] not in unknown and not exists(_event_ref(user_id, event["event_id"]))
+        ]
+        if not new_events:
+            return 0, unknown
+
+        summary = current(_summary_ref(user_id)) or {}
+        day_docs = {day: current(_day_ref(user_id, day)) or {"date": day} for day in days}
+
+        for event in new_events:
+            add_to_counts(summary, event["med_id"], event["status"])
+            add_to_counts(day_docs[event["scheduled_date"]], event["med_id"], event["status"])
+            transaction.create(_event_ref(user_id, event["event_id"]), {
+                **event,
+                "recorded_at": firestore.SERVER_TIMESTAMP
+            })
+
+        touched = sorted({event["scheduled_date"] for event in new_events})
+        for day in touched:
+            apply_day_to_streak(summary, date.fromisoformat(day), is_adherent_day(day_docs[day]["totals"]))
+            transaction.set(_day_ref(user_id, day), day_docs[day])
+
+        summary["updated_at"] = firestore.SERVER_TIMESTAMP
+        transaction.set(_summary_ref(user_id), summary)
+        # Medication listings show today's "taken" flags, so they change with the dose log
+        bump_meds_version(transaction, user_id)
+        return len(new_events), unknown
+
+    accepted, unknown = await apply(async_db.transaction())
+    rejected = sum(1 for event in events if event["med_id"] in unknown)
+    return accepted, len(events) - accepted - rejected, unknown
+
+async def get_adherence_summary(user_id) -> dict:
+    """The user's aggregate adherence document (empty if no events were recorded)."""
+    snapshot = await _summary_ref(user_id).get()
+    return snapshot.to_dict() if snapshot.exists else {}
+
+async def get_adherence_day(user_id, day: str) -> dict:
+    """Counters for one day (empty if no events were recorded that day)."""
+    snapshot = await _day_ref(user_id, day).get()
+    return snapshot.to_dict() if snapshot.exists else {}
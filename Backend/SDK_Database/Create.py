@@ -1,11 +1,12 @@
-from .firebase_config import db  # Import Firestore client
-from firebase_admin import firestore
+from .firebase_config import async_db, firestore  # Import async Firestore client
+from .user_cache import principal_cache
+from .versions import bump_meds_version
 from datetime import datetime, timedelta
 
-def create_user(user_id, username, password, role="basic"):
+async def create_user(user_id, username, password, role="basic"):
     """Creates a new user document with an empty connected_users dictionary."""
-    user_ref = db.collection("users").document(user_id)
-    user_ref.set({
+    user_ref = async_db.collection("users").document(user_id)
+    await user_ref.set({
         "user_id": user_id,  # Explicitly store user_id
         "username": username,
         "role": role,  # "basic", "dependent", "admin"
@@ -15,9 +16,9 @@ def create_user(user_id, username, password, role="basic"):
     })
     print(f"User {user_id} created.")
 
-def add_medication(user_id, name, dosage, frequency, instructions, pillCount, times, days, pillShape, pillColorLeft, pillColorRight, pillColor, backgroundColor):
-    """Adds a medication to a user's medications subcollection, calculating start and end dates."""
-    
+def build_medication_record(name, dosage, frequency, instructions, pillCount, times, days, pillShape, pillColorLeft, pillColorRight, pillColor, backgroundColor):
+    """Builds a medication document, calculating start and end dates from the pill count."""
+
     # Calculate the number of days needed to take the medication
     days_needed = pillCount // frequency
     
@@ -27,9 +28,7 @@ def add_medication(user_id, name, dosage, frequency, instructions, pillCount, ti
     # Calculate the end date by adding the days needed to the start date
     end_date = (datetime.today() + timedelta(days=days_needed - 1)).strftime('%Y-%m-%d')  # Subtract 1 because the start day counts
 
-    # Add the medication to Firestore
-    meds_ref = db.collection(f"users/{user_id}/medications").document(name)
-    meds_ref.set({
+    return {
         "name": name,
         "dosage": dosage,
         "frequency": frequency,
@@ -47,28 +46,87 @@ def add_medication(user_id, name, dosage, frequency, instructions, pillCount, ti
         "end_date": end_date,  # Add end date
         "created_at": firestore.SERVER_TIMESTAMP,
         "updated_at": firestore.SERVER_TIMESTAMP
-    })
+    }
+
+async def add_medication(user_id, name, dosage, frequency, instructions, pillCount, times, days, pillShape, pillColorLeft, pillColorRight, pillColor, backgroundColor):
+    """Adds a medication to a user's medications subcollection, calculating start and end dates."""
+    record = build_medication_record(name, dosage, frequency, instructions, pillCount, times, days, pillShape, pillColorLeft, pillColorRight, pillColor, backgroundColor)
+
+    # Add the medication to Firestore, bumping the user's medication version with it
+    meds_ref = async_db.collection(f"users/{user_id}/medications").document(name)
+    batch = async_db.batch()
+    batch.set(meds_ref, record)
+    bump_meds_version(batch, user_id, medications=True)
+    await batch.commit()
     
-    print(f"Medication {name} added for user {user_id} with start date {start_date} and end date {end_date}.")
+    print(f"Medication {name} added for user {user_id} with start date {record['start_date']} and end date {record['end_date']}.")
+
+class BulkWriteError(Exception):
+    """A bulk write that stopped at a failed batch; the batches before it are committed."""
 
-def add_reminder(user_id, med_id, times, days):
-    """Adds a reminder for a medication with specified times and days."""
-    reminders_ref = db.collection(f"users/{user_id}/medications/{med_id}/reminders").document()
-    reminders_ref.set({
+    def __init__(self, written: list, not_written: list):
+        super().__init__(f"{len(written)} medications written, {len(not_written)} not written")
+        self.written = written
+        self.not_written = not_written
+
+
+async def add_medications_bulk(user_id, records, batch_size=500):
+    """Writes many medication documents (keyed by name) in WriteBatches of up to 500 (the Firestore limit).
+
+    Batches are committed one after another; each is atomic on its own and
+    also bumps the user's medication version (one of its writes). If a
+    commit fails, raises BulkWriteError with the names that were and were
+    not written; as documents are keyed by name, retrying the same records
+    overwrites rather than duplicates. Returns the number of documents written.
+    """
+    meds_ref = async_db.collection(f"users/{user_id}/medications")
+    per_batch = batch_size - 1
+    batches = 0
+    for start in range(0, len(records), per_batch):
+        chunk = records[start:start + per_batch]
+        batch = async_db.batch()
+        for record in chunk:
+            batch.set(meds_ref.document(record["name"]), record)
+        bump_meds_version(batch, user_id, medications=True)
+        try:
+            await batch.commit()
+        except Exception as e:
+            raise BulkWriteError(
+                [record["name"] for record in records[:start]],
+                [record["name"] for record in records[start:]]
+            ) from e
+        batches += 1
+    print(f"{len(records)} medications added for user {user_id} in {batches} batches.")
+    return len(records)
+
+async def add_reminder(user_id, med_id, times, days, timezone=None):
+    """Adds a reminder for a medication with specified times and days; returns the reminder's document ID.
+
+    `timezone` is the IANA name the times are in (the user's); without it the scheduler uses DEFAULT_TIMEZONE.
+    """
+    reminders_ref = async_db.collection(f"users/{user_id}/medications/{med_id}/reminders").document()
+    batch = async_db.batch()
+    batch.set(reminders_ref, {
         "user_id": user_id,
         "med_id": med_id,
         "times": times,  # List of times (e.g., ["08:00", "20:00"])
         "days": days,    # List of days (e.g., ["Monday", "Tuesday"])
+        "timezone": timezone,  # e.g. "America/New_York"
         "status": "active",  # Default status
-        "created_at": firestore.SERVER_TIMESTAMP
+        "created_at": firestore.SERVER_TIMESTAMP,
+        "updated_at": firestore.SERVER_TIMESTAMP
     })
+    bump_meds_version(batch, user_id)
+    await batch.commit()
     print(f"Reminder for medication {med_id} on days {days} at times {times} set.")
+    return reminders_ref.id
 
 
-def connect_users(user_id, connected_user_id, role):
+async def connect_users(user_id, connected_user_id, role):
     """Adds a connection between users by updating the connected_users dictionary."""
-    user_ref = db.collection("users").document(user_id)
-    user_ref.update({
+    user_ref = async_db.collection("users").document(user_id)
+    await user_ref.update({
         f"connected_users.{connected_user_id}": role  # Adds or updates the role
     })
+    principal_cache.invalidate_user(user_id)
     print(f"User {user_id} connected to {connected_user_id} as {role}.")
\ No newline at end of file
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta, timezone
+from .firebase_config import async_db, firestore
+from .read import get_medication_reminders
+from .versions import bump_meds_version
+from Backend.config import SYNC_TOMBSTONE_TTL_DAYS
+
+def tombstone_id(kind, doc_id, med_id=None):
+    """Tombstone document ID; a later delete of the same document overwrites it."""
+    return f"{kind}:{med_id}:{doc_id}" if med_id else f"{kind}:{doc_id}"
+
+async def delete_medication(user_id, med_id):
+    """Deletes a medication and its reminders, leaving a tombstone for each for delta sync.
+
+    Returns the reminder IDs deleted with it, or None if the user has no
+    such medication. All writes, and the user's medication version bump,
+    commit in one batch.
+    """
+    med_ref = async_db.collection(f"users/{user_id}/medications").document(med_id)
+    snapshot = await med_ref.get(field_paths=["name"])
+    if not snapshot.exists:
+        return None
+
+    # Firestore does not delete subcollections with their parent document
+    reminders = await get_medication_reminders(user_id, med_id)
+    tombstones = async_db.collection(f"users/{user_id}/tombstones")
+    expire_at = datetime.now(timezone.utc) + timedelta(days=SYNC_TOMBSTONE_TTL_DAYS)
+
+    def tombstone(kind, doc_id, parent=None):
+        return {
+            "kind": kind,
+            "id": doc_id,
+            "med_id": parent,
+            "deleted_at": firestore.SERVER_TIMESTAMP,
+            "expire_at": expire_at,  # Firestore TTL policy field
+        }
+
+    batch = async_db.batch()
+    for reminder_id, _ in reminders:
+        batch.delete(med_ref.collection("reminders").document(reminder_id))
+        batch.set(tombstones.document(tombstone_id("reminder", reminder_id, med_id)), tombstone("reminder", reminder_id, med_id))
+    batch.delete(med_ref)
+    batch.set(tombstones.document(tombstone_id("medication", med_id)), tombstone("medication", med_id))
+    bump_meds_version(batch, user_id, medications=True)
+    await batch.commit()
+
+    print(f"Medication {med_id} and {len(reminders)} reminders deleted for user {user_id}.")
+    return [reminder_id for reminder_id, _ in reminders]
@@ -1,19 +1,20 @@
-from .firebase_config import db
-from firebase_admin import firestore
+from .firebase_config import async_db, firestore
+from .versions import bump_meds_version
 
-def update_medication(user_id, name, updated_medication):
-    """Updates the medication information based on provided data."""
+# Stored medication fields a client may change (names as in build_medication_record);
+# the document ID is the medication name, so "name" is not among them
+UPDATABLE_FIELDS = (
+    "dosage", "frequency", "instructions", "pill_count", "times", "days",
+    "pillShape", "pillColorLeft", "pillColorRight", "pillColor", "backgroundColor",
+    "start_date", "end_date",
+)
+
+async def update_medication(user_id, name, updated_medication):
+    """Updates the medication's stored fields present in `updated_medication` (keyed by stored field name)."""
     
     # Prepare the update data
-    update_data = {}
-    if "dosage" in updated_medication:
-        update_data["dosage"] = updated_medication["dosage"]
-    if "frequency" in updated_medication:
-        update_data["frequency"] = updated_medication["frequency"]
-    if "instructions" in updated_medication:
-        update_data["instructions"] = updated_medication["instructions"]
-    if "pill_count" in updated_medication:
-        update_data["pill_count"] = updated_medication["pill_count"]
+    update_data = {field: updated_medication[field] for field in UPDATABLE_FIELDS if field in updated_medication}
+    # Older callers send the dates in the frontend's camelCase
     if "startDate" in updated_medication:
         update_data["start_date"] = updated_medication["startDate"]
     if "endDate" in updated_medication:
@@ -22,7 +23,10 @@ def update_medication(user_id, name, updated_medication):
     # Add the timestamp for any update
     update_data["updated_at"] = firestore.SERVER_TIMESTAMP
     
-    # Perform the update operation
-    db.collection(f"users/{user_id}/medications").document(name).update(update_data)
+    # Perform the update operation, bumping the user's medication version with it
+    batch = async_db.batch()
+    batch.update(async_db.collection(f"users/{user_id}/medications").document(name), update_data)
+    bump_meds_version(batch, user_id, medications=True)
+    await batch.commit()
     
     return {"message": f"Medication {name} updated successfully."}
@@ -1,30 +1,34 @@
-from .firebase_config import db  # Import Firestore client
-from firebase_admin import firestore
+from .firebase_config import async_db, firestore  # Import Firestore client
+from .user_cache import principal_cache
 
 
-def update_user_username(user_id: str, new_username: str):
+async def update_user_username(user_id: str, new_username: str):
     """Update a user's username."""
-    user_ref = db.collection("users").document(user_id)
-    user_ref.update({"username": new_username})
+    user_ref = async_db.collection("users").document(user_id)
+    await user_ref.update({"username": new_username})
+    principal_cache.invalidate_user(user_id)
     print(f"Updated name for {user_id}.")
 
 
-def update_user_password(user_id: str, new_password: str):
+async def update_user_password(user_id: str, new_password: str):
     """Update a user's password (already hashed)."""
-    user_ref = db.collection("users").document(user_id)
-    user_ref.update({"password": new_password})
+    user_ref = async_db.collection("users").document(user_id)
+    await user_ref.update({"password": new_password})
+    principal_cache.invalidate_user(user_id)
     print(f"Updated password for {user_id}.")
 
 
-def update_user_role(user_id: str, new_role: str):
+async def update_user_role(user_id: str, new_role: str):
     """Update a user's role."""
-    user_ref = db.collection("users").document(user_id)
-    user_ref.update({"role": new_role})
+    user_ref = async_db.collection("users").document(user_id)
+    await user_ref.update({"role": new_role})
+    principal_cache.invalidate_user(user_id)
     print(f"Updated role for {user_id} to {new_role}.")
 
 
-def update_connected_users(user_id: str, connected_users: dict):
+async def update_connected_users(user_id: str, connected_users: dict):
     """Update a user's connected users dictionary."""
-    user_ref = db.collection("users").document(user_id)
-    user_ref.update({"connected_users": connected_users})
+    user_ref = async_db.collection("users").document(user_id)
+    await user_ref.update({"connected_users": connected_users})
+    principal_cache.invalidate_user(user_id)
     print(f"Updated connected users for {user_id}.")
\ No newline at end of file
@@ -1,15 +1,52 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
+import threading
+
+from import_utils import LazyModule
 
 # Centralized configuration
 from Backend.config import SDK_KEY
 
-# Initialize Firebase using centralized SDK key path
-cred = credentials.Certificate(SDK_KEY)
+# The Firebase Admin SDK loads the Firestore and gRPC stacks; defer it to the first query
+firebase_admin = LazyModule("firebase_admin")
+credentials = LazyModule("firebase_admin.credentials")
+firestore = LazyModule("firebase_admin.firestore")
+firestore_async = LazyModule("firebase_admin.firestore_async")
+
+_app_lock = threading.Lock()
+
+def initialize_firebase():
+    """Initializes the Firebase app from the SDK key, once."""
+    with _app_lock:
+        # Only initialize the app if it hasn’t been done yet
+        if not firebase_admin._apps:
+            firebase_admin.initialize_app(credentials.Certificate(SDK_KEY))
+
+
+class LazyClient:
+    """Stands in for a Firestore client, creating it on first use.
+
+    Importing the data access modules then neither loads the SDK, reads
+    the service account file nor builds clients; the first query does.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    initialize_firebase()
+                    self._client = self._factory()
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
 
-# Only initialize the app if it hasn’t been done yet
-if not firebase_admin._apps:
-    firebase_admin.initialize_app(cred)
 
 # Firestore client
-db = firestore.client()
+db = LazyClient(lambda: firestore.client())
+
+# Non-blocking Firestore client used by the async data access functions
+async_db = LazyClient(lambda: firestore_async.client())
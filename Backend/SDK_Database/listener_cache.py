@@ -0,0 +1,226 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from .firebase_config import db
+
+# Centralized configuration
+from Backend.config import MEDICATION_LISTENER_CACHE, MEDICATION_LISTENER_MAX, MEDICATION_LISTENER_IDLE_SECONDS
+
+
+def subscribe_medications(user_id: str, callback: Callable):
+    """Starts an on_snapshot listener on users/{user_id}/medications (runs on a Firestore thread)."""
+    return db.collection(f"users/{user_id}/medications").on_snapshot(callback)
+
+
+class _Listener:
+    __slots__ = ("docs", "ready", "read_time", "watch", "last_used")
+
+    def __init__(self, now: float):
+        self.docs = {}
+        self.ready = False  # True once the first snapshot has arrived
+        self.read_time = None  # Firestore read time of the last applied snapshot
+        self.watch = None
+        self.last_used = now
+
+
+class SnapshotListenerCache:
+    """In-memory copies of recently active users' medications, kept current by on_snapshot listeners.
+
+    The first read for a user returns None (the caller queries Firestore as
+    before) and opens a listener; once its first snapshot has arrived,
+    reads are served from memory and every later change is applied as it
+    is pushed. At most `max_listeners` are open: the least recently read
+    user's listener is closed to make room, and listeners unread for
+    `idle_seconds` are closed by a sweep every `sweep_seconds`, so they
+    stop billing reads even when no requests arrive.
+
+    Writes are picked up from the pushed changes, not by closing the
+    listener. A push can lag a write made elsewhere, so readers pass the
+    commit time of the last write they know of as `not_before`; an older
+    copy is not served.
+
+    Listeners are opened and closed on one worker thread, since both can
+    block on the gRPC stream.
+    """
+
+    def __init__(self, subscribe: Callable, max_listeners: int, idle_seconds: float,
+                 enabled: bool = True, clock: Callable[[], float] = time.monotonic,
+                 sweep_seconds: Optional[float] = None):
+        if max_listeners <= 0:
+            raise ValueError("max_listeners must be positive")
+        self._subscribe = subscribe
+        self.max_listeners = max_listeners
+        self.idle_seconds = idle_seconds
+        self.sweep_seconds = sweep_seconds if sweep_seconds is not None else max(idle_seconds / 2, 1.0)
+        self.enabled = enabled
+        self._clock = clock
+        self._entries = OrderedDict()  # user_id -> _Listener, least recently read first
+        self._lock = threading.Lock()
+        self._executor = None
+        self._sweeper = None
+        self._stop_sweeping = threading.Event()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _submit(self, func, *args) -> Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshot-listeners")
+        return self._executor.submit(func, *args)
+
+    def _expire_idle(self, now: float, closing: list):
+        # Listeners unread for idle_seconds sit at the front; call with the lock held
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if now - oldest.last_used < self.idle_seconds:
+                break
+            closing.append(self._entries.popitem(last=False)[1])
+            self.evictions += 1
+
+    def get(self, user_id: str, not_before=None) -> Optional[List[Tuple[str, dict]]]:
+        """Returns [(doc_id, data)] from memory, or None when the caller should read Firestore.
+
+        not_before is a Firestore timestamp (e.g. the commit time of the
+        user's last medication write); a copy read before it is not served.
+        """
+        if not self.enabled:
+            return None
+
+        now = self._clock()
+        closing = []
+        with self._lock:
+            self._expire_idle(now, closing)
+
+            entry = self._entries.get(user_id)
+            serving = entry is not None and entry.ready and entry.watch is not None
+            if serving and not entry.watch.is_active:
+                # The stream ended (e.g. a permanent RPC error); pushes no longer arrive
+                closing.append(self._entries.pop(user_id))
+                entry = None
+            elif serving and not_before is not None:
+                # The push for a newer write has not arrived yet
+                serving = entry.read_time is not None and entry.read_time >= not_before
+
+            opening = None
+            if entry is None:
+                opening = self._entries[user_id] = _Listener(now)
+                while len(self._entries) > self.max_listeners:
+                    closing.append(self._entries.popitem(last=False)[1])
+                    self.evictions += 1
+                docs = None
+            else:
+                entry.last_used = now
+                self._entries.move_to_end(user_id)
+                # Changes replace whole documents, so a copy of the item list is a consistent read
+                docs = list(entry.docs.items()) if serving else None
+
+            if docs is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        for stale in closing:
+            self._submit(self._close, stale)
+        if opening is not None:
+            self._ensure_sweeper()
+            self._submit(self._open, user_id, opening)
+        return docs
+
+    def sweep(self) -> int:
+        """Closes listeners unread for idle_seconds; returns how many were closed."""
+        closing = []
+        with self._lock:
+            self._expire_idle(self._clock(), closing)
+        for stale in closing:
+            self._submit(self._close, stale)
+        return len(closing)
+
+    def _ensure_sweeper(self):
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            self._stop_sweeping.clear()
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="snapshot-listener-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def _sweep_loop(self):
+        while not self._stop_sweeping.wait(self.sweep_seconds):
+            self.sweep()
+
+    def invalidate(self, user_id: str):
+        """Closes a user's listener; the next read reopens it with a full snapshot."""
+        with self._lock:
+            entry = self._entries.pop(user_id, None)
+        if entry is not None:
+            self._submit(self._close, entry)
+
+    def _open(self, user_id: str, entry: _Listener):
+        def on_snapshot(snapshot, changes, read_time):
+            with self._lock:
+                for change in changes:
+                    if change.type.name == "REMOVED":
+                        entry.docs.pop(change.document.id, None)
+                    else:
+                        entry.docs[change.document.id] = change.document.to_dict()
+                entry.read_time = read_time
+                entry.ready = True
+
+        watch = self._subscribe(user_id, on_snapshot)
+        with self._lock:
+            entry.watch = watch
+            current = self._entries.get(user_id) is entry
+        if not current:
+            # Evicted or invalidated while the listener was starting
+            watch.unsubscribe()
+
+    @staticmethod
+    def _close(entry: _Listener):
+        if entry.watch is not None:
+            entry.watch.unsubscribe()
+
+    def clear(self):
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            self._submit(self._close, entry)
+
+    def shutdown(self):
+        """Closes every listener and stops the sweeper and worker threads."""
+        with self._lock:
+            sweeper, self._sweeper = self._sweeper, None
+        if sweeper is not None:
+            self._stop_sweeping.set()
+            sweeper.join()
+        self.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "listeners": len(self._entries),
+            "max_listeners": self.max_listeners,
+        }
+
+
+medication_listeners = SnapshotListenerCache(
+    subscribe_medications,
+    max_listeners=MEDICATION_LISTENER_MAX,
+    idle_seconds=MEDICATION_LISTENER_IDLE_SECONDS,
+    enabled=MEDICATION_LISTENER_CACHE,
+)
+
+def shutdown_medication_listeners():
+    medication_listeners.shutdown()
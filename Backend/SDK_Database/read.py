@@ -1,11 +1,161 @@
-from .firebase_config import db
+import asyncio
+from .firebase_config import async_db, firestore
 
-def get_reminder(user_id, med_id):
+# Listings are ordered by document ID so a page can resume after the last ID seen
+DOCUMENT_ID = "__name__"
+
+async def get_reminder(user_id, med_id):
     """Fetches the first reminder for a given medication."""
-    reminders_ref = db.collection(f"users/{user_id}/medications/{med_id}/reminders")
+    reminders_ref = async_db.collection(f"users/{user_id}/medications/{med_id}/reminders")
     docs = reminders_ref.limit(1).stream()  # Fetch the first document
-    
-    for doc in docs:
+
+    async for doc in docs:
         return doc.to_dict()  # Return the first (and only) reminder
-    
-    return None  # If no reminders exist
\ No newline at end of file
+
+    return None  # If no reminders exist
+
+async def get_user_by_username(username):
+    """Fetches a user document by username, or None if no such user exists."""
+    users = await async_db.collection("users").where("username", "==", username).limit(1).get()
+    return users[0].to_dict() if users else None
+
+async def get_last_user_id():
+    """Returns the highest user_id currently stored, or None if there are no users."""
+    users_ref = async_db.collection("users")
+    users = await users_ref.order_by("user_id", direction=firestore.Query.DESCENDING).limit(1).get()
+    return users[0].to_dict().get("user_id") if users else None
+
+async def stream_user_medications(user_id, fields=None):
+    """Yields (doc_id, data) for each medication in a user's medications subcollection.
+
+    With `fields`, only those fields are fetched (a select() projection).
+    """
+    query = async_db.collection(f"users/{user_id}/medications")
+    if fields:
+        query = query.select(list(fields))
+    async for med in query.stream():
+        yield med.id, med.to_dict()
+
+async def stream_all_medications(fields=None):
+    """Yields (doc_id, data) for every document in the top-level medications collection.
+
+    With `fields`, only those fields are fetched (a select() projection).
+    """
+    query = async_db.collection("medications")
+    if fields:
+        query = query.select(list(fields))
+    async for med in query.stream():
+        yield med.id, med.to_dict()
+
+async def page_collection(path, limit, start_after=None, fields=None):
+    """Returns up to `limit` (doc_id, data) pairs of a collection ordered by document ID.
+
+    Resumes after the document ID `start_after`. The second value is the
+    ID to resume from, or None once the collection is exhausted.
+    """
+    query = async_db.collection(path).order_by(DOCUMENT_ID)
+    if fields:
+        query = query.select(list(fields))
+    if start_after:
+        query = query.start_after({DOCUMENT_ID: str(start_after)})
+
+    docs = [(doc.id, doc.to_dict()) async for doc in query.limit(limit).stream()]
+    next_start = docs[-1][0] if len(docs) == limit else None
+    return docs, next_start
+
+async def iterate_collection(path, start_after=None, fields=None, chunk_size=500):
+    """Yields (doc_id, data) for a whole collection, one bounded page at a time.
+
+    Memory stays at one page however large the collection is, and no
+    single query runs long enough to hit Firestore's stream deadline.
+    """
+    while True:
+        docs, start_after = await page_collection(path, chunk_size, start_after, fields)
+        for doc in docs:
+            yield doc
+        if start_after is None:
+            return
+
+async def stream_medications_for_users(user_ids, fields=None, concurrency=16):
+    """Yields (user_id, doc_id, data) for the medications of several users.
+
+    Each user's subcollection is read concurrently, at most `concurrency`
+    at a time, and yielded as soon as that user's read completes, so total
+    latency follows the slowest user rather than the sum of them all.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(user_id):
+        async with semaphore:
+            return user_id, [med async for med in stream_user_medications(user_id, fields)]
+
+    tasks = [asyncio.create_task(fetch(user_id)) for user_id in user_ids]
+    try:
+        for completed in asyncio.as_completed(tasks):
+            user_id, meds = await completed
+            for med_id, med in meds:
+                yield user_id, med_id, med
+    finally:
+        # Stop outstanding reads if the consumer goes away early
+        for task in tasks:
+            task.cancel()
+
+async def stream_active_reminders():
+    """Yields (doc_path, data) for every active reminder of every user (collection-group query)."""
+    query = async_db.collection_group("reminders").where("status", "==", "active")
+    async for reminder in query.stream():
+        yield reminder.reference.path, reminder.to_dict()
+
+async def get_medication_reminders(user_id, med_id):
+    """Returns [(doc_id, data)] for every reminder of one medication."""
+    reminders_ref = async_db.collection(f"users/{user_id}/medications/{med_id}/reminders")
+    return [(doc.id, doc.to_dict()) async for doc in reminders_ref.stream()]
+
+async def stream_medication_tree(user_id, chunk_size=100):
+    """Yields (med_id, data, reminders) for each of a user's medications.
+
+    Medications are read a page at a time, and the reminders of every
+    medication on a page are fetched concurrently, so the round trips
+    grow with the number of pages rather than the number of medications.
+    """
+    start_after = None
+    while True:
+        meds, start_after = await page_collection(f"users/{user_id}/medications", chunk_size, start_after)
+        reminders = await asyncio.gather(*(get_medication_reminders(user_id, med_id) for med_id, _ in meds))
+        for (med_id, med), med_reminders in zip(meds, reminders):
+            yield med_id, med, med_reminders
+        if start_after is None:
+            return
+
+async def stream_changed_medications(user_id, since=None, fields=None):
+    """Yields (doc_id, data) for a user's medications updated after `since` (all of them when None).
+
+    With `fields`, only those fields (and updated_at) are fetched.
+    """
+    query = async_db.collection(f"users/{user_id}/medications")
+    if fields:
+        query = query.select([*fields, "updated_at"])
+    if since is not None:
+        query = query.where("updated_at", ">", since)
+    async for med in query.stream():
+        yield med.id, med.to_dict()
+
+async def stream_changed_reminders(user_id, since=None):
+    """Yields (doc_id, data) for a user's reminders updated after `since` (all of them when None).
+
+    A collection-group query; the filtered form needs the composite index
+    reminders (user_id ASC, updated_at ASC) with collection-group scope.
+    """
+    query = async_db.collection_group("reminders").where("user_id", "==", user_id)
+    if since is not None:
+        query = query.where("updated_at", ">", since)
+    async for reminder in query.stream():
+        yield reminder.id, reminder.to_dict()
+
+async def stream_tombstones(user_id, since=None):
+    """Yields the tombstones of a user's medications and reminders deleted after `since`."""
+    query = async_db.collection(f"users/{user_id}/tombstones")
+    if since is not None:
+        query = query.where("deleted_at", ">", since)
+    async for tombstone in query.stream():
+        yield tombstone.to_dict()
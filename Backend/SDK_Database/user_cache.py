@@ -0,0 +1,56 @@
+import threading
+from typing import Optional
+
+from cache_utils import TTLCache
+
+# Centralized configuration
+from Backend.config import PRINCIPAL_CACHE_MAX_ENTRIES, PRINCIPAL_CACHE_TTL_SECONDS
+
+
+class PrincipalCache:
+    """TTL cache of resolved user documents, keyed by username.
+
+    A secondary user_id -> username index lets the SDK write paths, which
+    only know the user_id, invalidate the cached principal.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._by_username = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._username_by_id = {}
+        self._lock = threading.Lock()
+
+    def get(self, username: str) -> Optional[dict]:
+        return self._by_username.get(username)
+
+    def set(self, username: str, user: dict):
+        user_id = user.get("user_id")
+        with self._lock:
+            if user_id is not None:
+                self._username_by_id[user_id] = username
+            # Keep the index bounded alongside the evicting cache
+            if len(self._username_by_id) > self._by_username.maxsize:
+                self._username_by_id = {
+                    uid: name for uid, name in self._username_by_id.items() if name in self._by_username
+                }
+        self._by_username.set(username, user)
+
+    def invalidate_user(self, user_id: str):
+        """Drops the cached principal for a user_id after a write to their document."""
+        with self._lock:
+            username = self._username_by_id.pop(user_id, None)
+        if username is not None:
+            self._by_username.pop(username)
+
+    def invalidate_username(self, username: str):
+        self._by_username.pop(username)
+
+    def clear(self):
+        with self._lock:
+            self._username_by_id.clear()
+        self._by_username.clear()
+
+    def stats(self) -> dict:
+        return self._by_username.stats()
+
+
+principal_cache = PrincipalCache(maxsize=PRINCIPAL_CACHE_MAX_ENTRIES, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
@@ -0,0 +1,34 @@
+from .firebase_config import async_db, firestore
+
+# Counter on users/{user_id}, bumped by every write to the user's medications,
+# reminders or dose log; medication and reminder reads derive their ETag from it
+MEDS_VERSION_FIELD = "meds_version"
+# Commit time of the last write to the medication documents themselves; a snapshot
+# listener read at or after it has seen that write (see listener_cache.py)
+MEDS_CHANGED_AT_FIELD = "meds_changed_at"
+
+def _user_ref(user_id):
+    return async_db.collection("users").document(user_id)
+
+def bump_meds_version(writer, user_id, medications=False):
+    """Adds the version increment to a WriteBatch or Transaction, so it commits with the write itself.
+
+    Pass medications=True when the write changes medication documents, to
+    also stamp meds_changed_at with the commit time.
+    """
+    update = {MEDS_VERSION_FIELD: firestore.Increment(1)}
+    if medications:
+        update[MEDS_CHANGED_AT_FIELD] = firestore.SERVER_TIMESTAMP
+    writer.set(_user_ref(user_id), update, merge=True)
+
+async def read_meds_version(user_id):
+    """Returns (version, meds_changed_at) from the user document; (0, None) before the first tracked write."""
+    snapshot = await _user_ref(user_id).get(field_paths=[MEDS_VERSION_FIELD, MEDS_CHANGED_AT_FIELD])
+    if not snapshot.exists:
+        return 0, None
+    data = snapshot.to_dict() or {}
+    return data.get(MEDS_VERSION_FIELD, 0), data.get(MEDS_CHANGED_AT_FIELD)
+
+async def get_meds_version(user_id) -> int:
+    """Reads only the version fields of the user document (0 before the first tracked write)."""
+    return (await read_meds_version(user_id))[0]
@@ -0,0 +1,17 @@
+import base64
+
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+# Centralized config values
+from Backend.config import ENCRYPTION_KEY
+
+def fernet_for(purpose: str, key: str = ENCRYPTION_KEY) -> Fernet:
+    """Fernet (AES-128-CBC + HMAC-SHA256) keyed by a subkey of ENCRYPTION_KEY.
+
+    ENCRYPTION_KEY is any secret string; HKDF derives a separate key per
+    `purpose`, so ciphertext written for one use cannot be read as another.
+    """
+    derived = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=purpose.encode()).derive(key.encode())
+    return Fernet(base64.urlsafe_b64encode(derived))
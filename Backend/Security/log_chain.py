@@ -0,0 +1,142 @@
+import hashlib
+import hmac
+import json
+import threading
+import uuid
+from typing import Iterable, Optional
+
+GENESIS_DIGEST = "0" * 64
+
+
+def canonical_events(events: list) -> bytes:
+    """Stable encoding of a batch; the same bytes are rebuilt by the verifier."""
+    return json.dumps(events, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str).encode()
+
+
+def batch_digest(chain_id: str, seq: int, prev_digest: str, events: list) -> str:
+    header = f"{chain_id}|{seq}|{prev_digest}|".encode()
+    return hashlib.sha256(header + canonical_events(events)).hexdigest()
+
+
+def sign_digest(key: str, digest: str) -> str:
+    return hmac.new(key.encode(), digest.encode(), hashlib.sha256).hexdigest()
+
+
+class LogChain:
+    """Seals batches of log events into a hash chain with one HMAC per batch.
+
+    Each record commits to the previous record's digest, so a deleted,
+    reordered or edited batch breaks every link after it. Every process
+    starts its own chain, identified by chain_id.
+    """
+
+    def __init__(self, key: str, chain_id: Optional[str] = None):
+        self.key = key
+        self.chain_id = chain_id or uuid.uuid4().hex
+        self.seq = 0
+        self.prev_digest = GENESIS_DIGEST
+        self._lock = threading.Lock()
+
+    def prepare(self, events: list) -> dict:
+        """Signs the next record without moving the chain forward; see commit()."""
+        with self._lock:
+            digest = batch_digest(self.chain_id, self.seq, self.prev_digest, events)
+            return {
+                "chain_id": self.chain_id,
+                "seq": self.seq,
+                "prev_digest": self.prev_digest,
+                "events": events,
+                "digest": digest,
+                "hmac": sign_digest(self.key, digest)
+            }
+
+    def commit(self, record: dict):
+        """Moves the chain past a prepared record once it has been written.
+
+        A record that was never written is not committed, so the next batch
+        takes its seq and the exported chain has no gap.
+        """
+        with self._lock:
+            if record["chain_id"] != self.chain_id or record["seq"] != self.seq:
+                raise ValueError(f"Record {record['seq']} is not the head of chain {self.chain_id}")
+            self.seq += 1
+            self.prev_digest = record["digest"]
+
+    def seal(self, events: list) -> dict:
+        record = self.prepare(events)
+        self.commit(record)
+        return record
+
+
+class VerificationResult:
+    def __init__(self):
+        self.batches = 0
+        self.events = 0
+        self.chains = 0
+        self.error_count = 0
+        self.errors = []  # The first max_errors messages
+
+    @property
+    def ok(self) -> bool:
+        return self.error_count == 0
+
+
+def verify_records(lines: Iterable[str], key: str, allow_partial: bool = False, max_errors: int = 100) -> VerificationResult:
+    """Checks an exported log one line at a time.
+
+    Lines are chain records as written by LogChain, optionally wrapped in a
+    Cloud Logging export envelope ({"jsonPayload": {...}}) or preceded by a
+    plain-text log prefix. Memory use is
+    one line plus (seq, digest) per chain, independent of the log size.
+    With allow_partial, a chain may start mid-way (e.g. a time-bounded export).
+    """
+    result = VerificationResult()
+    heads = {}  # chain_id -> (last seq, last digest)
+
+    def fail(line_number, message):
+        result.error_count += 1
+        if len(result.errors) < max_errors:
+            result.errors.append(f"line {line_number}: {message}")
+
+    for line_number, line in enumerate(lines, start=1):
+        # Fallback-logger lines carry a text prefix before the JSON record
+        start = line.find("{")
+        if start < 0:
+            continue
+        try:
+            record = json.loads(line[start:])
+        except ValueError:
+            fail(line_number, "not valid JSON")
+            continue
+        record = record.get("jsonPayload", record)
+        if "chain_id" not in record:
+            continue  # Not a chained security log batch
+
+        try:
+            chain_id, seq = record["chain_id"], int(record["seq"])
+            prev_digest, events = record["prev_digest"], record["events"]
+            digest, signature = record["digest"], record["hmac"]
+        except (KeyError, TypeError, ValueError):
+            fail(line_number, "malformed batch record")
+            continue
+
+        result.batches += 1
+        result.events += len(events)
+
+        if batch_digest(chain_id, seq, prev_digest, events) != digest:
+            fail(line_number, f"chain {chain_id} batch {seq}: contents do not match digest")
+        if not hmac.compare_digest(sign_digest(key, digest), signature):
+            fail(line_number, f"chain {chain_id} batch {seq}: bad HMAC signature")
+
+        head = heads.get(chain_id)
+        if head is None:
+            result.chains += 1
+            if not allow_partial and (seq != 0 or prev_digest != GENESIS_DIGEST):
+                fail(line_number, f"chain {chain_id} starts at batch {seq}; earlier batches are missing")
+        elif seq != head[0] + 1:
+            fail(line_number, f"chain {chain_id}: expected batch {head[0] + 1}, found {seq}")
+        elif prev_digest != head[1]:
+            fail(line_number, f"chain {chain_id} batch {seq}: does not link to the previous batch")
+        heads[chain_id] = (seq, digest)
+
+    return result
@@ -0,0 +1,273 @@
+import asyncio
+import collections
+import json
+import os
+import queue
+import threading
+import time
+from typing import Callable, List
+
+OVERFLOW_POLICIES = ("block", "drop", "spill")
+
+_STOP = object()
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class LogPipeline:
+    """Bounded in-memory queue drained in batches by a background thread.
+
+    Callers only pay for enqueue(). The flusher hands batches of up to
+    batch_size entries to `sink`, at least every flush_interval seconds.
+    When the queue is full, the overflow policy decides: hand the entry to
+    the flusher, which appends it to a spill file on disk and replays it
+    once it catches up ("spill"; at most spill_buffer entries wait for the
+    flusher, beyond that they are dropped), drop ("drop"), or wait briefly
+    then drop ("block"). Callers on an event loop never wait or touch the
+    disk: under "block" they spill instead.
+
+    A batch the sink rejects is retried up to `retries` times with
+    exponential backoff starting at retry_backoff seconds, then spilled, so
+    an outage delays entries instead of losing them. After drain(), the
+    flusher is gone: enqueue() appends the entry to the spill file itself
+    (a sink call could hang for the sink's own timeout), and the next
+    process replays it.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[List[dict]], None],
+        max_queue: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        overflow: str = "spill",
+        block_timeout: float = 0.5,
+        spill_path: str = "security_log_spill.ndjson",
+        retries: int = 3,
+        retry_backoff: float = 0.5,
+        spill_buffer: int = 10000,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}'. Use one of {OVERFLOW_POLICIES}.")
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.spill_path = spill_path
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self._queue = queue.Queue(maxsize=max_queue)
+        # Overflowed entries waiting for the flusher to append them to the spill file
+        self._overflow = collections.deque()
+        self._overflow_limit = spill_buffer
+        self._spill_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.failed = 0
+        self.retried = 0
+        self.quarantined = 0
+
+    # === Producer side ===
+    def enqueue(self, entry: dict) -> bool:
+        """Queues an entry for the flusher; returns False if it was dropped."""
+        if self._closed:
+            self._spill_now([entry])
+            return True
+        self._ensure_started()
+        overflow = self.overflow
+        if overflow == "block" and _on_event_loop():
+            overflow = "spill"
+        try:
+            if overflow == "block":
+                self._queue.put(entry, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(entry)
+        except queue.Full:
+            if overflow != "spill" or len(self._overflow) >= self._overflow_limit:
+                self.dropped += 1
+                return False
+            self._overflow.append(entry)
+            self.spilled += 1
+        else:
+            self.enqueued += 1
+        thread = self._thread
+        if self._closed and (thread is None or not thread.is_alive()):
+            # drain() finished between the check above and the put; nobody else will read it
+            self._spill_now(self._take_queued())
+            self._flush_overflow()
+        return True
+
+    def _ensure_started(self):
+        # Also restarts the flusher in a forked worker, where threads do not survive
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._closed or (self._thread is not None and self._pid == os.getpid()):
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="security-log-flusher", daemon=True)
+            self._thread.start()
+
+    # === Flusher side ===
+    def _run(self):
+        stopping = False
+        while not stopping:
+            self._flush_overflow()
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            if stopping:
+                # Drain whatever is still queued before exiting
+                batch.extend(self._take_queued())
+
+            for start in range(0, len(batch), self.batch_size):
+                self._write(batch[start:start + self.batch_size], retry=not stopping)
+
+            self._flush_overflow()
+            # Spill files also hold batches the sink rejected, whatever the overflow policy
+            if stopping or self._queue.empty():
+                self._replay_spill(retry=not stopping)
+
+    def _take_queued(self) -> List[dict]:
+        entries = []
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                return entries
+            if entry is not _STOP:
+                entries.append(entry)
+
+    def _write(self, batch: List[dict], retry: bool = True) -> bool:
+        """Hands a batch to the sink, retrying with backoff; spills it if the sink keeps failing."""
+        if not batch:
+            return True
+        attempts = 1 + (self.retries if retry else 0)
+        for attempt in range(attempts):
+            if attempt:
+                self.retried += len(batch)
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            try:
+                self.sink(batch)
+                self.written += len(batch)
+                return True
+            except Exception as e:
+                error = e
+        self.failed += len(batch)
+        print(f"[WARN] Failed to write {len(batch)} security log entries, spilled for replay: {error}")
+        self._append_to_spill(batch)
+        return False
+
+    def _spill_now(self, entries: List[dict]):
+        # On the caller's thread, once the flusher has stopped
+        self._append_to_spill(entries)
+        self.spilled += len(entries)
+
+    def _flush_overflow(self):
+        entries = []
+        while self._overflow:
+            entries.append(self._overflow.popleft())
+        self._append_to_spill(entries)
+
+    def _append_to_spill(self, entries: List[dict]):
+        if not entries:
+            return
+        lines = "".join(json.dumps(entry, default=str) + "\n" for entry in entries)
+        with self._spill_lock:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+    def _replay_spill(self, retry: bool = True):
+        if not os.path.exists(self.spill_path):
+            return
+        replay_path = f"{self.spill_path}.{os.getpid()}.replay"
+        with self._spill_lock:
+            try:
+                os.replace(self.spill_path, replay_path)
+            except FileNotFoundError:
+                return
+
+        batch, sink_down = [], False
+        with open(replay_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    batch.append(json.loads(line))
+                except ValueError:
+                    # A torn or corrupt line (e.g. a crash mid-write); keep it for inspection
+                    self._quarantine(line)
+                if len(batch) >= self.batch_size:
+                    sink_down = self._replay_batch(batch, retry, sink_down)
+                    batch = []
+        self._replay_batch(batch, retry, sink_down)
+        os.remove(replay_path)
+
+    def _replay_batch(self, batch: List[dict], retry: bool, sink_down: bool) -> bool:
+        """Writes one replayed batch; once the sink has failed, the rest goes back to the spill file untried."""
+        if sink_down:
+            self._append_to_spill(batch)
+            return True
+        return not self._write(batch, retry)
+
+    def _quarantine(self, line: str):
+        with open(f"{self.spill_path}.quarantine", "a", encoding="utf-8") as f:
+            f.write(line if line.endswith("\n") else line + "\n")
+        self.quarantined += 1
+
+    # === Shutdown ===
+    def drain(self, timeout: float = 5.0) -> bool:
+        """Flushes everything queued and stops the flusher; returns False on timeout.
+
+        Entries enqueued from here on are spilled by the caller.
+        """
+        with self._start_lock:
+            self._closed = True
+            thread = self._thread if self._pid == os.getpid() else None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+            if thread.is_alive():
+                return False
+        # Anything enqueued while the flusher was exiting
+        self._spill_now(self._take_queued())
+        self._flush_overflow()
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "failed": self.failed,
+            "retried": self.retried,
+            "quarantined": self.quarantined,
+            "overflow": self.overflow,
+        }
@@ -0,0 +1,65 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from passlib.context import CryptContext
+
+from metrics import LatencyHistogram
+
+# Centralized config values
+from Backend.config import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# Per-operation latency, measured from submit to result
+hash_latency = LatencyHistogram()
+verify_latency = LatencyHistogram()
+
+_executor = None
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+def get_password_executor():
+    """Returns the dedicated bcrypt process pool, or None for the default threadpool."""
+    global _executor
+    if _executor is None and PASSWORD_HASH_WORKERS > 0:
+        # spawn, not fork: forking after the gRPC clients start can deadlock the child
+        _executor = ProcessPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+def shutdown_password_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+async def _run_off_loop(histogram: LatencyHistogram, func, *args):
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    try:
+        return await loop.run_in_executor(get_password_executor(), func, *args)
+    finally:
+        histogram.observe(time.perf_counter() - start)
+
+async def hash_password_async(password: str) -> str:
+    """Hashes a password on the bcrypt worker pool without blocking the event loop."""
+    return await _run_off_loop(hash_latency, hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verifies a password on the bcrypt worker pool without blocking the event loop."""
+    return await _run_off_loop(verify_latency, verify_password, plain_password, hashed_password)
+
+def password_hashing_stats() -> dict:
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "bcrypt_rounds": BCRYPT_ROUNDS,
+        "hash": hash_latency.snapshot(),
+        "verify": verify_latency.snapshot()
+    }
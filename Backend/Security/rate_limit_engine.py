@@ -0,0 +1,74 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Stale entries dropped per call, so the idle sweep stays constant-time
+IDLE_SWEEP_BATCH = 8
+
+
+class SlidingWindowRateLimiter:
+    """Sliding-window-counter rate limiter with a bounded identifier table.
+
+    Each identifier keeps only the request counts of the current and the
+    previous fixed window. The sliding estimate weights the previous count
+    by how much of it still overlaps the window ending now, so every
+    check is O(1) regardless of the limit.
+
+    The table is kept in least-recently-used order. It never holds more
+    than max_identifiers entries, and identifiers idle for more than one
+    full window are swept from the cold end as new requests arrive.
+    """
+
+    def __init__(self, limit: int, window_seconds: float, max_identifiers: int = 100_000, clock=time.time):
+        if limit <= 0 or window_seconds <= 0 or max_identifiers <= 0:
+            raise ValueError("limit, window_seconds and max_identifiers must be positive")
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.max_identifiers = max_identifiers
+        self._clock = clock
+        self._table = OrderedDict()  # identifier -> [window_index, previous_count, current_count]
+        self._lock = threading.Lock()
+
+    def hit(self, identifier: str) -> bool:
+        """Records a request and returns True, or returns False if the identifier is over its limit."""
+        now = self._clock()
+        window_index = int(now // self.window_seconds)
+
+        with self._lock:
+            entry = self._table.get(identifier)
+            if entry is None:
+                entry = [window_index, 0, 0]
+                self._table[identifier] = entry
+                if len(self._table) > self.max_identifiers:
+                    self._table.popitem(last=False)
+            else:
+                self._table.move_to_end(identifier)
+                if entry[0] != window_index:
+                    entry[1] = entry[2] if entry[0] == window_index - 1 else 0
+                    entry[2] = 0
+                    entry[0] = window_index
+
+            self._sweep_idle(window_index)
+
+            elapsed_fraction = (now - window_index * self.window_seconds) / self.window_seconds
+            estimated = entry[1] * (1.0 - elapsed_fraction) + entry[2]
+            if estimated >= self.limit:
+                return False
+
+            entry[2] += 1
+            return True
+
+    def _sweep_idle(self, window_index: int):
+        # Entries last seen two or more windows ago carry no weight any more
+        for _ in range(IDLE_SWEEP_BATCH):
+            oldest = next(iter(self._table.values()), None)
+            if oldest is None or oldest[0] >= window_index - 1:
+                return
+            self._table.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._table.clear()
+
+    def __len__(self) -> int:
+        return len(self._table)
@@ -1,33 +1,37 @@
-import time
 from fastapi import Request, Response
 from fastapi.responses import JSONResponse
 from Security.security_logging import log_security_event # Import the logging function
+from Security.state_backend import RateLimitRule, StateBatch, run_state_batch
+from Security.token_manager import get_revocation_id
 
 # Settings
 RATE_LIMIT = 100          # Max requests
 WINDOW_SIZE = 15 * 60     # Time window in seconds (15 minutes)
+MAX_TRACKED_IDENTIFIERS = 100_000  # Least recently seen identifiers are evicted past this
 
-# In-memory request tracking
-request_log = {}
+API_RATE_LIMIT = RateLimitRule("api", RATE_LIMIT, WINDOW_SIZE, MAX_TRACKED_IDENTIFIERS)
 
-def get_request_identifier(request: Request):
-    # Use token if provided, else fallback to client IP
+def get_bearer_token(request: Request):
     token = request.headers.get("Authorization")
     if token and token.startswith("Bearer "):
         return token.split(" ")[1]
-    return request.client.host
+    return None
+
+def get_request_identifier(request: Request):
+    # Use token if provided, else fallback to client IP
+    return get_bearer_token(request) or request.client.host
 
 async def rate_limiter(request: Request, call_next):
     identifier = get_request_identifier(request)
-    now = time.time()
-
-    if identifier not in request_log:
-        request_log[identifier] = []
+    token = get_bearer_token(request)
 
-    # Filter timestamps within the current window
-    request_log[identifier] = [ts for ts in request_log[identifier] if now - ts < WINDOW_SIZE]
+    # One backend round trip: the rate limit and, for bearer requests, the revocation check
+    batch = StateBatch()
+    allowed_index = batch.hit(API_RATE_LIMIT, identifier)
+    revoked_index = batch.is_revoked("access", get_revocation_id(token)[0]) if token else None
+    results = await run_state_batch(batch)
 
-    if len(request_log[identifier]) >= RATE_LIMIT:
+    if not results[allowed_index]:
         log_security_event(
             user=identifier,
             event_type="RATE_LIMIT",
@@ -40,6 +44,9 @@ async def rate_limiter(request: Request, call_next):
             content={"detail": "Rate limit exceeded. Please wait before sending more requests."}
         )
 
-    request_log[identifier].append(now)
+    if token:
+        # Lets verify_access_token skip a second lookup for the same token
+        request.state.access_token_revocation = (token, results[revoked_index])
+
     response = await call_next(request)
     return response
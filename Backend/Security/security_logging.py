@@ -1,15 +1,28 @@
 import os
+import atexit
 import logging
 import json
 import hmac
 import hashlib
+from datetime import datetime, timezone
 from config import HMAC_KEY
 from dotenv import load_dotenv
-from google.cloud import logging as gcp_logging
-from google.oauth2 import service_account
 
 # Config
-from Backend.config import SDK_KEY
+from Backend.config import (
+    SDK_KEY,
+    SECURITY_LOG_QUEUE_SIZE,
+    SECURITY_LOG_BATCH_SIZE,
+    SECURITY_LOG_FLUSH_INTERVAL,
+    SECURITY_LOG_OVERFLOW,
+    SECURITY_LOG_BLOCK_TIMEOUT,
+    SECURITY_LOG_SPILL_PATH,
+    SECURITY_LOG_RETRIES,
+    SECURITY_LOG_RETRY_BACKOFF,
+    SECURITY_LOG_DRAIN_TIMEOUT
+)
+from Security.log_pipeline import LogPipeline
+from Security.log_chain import LogChain
 
 logger = None
 
@@ -17,40 +30,85 @@ def generate_hmac(message: str) -> str:
     """Generate an HMAC SHA-256 signature for a given message."""
     return hmac.new(HMAC_KEY.encode(), message.encode(), hashlib.sha256).hexdigest()
 
-# Get path to service account credentials
-cred_path = os.getenv("SDK_KEY")
+def get_security_logger():
+    """Cloud Logging logger, or the local fallback logger; built on the first flushed batch, not at import."""
+    global logger
+    if logger is not None:
+        return logger
 
-if cred_path and os.path.isfile(cred_path):
-    try:
-        credentials = service_account.Credentials.from_service_account_file(SDK_KEY)
-        client = gcp_logging.Client(credentials=credentials, project=credentials.project_id)
-        logger = client.logger("security-logs")
-    except Exception as e:
-        print(f"Failed to initialize Google Cloud Logging: {e}")
+    # Get path to service account credentials
+    cred_path = os.getenv("SDK_KEY")
+
+    if cred_path and os.path.isfile(cred_path):
+        try:
+            from google.cloud import logging as gcp_logging
+            from google.oauth2 import service_account
+            credentials = service_account.Credentials.from_service_account_file(SDK_KEY)
+            client = gcp_logging.Client(credentials=credentials, project=credentials.project_id)
+            logger = client.logger("security-logs")
+        except Exception as e:
+            print(f"Failed to initialize Google Cloud Logging: {e}")
+            logger = logging.getLogger("fallback-logger")
+            logging.basicConfig(level=logging.INFO)
+    else:
+        print("WARNING: SDK_KEY not set or file missing. Using local fallback logger.")
         logger = logging.getLogger("fallback-logger")
         logging.basicConfig(level=logging.INFO)
-else:
-    print("WARNING: SDK_KEY not set or file missing. Using local fallback logger.")
-    logger = logging.getLogger("fallback-logger")
-    logging.basicConfig(level=logging.INFO)
+    return logger
+
+# Tamper-evident chain: one HMAC per batch, each batch linked to the previous digest.
+# Verify exported logs with Scripts/verify_security_log.py.
+security_log_chain = LogChain(HMAC_KEY)
+
+def write_security_events(entries: list):
+    """Seals a batch of queued events into the chain and writes it; runs on the flusher thread.
+
+    The chain only moves forward once the write succeeds: a batch the sink
+    rejects leaves no gap for Scripts/verify_security_log.py to report.
+    """
+    record = security_log_chain.prepare(entries)
+    sink = get_security_logger()
+
+    if hasattr(sink, "log_struct"):
+        sink.log_struct(record)
+    else:
+        sink.info(f"SECURITY LOG BATCH: {json.dumps(record, sort_keys=True)}")
+    security_log_chain.commit(record)
+
+security_log_pipeline = LogPipeline(
+    sink=write_security_events,
+    max_queue=SECURITY_LOG_QUEUE_SIZE,
+    batch_size=SECURITY_LOG_BATCH_SIZE,
+    flush_interval=SECURITY_LOG_FLUSH_INTERVAL,
+    overflow=SECURITY_LOG_OVERFLOW,
+    block_timeout=SECURITY_LOG_BLOCK_TIMEOUT,
+    spill_path=SECURITY_LOG_SPILL_PATH,
+    retries=SECURITY_LOG_RETRIES,
+    retry_backoff=SECURITY_LOG_RETRY_BACKOFF,
+    # Overflow waiting for the flusher to spill it is held to the queue's own size
+    spill_buffer=SECURITY_LOG_QUEUE_SIZE
+)
 
 def log_security_event(user: str, event_type: str, action: str, status: str, details: str = ""):
+    # Strings only, so the entry survives Cloud Logging's JSON round trip byte-for-byte
     log_entry = {
-        "user": user,
+        "user": str(user),
         "event_type": event_type,
         "action": action,
         "status": status,
-        "details": details
+        "details": str(details),
+        # Recorded at the call site, since the entry is written later in a batch
+        "timestamp": datetime.now(timezone.utc).isoformat()
     }
 
-    # Create JSON and generate HMAC signature
-    event_json = json.dumps(log_entry, sort_keys=True)
-    log_entry["hmac"] = generate_hmac(event_json)
+    # Handlers only pay for the enqueue; signing and I/O happen on the flusher thread
+    security_log_pipeline.enqueue(log_entry)
 
-    if hasattr(logger, "log_struct"):
-        logger.log_struct(log_entry)
-    else:
-        logger.info(f"SECURITY EVENT: {log_entry}")
+def shutdown_security_logging(timeout: float = SECURITY_LOG_DRAIN_TIMEOUT) -> bool:
+    """Flushes queued security events before the process exits."""
+    return security_log_pipeline.drain(timeout)
+
+atexit.register(shutdown_security_logging)
 
 def log_unauthorized_access(user: str, endpoint: str, reason: str):
     log_security_event(
@@ -0,0 +1,286 @@
+import hashlib
+import heapq
+import math
+import threading
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from Security.rate_limit_engine import SlidingWindowRateLimiter
+
+# Centralized config values
+from Backend.config import (
+    STATE_BACKEND, REDIS_URL, STATE_KEY_PREFIX
+)
+
+
+class RateLimitRule(NamedTuple):
+    name: str
+    limit: int
+    window_seconds: int
+    max_identifiers: int = 100_000
+
+
+class StateBatch:
+    """Collects rate-limit and token-state reads so a backend can answer them in one round trip.
+
+    Each method returns the index of its result in the list returned by
+    StateBackend.execute(batch).
+    """
+
+    def __init__(self):
+        self.ops = []
+
+    def hit(self, rule: RateLimitRule, identifier: str) -> int:
+        """Counts a request against a rule; the result is True if it is allowed."""
+        self.ops.append(("hit", rule, identifier))
+        return len(self.ops) - 1
+
+    def is_revoked(self, kind: str, jti: str) -> int:
+        """Result is True if the token of this kind ("access"/"refresh") with this jti has been revoked."""
+        self.ops.append(("is_revoked", kind, jti))
+        return len(self.ops) - 1
+
+    def get_refresh_token(self, username: str) -> int:
+        """Result is the refresh token currently stored for the user, or None."""
+        self.ops.append(("get_refresh_token", username))
+        return len(self.ops) - 1
+
+
+class StateBackend:
+    """Storage for rate-limit counters, revoked tokens and active refresh tokens."""
+
+    # Remote backends are executed off the event loop
+    is_remote = False
+
+    def execute(self, batch: StateBatch) -> list:
+        raise NotImplementedError
+
+    def revoke(self, kind: str, jti: str, expires_at: Optional[float] = None):
+        """Revokes a token until its exp (epoch seconds); the entry then expires on its own."""
+        raise NotImplementedError
+
+    def store_refresh_token(self, username: str, token: str, ttl_seconds: Optional[int] = None):
+        raise NotImplementedError
+
+    def pop_refresh_token(self, username: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class InMemoryStateBackend(StateBackend):
+    """Process-local state; correct only for a single worker process.
+
+    Revoked tokens are kept as jti -> exp and purged once expired, using a
+    min-heap ordered by exp.
+    """
+
+    def __init__(self, clock=time.time):
+        self._limiters = {}
+        self._revoked = {"access": {}, "refresh": {}}
+        self._expiry_heap = []  # (expires_at, kind, jti)
+        self._refresh_tokens = {}
+        self._lock = threading.Lock()
+        self._clock = clock
+
+    def _limiter(self, rule: RateLimitRule) -> SlidingWindowRateLimiter:
+        limiter = self._limiters.get(rule.name)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.setdefault(
+                    rule.name,
+                    SlidingWindowRateLimiter(rule.limit, rule.window_seconds, max_identifiers=rule.max_identifiers)
+                )
+        return limiter
+
+    def execute(self, batch: StateBatch) -> list:
+        results = []
+        for op in batch.ops:
+            if op[0] == "hit":
+                results.append(self._limiter(op[1]).hit(op[2]))
+            elif op[0] == "is_revoked":
+                results.append(self._is_revoked(op[1], op[2]))
+            else:
+                results.append(self._refresh_tokens.get(op[1]))
+        return results
+
+    def _is_revoked(self, kind: str, jti: str) -> bool:
+        expires_at = self._revoked[kind].get(jti, 0)
+        if expires_at == 0:
+            return False
+        return expires_at is None or expires_at > self._clock()
+
+    def revoke(self, kind: str, jti: str, expires_at: Optional[float] = None):
+        now = self._clock()
+        if expires_at is not None and expires_at <= now:
+            return  # Already unusable; nothing to remember
+
+        with self._lock:
+            self._purge_expired(now)
+            self._revoked[kind][jti] = expires_at
+            if expires_at is not None:
+                heapq.heappush(self._expiry_heap, (expires_at, kind, jti))
+
+    def _purge_expired(self, now: float):
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, kind, jti = heapq.heappop(heap)
+            if self._revoked[kind].get(jti) == expires_at:
+                del self._revoked[kind][jti]
+
+    def revoked_count(self) -> int:
+        return sum(len(entries) for entries in self._revoked.values())
+
+    def store_refresh_token(self, username: str, token: str, ttl_seconds: Optional[int] = None):
+        self._refresh_tokens[username] = token
+
+    def pop_refresh_token(self, username: str) -> Optional[str]:
+        return self._refresh_tokens.pop(username, None)
+
+    def clear(self):
+        with self._lock:
+            self._limiters.clear()
+            for entries in self._revoked.values():
+                entries.clear()
+            self._expiry_heap.clear()
+        self._refresh_tokens.clear()
+
+
+def _digest(value: str) -> str:
+    # Keeps keys short and avoids writing bearer tokens into the shared store
+    return hashlib.blake2b(value.encode(), digest_size=16).hexdigest()
+
+
+class RedisStateBackend(StateBackend):
+    """Shared state in any Redis-protocol server, so limits and revocations hold across workers.
+
+    Rate limits use the same sliding-window-counter estimate as the
+    in-memory engine, with one INCR per request in the current window and
+    a GET of the previous one. Unlike the in-memory engine, rejected
+    requests are counted too, which keeps every check a single pipelined
+    round trip.
+    """
+
+    is_remote = True
+
+    def __init__(self, client, prefix: str = "mymeds"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "mymeds"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("STATE_BACKEND=redis requires the 'redis' package (pip install redis)") from e
+        return cls(redis.Redis.from_url(url, decode_responses=True), prefix=prefix)
+
+    def _key(self, *parts) -> str:
+        return ":".join((self.prefix,) + tuple(str(part) for part in parts))
+
+    def execute(self, batch: StateBatch) -> list:
+        now = time.time()
+        pipe = self.client.pipeline(transaction=False)
+        # For each op: (kind, number of pipeline replies, context)
+        layout = []
+
+        for op in batch.ops:
+            if op[0] == "hit":
+                rule, identifier = op[1], op[2]
+                window_index = int(now // rule.window_seconds)
+                current_key = self._key("rl", rule.name, _digest(identifier), window_index)
+                previous_key = self._key("rl", rule.name, _digest(identifier), window_index - 1)
+                pipe.incr(current_key)
+                pipe.expire(current_key, rule.window_seconds * 2)
+                pipe.get(previous_key)
+                elapsed_fraction = (now - window_index * rule.window_seconds) / rule.window_seconds
+                layout.append(("hit", 3, (rule, elapsed_fraction)))
+            elif op[0] == "is_revoked":
+                pipe.exists(self._key("revoked", op[1], op[2]))
+                layout.append(("is_revoked", 1, None))
+            else:
+                pipe.get(self._key("refresh", op[1]))
+                layout.append(("get_refresh_token", 1, None))
+
+        replies = pipe.execute() if layout else []
+
+        results = []
+        position = 0
+        for kind, width, context in layout:
+            reply = replies[position:position + width]
+            position += width
+            if kind == "hit":
+                rule, elapsed_fraction = context
+                current = int(reply[0]) - 1  # requests before this one
+                previous = int(reply[2] or 0)
+                results.append(previous * (1.0 - elapsed_fraction) + current < rule.limit)
+            elif kind == "is_revoked":
+                results.append(bool(reply[0]))
+            else:
+                results.append(reply[0])
+        return results
+
+    def revoke(self, kind: str, jti: str, expires_at: Optional[float] = None):
+        key = self._key("revoked", kind, jti)
+        if expires_at is None:
+            self.client.set(key, 1)
+            return
+        ttl_seconds = math.ceil(expires_at - time.time())
+        if ttl_seconds > 0:
+            self.client.set(key, 1, ex=ttl_seconds)
+
+    def store_refresh_token(self, username: str, token: str, ttl_seconds: Optional[int] = None):
+        self.client.set(self._key("refresh", username), token, ex=ttl_seconds)
+
+    def pop_refresh_token(self, username: str) -> Optional[str]:
+        pipe = self.client.pipeline(transaction=True)
+        key = self._key("refresh", username)
+        pipe.get(key)
+        pipe.delete(key)
+        token, _ = pipe.execute()
+        return token
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self._key("*")))
+        if keys:
+            self.client.delete(*keys)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_state_backend() -> StateBackend:
+    """Returns the process-wide backend selected by STATE_BACKEND ("memory" or "redis")."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if STATE_BACKEND == "redis":
+                    _backend = RedisStateBackend.from_url(REDIS_URL, prefix=STATE_KEY_PREFIX)
+                elif STATE_BACKEND == "memory":
+                    _backend = InMemoryStateBackend()
+                else:
+                    raise ValueError(f"Unknown STATE_BACKEND '{STATE_BACKEND}'. Use 'memory' or 'redis'.")
+    return _backend
+
+def set_state_backend(backend: StateBackend):
+    """Swaps the process-wide backend (used by tests and custom deployments)."""
+    global _backend
+    _backend = backend
+
+async def run_state_call(func: Callable, *args):
+    """Calls a blocking state helper (e.g. token_manager.blacklist_access_token) from async code.
+
+    Runs in the threadpool when the backend is remote, so a Redis round
+    trip never blocks the event loop; in-memory calls run inline.
+    """
+    if get_state_backend().is_remote:
+        return await run_in_threadpool(func, *args)
+    return func(*args)
+
+async def run_state_batch(batch: StateBatch) -> List:
+    """Executes a batch from async code without blocking the event loop on a remote store."""
+    return await run_state_call(get_state_backend().execute, batch)
@@ -1,52 +1,107 @@
+import hashlib
 import os
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import jwt, JWTError
 from config import SECRET_KEY
-from Backend.config import JWT_ALGORITHM
+from Backend.config import JWT_ALGORITHM, VERIFIED_TOKEN_CACHE_MAX_ENTRIES
+from Security.state_backend import StateBatch, get_state_backend
+from cache_utils import TTLCache
 
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 1))
 
-# In-memory token tracking
-refresh_token_store = {}
-refresh_token_blacklist = set()
-access_token_blacklist = set()
+# Token tracking (refresh tokens and blacklists) lives in the configured state backend,
+# so revocations are shared by every worker. See Security/state_backend.py.
+# Blacklist entries are keyed by the token's jti and expire at the token's exp.
+
+# Verified claims by token digest, each held until its token's exp. A hit only proves
+# the signature was already checked: callers check the blacklist first.
+verified_token_cache = TTLCache(maxsize=max(VERIFIED_TOKEN_CACHE_MAX_ENTRIES, 1))
 
 # === Token Creation ===
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode = data.copy()
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=JWT_ALGORITHM)
 
 def create_refresh_token(data: dict):
     expire = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode = data.copy()
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=JWT_ALGORITHM)
 
 # === Token Validation ===
+def token_digest(token: str) -> str:
+    return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
 def decode_token(token: str):
-    return jwt.decode(token, SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    """Verifies a token and returns its claims (raises JWTError).
+
+    A token verified before is answered from verified_token_cache until it
+    expires; the digest covers the signature, so an altered token misses.
+    """
+    key = token_digest(token) if VERIFIED_TOKEN_CACHE_MAX_ENTRIES > 0 else None
+    if key is not None:
+        claims = verified_token_cache.get(key)
+        if claims is not None:
+            # A copy, since callers add to the payload
+            return dict(claims)
+
+    claims = jwt.decode(token, SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    exp = claims.get("exp")
+    # Tokens without exp are verified every time
+    if key is not None and isinstance(exp, (int, float)) and exp > time.time():
+        verified_token_cache.set(key, claims, ttl=exp - time.time())
+    return dict(claims)
+
+def get_revocation_id(token: str):
+    """Returns (jti, exp) used to blacklist a token.
+
+    Claims are read without verification: callers have already verified the
+    token or are only asking whether it was revoked. Tokens issued before jti
+    was added fall back to a digest of the encoded token.
+    """
+    digest = token_digest(token)
+    # Verified claims when the token is cached, which also skips parsing it again
+    claims = verified_token_cache.get(digest)
+    if claims is None:
+        try:
+            claims = jwt.get_unverified_claims(token)
+        except JWTError:
+            claims = {}
+    jti = claims.get("jti") or digest
+    exp = claims.get("exp")
+    return jti, exp if isinstance(exp, (int, float)) else None
 
 def is_token_blacklisted(token: str, is_refresh=False) -> bool:
-    return token in (refresh_token_blacklist if is_refresh else access_token_blacklist)
+    jti, _ = get_revocation_id(token)
+    batch = StateBatch()
+    batch.is_revoked("refresh" if is_refresh else "access", jti)
+    return get_state_backend().execute(batch)[0]
 
 def get_stored_refresh_token(username: str) -> Optional[str]:
-    return refresh_token_store.get(username)
+    batch = StateBatch()
+    batch.get_refresh_token(username)
+    return get_state_backend().execute(batch)[0]
 
 def store_refresh_token(username: str, token: str):
-    refresh_token_store[username] = token
+    get_state_backend().store_refresh_token(username, token, ttl_seconds=REFRESH_TOKEN_EXPIRE_DAYS * 86400)
 
 def blacklist_refresh_token(token: str):
-    refresh_token_blacklist.add(token)
+    jti, exp = get_revocation_id(token)
+    get_state_backend().revoke("refresh", jti, expires_at=exp)
 
 def blacklist_access_token(token: str):
-    access_token_blacklist.add(token)
+    jti, exp = get_revocation_id(token)
+    get_state_backend().revoke("access", jti, expires_at=exp)
+    verified_token_cache.pop(token_digest(token))
 
 def invalidate_user_refresh_token(username: str):
-    token = refresh_token_store.pop(username, None)
+    token = get_state_backend().pop_refresh_token(username)
     if token:
         blacklist_refresh_token(token)
@@ -1,19 +1,19 @@
 # Standard Library
 from datetime import datetime, timedelta
 from typing import Optional
-import time
 
 # Third-Party Packages
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
 from pydantic import BaseModel
 from jose import JWTError
 
 # Internal Imports
 from .models import User, UserRole, users_db
 from Security.security_logging import log_security_event
-from SDK_Database.firebase_config import db
+from Security.password_hashing import verify_password_async
+from Security.state_backend import RateLimitRule, StateBatch, run_state_batch, run_state_call
+from SDK_Database.read import get_user_by_username
 from Security.token_manager import (
     create_access_token,
     create_refresh_token,
@@ -23,14 +23,14 @@ from Security.token_manager import (
     blacklist_refresh_token,
     blacklist_access_token,
     invalidate_user_refresh_token,
-    is_token_blacklisted
+    is_token_blacklisted,
+    get_revocation_id
 )
 
 # Centralized config values
 from Backend.config import JWT_ALGORITHM, SECRET_KEY, USE_DUMMY_DATA
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 router = APIRouter()
 
 class LoginRequest(BaseModel):
@@ -40,11 +40,12 @@ class LoginRequest(BaseModel):
 class RefreshRequest(BaseModel):
     refresh_token: str
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_access_token(request: Request, token: str = Depends(oauth2_scheme)):
+    # Reuse the revocation result fetched by the rate limiting middleware when present
+    checked = getattr(request.state, "access_token_revocation", None)
+    revoked = checked[1] if checked and checked[0] == token else await run_state_call(is_token_blacklisted, token)
 
-def verify_access_token(token: str = Depends(oauth2_scheme)):
-    if is_token_blacklisted(token):
+    if revoked:
         log_security_event(
             user="unknown",
             event_type="AUTH",
@@ -70,11 +71,11 @@ def verify_access_token(token: str = Depends(oauth2_scheme)):
         raise HTTPException(status_code=401, detail="Invalid token")
 
 @router.post("/login/")
-def login(request: LoginRequest):
+async def login(request: LoginRequest):
     if USE_DUMMY_DATA:
         user = next((u for u in users_db.values() if u.username == request.username), None)
         print("I am Here")
-        if not user or not verify_password(request.password, user.password):
+        if not user or not await verify_password_async(request.password, user.password):
             log_security_event(
                 user=request.username,
                 event_type="AUTH",
@@ -85,10 +86,9 @@ def login(request: LoginRequest):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
         role = user.role
     else:
-        user_ref = db.collection("users").where("username", "==", request.username).limit(1).get()
-        user = user_ref[0].to_dict() if user_ref else None
+        user = await get_user_by_username(request.username)
         print(user)
-        if not user or not verify_password(request.password, user["password"]):
+        if not user or not await verify_password_async(request.password, user["password"]):
             log_security_event(
                 user=request.username,
                 event_type="AUTH",
@@ -101,7 +101,7 @@ def login(request: LoginRequest):
 
     access_token = create_access_token(data={"sub": request.username, "role": role})
     refresh_token = create_refresh_token(data={"sub": request.username, "role": role})
-    store_refresh_token(user["username"], refresh_token)
+    await run_state_call(store_refresh_token, request.username, refresh_token)
 
     log_security_event(user=request.username, event_type="AUTH", action="LOGIN", status="SUCCESS")
 
@@ -112,12 +112,12 @@ def login(request: LoginRequest):
     }
 
 @router.post("/logout/")
-def logout(token_data: dict = Depends(verify_access_token)):
+async def logout(token_data: dict = Depends(verify_access_token)):
     token_value = token_data["token"]
     username = token_data.get("sub", "unknown")
 
-    blacklist_access_token(token_value)
-    invalidate_user_refresh_token(username)
+    await run_state_call(blacklist_access_token, token_value)
+    await run_state_call(invalidate_user_refresh_token, username)
 
     log_security_event(
         user=username,
@@ -129,23 +129,34 @@ def logout(token_data: dict = Depends(verify_access_token)):
 
     return {"message": f"Logged out user: {username}"}
 
-# === Lightweight Manual Rate Limiter for Refresh Endpoint ===
-refresh_attempts = {}
+# === Lightweight Rate Limiter for Refresh Endpoint ===
+REFRESH_MAX_ATTEMPTS = 5
+REFRESH_WINDOW_SECONDS = 60
+REFRESH_MAX_TRACKED_IDENTIFIERS = 50_000
 
-def is_refresh_rate_limited(identifier: str, max_attempts: int = 5, window_seconds: int = 60) -> bool:
-    now = time.time()
-    if identifier not in refresh_attempts:
-        refresh_attempts[identifier] = []
-    refresh_attempts[identifier] = [ts for ts in refresh_attempts[identifier] if now - ts < window_seconds]
-    if len(refresh_attempts[identifier]) >= max_attempts:
-        return True
-    refresh_attempts[identifier].append(now)
-    return False
+REFRESH_RATE_LIMIT = RateLimitRule(
+    "refresh", REFRESH_MAX_ATTEMPTS, REFRESH_WINDOW_SECONDS, REFRESH_MAX_TRACKED_IDENTIFIERS
+)
 
 @router.post("/refresh-token/")
-def refresh_token(request: Request, refresh_data: RefreshRequest):
+async def refresh_token(request: Request, refresh_data: RefreshRequest):
     identifier = request.client.host  # or pull from Authorization token if available
-    if is_refresh_rate_limited(identifier):
+    refresh_token = refresh_data.refresh_token
+
+    # Signature checks are local; decode first so every state lookup fits in one round trip
+    try:
+        payload = decode_token(refresh_token)
+    except JWTError:
+        payload = None
+    username = payload.get("sub") if payload else None
+
+    batch = StateBatch()
+    allowed_index = batch.hit(REFRESH_RATE_LIMIT, identifier)
+    revoked_index = batch.is_revoked("refresh", get_revocation_id(refresh_token)[0])
+    stored_index = batch.get_refresh_token(username) if username else None
+    results = await run_state_batch(batch)
+
+    if not results[allowed_index]:
         log_security_event(
             user=identifier,
             event_type="RATE_LIMIT",
@@ -155,9 +166,8 @@ def refresh_token(request: Request, refresh_data: RefreshRequest):
         )
         raise HTTPException(status_code=429, detail="Refresh rate limit exceeded. Please wait before retrying.")
 
-    refresh_token = refresh_data.refresh_token
     try:
-        if is_token_blacklisted(refresh_token, is_refresh=True):
+        if results[revoked_index]:
             log_security_event(
                 user="unknown",
                 event_type="AUTH",
@@ -167,8 +177,9 @@ def refresh_token(request: Request, refresh_data: RefreshRequest):
             )
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
 
-        payload = decode_token(refresh_token)
-        username = payload.get("sub")
+        if payload is None:
+            raise JWTError("Invalid or expired refresh token")
+
         role = payload.get("role")
 
         if not username or not role:
@@ -181,7 +192,7 @@ def refresh_token(request: Request, refresh_data: RefreshRequest):
             )
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
 
-        stored_token = get_stored_refresh_token(username)
+        stored_token = results[stored_index]
         if stored_token != refresh_token:
             log_security_event(
                 user=username,
@@ -193,14 +204,14 @@ def refresh_token(request: Request, refresh_data: RefreshRequest):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or reused refresh token")
 
         # BLACKLIST the old refresh token immediately
-        blacklist_refresh_token(refresh_token)
+        await run_state_call(blacklist_refresh_token, refresh_token)
 
         # ISSUE a new access token and refresh token
         new_access_token = create_access_token(data={"sub": username, "role": role})
         new_refresh_token = create_refresh_token(data={"sub": username, "role": role})
 
         # STORE the new refresh token
-        store_refresh_token(username, new_refresh_token)
+        await run_state_call(store_refresh_token, username, new_refresh_token)
 
         log_security_event(
             user=username,
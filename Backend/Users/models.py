@@ -1,7 +1,9 @@
+import threading
+from collections.abc import Mapping
 from enum import Enum
 from pydantic import BaseModel
-from typing import List, Dict
-from passlib.context import CryptContext
+from typing import Callable, List, Dict
+from Security.password_hashing import pwd_context, hash_password
 
 # Define user roles
 class UserRole(str, Enum):
@@ -17,8 +19,6 @@ class User(BaseModel):
     password: str
     connected_users: Dict[int, str] = {}  # Dictionary {connected_user_id: role}
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # Used only for development/test login
 plaintext_passwords = {
     "alice": "password123",
@@ -27,14 +27,42 @@ plaintext_passwords = {
     "dave": "admin123"
 }
 
-def hash_password(password: str):
-    return pwd_context.hash(password)
+class LazyUsers(Mapping):
+    """Read-only mapping of user id -> User, built on first access.
+
+    Building the dummy users hashes their passwords (bcrypt), which is
+    too slow to do at import.
+    """
+
+    def __init__(self, build: Callable[[], Dict[int, User]]):
+        self._build = build
+        self._users = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[int, User]:
+        if self._users is None:
+            with self._lock:
+                if self._users is None:
+                    self._users = self._build()
+        return self._users
+
+    def __getitem__(self, user_id):
+        return self._load()[user_id]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+def build_dummy_users() -> Dict[int, User]:
+    return {
+        1: User(id=1, username="alice", role=UserRole.BASIC, password=hash_password(plaintext_passwords["alice"]), connected_users={2: "basic", 3: "caretaker"}),
+        2: User(id=2, username="bob", role=UserRole.BASIC, password=hash_password(plaintext_passwords["bob"]), connected_users={1: "basic"}),
+        3: User(id=3, username="charlie", role=UserRole.DEPENDENT, password=hash_password(plaintext_passwords["charlie"])),
+        4: User(id=4, username="dave", role=UserRole.ADMIN, password=hash_password(plaintext_passwords["dave"])),
+    }
 
 # Dummy user data
-users_db = {
-    1: User(id=1, username="alice", role=UserRole.BASIC, password=hash_password(plaintext_passwords["alice"]), connected_users={2: "basic", 3: "caretaker"}),
-    2: User(id=2, username="bob", role=UserRole.BASIC, password=hash_password(plaintext_passwords["bob"]), connected_users={1: "basic"}),
-    3: User(id=3, username="charlie", role=UserRole.DEPENDENT, password=hash_password(plaintext_passwords["charlie"])),
-    4: User(id=4, username="dave", role=UserRole.ADMIN, password=hash_password(plaintext_passwords["dave"])),
-}
+users_db = LazyUsers(build_dummy_users)
 
@@ -1,24 +1,28 @@
 # FastAPI core
-from fastapi import APIRouter, Depends, HTTPException, Security, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Security, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from Security.token_manager import create_access_token, timedelta
+from Security.token_manager import create_access_token, decode_token, is_token_blacklisted, timedelta
 
 # JWT + Config
-from jose import JWTError, jwt
-from Backend.config import SECRET_KEY, JWT_ALGORITHM
+from jose import JWTError
+from Backend.config import USE_DUMMY_DATA, PAGE_SIZE_MAX
 
 # Models and DB logic
-from .models import users_db, User, hash_password
+from .models import users_db, User
+from Security.password_hashing import hash_password_async
 from SDK_Database.Create import create_user, connect_users
-from SDK_Database.firebase_config import db
+from SDK_Database.read import get_user_by_username, get_last_user_id, page_collection, iterate_collection
+from SDK_Database.user_cache import principal_cache
+from Security.state_backend import run_state_call
 
 # Logging
 from Security.security_logging import log_security_event
 
-# Firebase Admin
-from firebase_admin import firestore
+# Pagination and streaming
+from http_utils import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor, page_size, ndjson_response
 
 from pydantic import BaseModel
+from typing import Literal, Optional
 
 
 router = APIRouter()
@@ -33,12 +37,10 @@ class ConnectRequest(BaseModel):
     connected_user_id: str
     role: str
 
-def generate_unique_user_id():
-    users_ref = db.collection("users")
-    users = users_ref.order_by("user_id", direction=firestore.Query.DESCENDING).limit(1).get()
+async def generate_unique_user_id():
+    last_user_id = await get_last_user_id()
 
-    if users:
-        last_user_id = users[0].to_dict().get("user_id", "user_0")
+    if last_user_id:
         last_id_num = int(last_user_id.split("_")[-1])
         new_id = f"user_{last_id_num + 1}"
     else:
@@ -47,22 +49,34 @@ def generate_unique_user_id():
     return new_id
 
 # Function to get current user from JWT token
-def get_current_user(credentials: HTTPAuthorizationCredentials = Security(security)):
+async def get_current_user(request: Request, credentials: HTTPAuthorizationCredentials = Security(security)):
     token = credentials.credentials
+    # Revocation is checked before decode_token, whose cache does not know about it.
+    # Reuses the result fetched by the rate limiting middleware when present.
+    checked = getattr(request.state, "access_token_revocation", None)
+    revoked = checked[1] if checked and checked[0] == token else await run_state_call(is_token_blacklisted, token)
+    if revoked:
+        raise HTTPException(status_code=401, detail="Token has been blacklisted")
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[JWT_ALGORITHM])
+        payload = decode_token(token)
         username = payload.get("sub")
         role = payload.get("role")
         if username is None or role is None:
             raise HTTPException(status_code=401, detail="Invalid token")
 
-        user_ref = db.collection("users").where("username", "==", username).limit(1).get()
-        if not user_ref:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Username")
-
-        user = user_ref[0].to_dict()
+        user = principal_cache.get(username)
         if user is None:
-            raise HTTPException(status_code=401, detail="User not found")
+            user = await get_user_by_username(username)
+            if user is None:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Username")
+
+            # Cache only what the principal needs, never the password hash
+            user = {
+                "user_id": user["user_id"],
+                "connected_users": user.get("connected_users", [])
+            }
+            principal_cache.set(username, user)
 
         return {
             "id": user["user_id"],
@@ -93,9 +107,28 @@ def check_permissions(current_user: dict, allowed_roles: list, action: str):
         details=f"Access granted for role '{current_user['role']}' to perform: {action}"
     )
 
-# Get all users (protected)
+# Fields returned by the user listing (never the password hash)
+USER_LIST_FIELDS = ("user_id", "username", "role", "connected_users")
+
+# Dummy-data counterparts of iterate_collection / page_collection
+async def iterate_dummy_users(start_after=None):
+    for user_id in sorted(users_db):
+        if start_after is None or user_id > start_after:
+            yield user_id, users_db[user_id].model_dump(exclude={"password"})
+
+async def page_dummy_users(limit, start_after=None):
+    users = [user async for user in iterate_dummy_users(start_after)][:limit]
+    return users, (users[-1][0] if len(users) == limit else None)
+
+# Get all users (protected); paginated via ?limit=&cursor=, or streamed with ?format=ndjson
 @router.get("/users/")
-def get_users(current_user: dict = Depends(get_current_user)):
+async def get_users(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    current_user: dict = Depends(get_current_user)
+):
     check_permissions(current_user, ["admin", "caretaker"], "GET_USERS_ATTEMPT")
 
     log_security_event(
@@ -105,11 +138,26 @@ def get_users(current_user: dict = Depends(get_current_user)):
         status="SUCCESS",
         details="Retrieved full user list"
     )
-    return list(users_db.values())
+
+    start_after = decode_cursor(cursor)
+    if format == "ndjson":
+        if USE_DUMMY_DATA:
+            users = iterate_dummy_users(start_after)
+        else:
+            users = iterate_collection("users", start_after, USER_LIST_FIELDS, chunk_size=PAGE_SIZE_MAX)
+        return ndjson_response(user async for _, user in users)
+
+    if USE_DUMMY_DATA:
+        users, next_start = await page_dummy_users(page_size(limit), start_after)
+    else:
+        users, next_start = await page_collection("users", page_size(limit), start_after, USER_LIST_FIELDS)
+    if next_start is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(next_start)
+    return [user for _, user in users]
 
 # Get a specific user by ID (protected)
 @router.get("/users/{user_id}")
-def get_user(user_id: int, current_user: dict = Depends(get_current_user)):
+async def get_user(user_id: int, current_user: dict = Depends(get_current_user)):
     target_user = users_db.get(user_id)
 
     if not target_user:
@@ -136,26 +184,26 @@ def get_user(user_id: int, current_user: dict = Depends(get_current_user)):
 
 # Create a new user (protected)
 @router.post("/users/")
-def create_new_user(request: UserCreateRequest):
-    user_id = generate_unique_user_id()
-    hashed_password = hash_password(request.password)
+async def create_new_user(request: UserCreateRequest):
+    user_id = await generate_unique_user_id()
+    hashed_password = await hash_password_async(request.password)
     
-    create_user(user_id, request.username, hashed_password, request.role)
+    await create_user(user_id, request.username, hashed_password, request.role)
     
     return {"message": f"User {user_id} created."}
 
 # Add connection between users
 @router.post("/users/connect/")
-def connect_to_user(request: ConnectRequest, current_user: dict = Depends(get_current_user)):
+async def connect_to_user(request: ConnectRequest, current_user: dict = Depends(get_current_user)):
     if current_user["role"] == "dependent":
         raise HTTPException(status_code=403, detail="Not authorized to connect users.")
     
-    connect_users(current_user["user_id"], request.connected_user_id, request.role)
-    return {"message": f"User {current_user['user_id']} connected to {request.connected_user_id} as {request.role}."}
+    await connect_users(current_user["id"], request.connected_user_id, request.role)
+    return {"message": f"User {current_user['id']} connected to {request.connected_user_id} as {request.role}."}
 
 @router.post("/delegate_access/")
-def delegate_access(dependent_id: str, current_user: dict = Depends(get_current_user)):
-    if dependent_id not in current_user.connected_users:
+async def delegate_access(dependent_id: str, current_user: dict = Depends(get_current_user)):
+    if dependent_id not in current_user["connected_users"]:
         raise HTTPException(status_code=403, detail="Not authorized")
 
     # Create a short-lived token for the dependent
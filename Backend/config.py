@@ -13,6 +13,132 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 
+# === Principal Cache (resolved users for authenticated requests) ===
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", 10000))
+
+# === Verified Token Cache ===
+# Claims of verified bearer tokens, keyed by a digest of the token and kept until
+# its exp, so repeat requests skip the signature check. 0 disables the cache.
+VERIFIED_TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("VERIFIED_TOKEN_CACHE_MAX_ENTRIES", 10000))
+
+# === Password Hashing ===
+# bcrypt cost factor (log2 rounds) and size of the dedicated hashing process pool.
+# PASSWORD_HASH_WORKERS=0 runs bcrypt on the default threadpool instead.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+
+# === Shared Rate-Limit / Token State ===
+# "memory" keeps state per process; "redis" shares it across workers and containers
+STATE_BACKEND = os.getenv("STATE_BACKEND", "memory").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+STATE_KEY_PREFIX = os.getenv("STATE_KEY_PREFIX", "mymeds")
+
+# === Security Event Logging Pipeline ===
+# Events are queued in memory and written in batches by a background flusher.
+# SECURITY_LOG_OVERFLOW decides what happens when the queue is full:
+#   "spill" appends it to SECURITY_LOG_SPILL_PATH; the flusher replays it later
+#   "drop"  drops the event immediately
+#   "block" waits up to SECURITY_LOG_BLOCK_TIMEOUT seconds, then drops; callers on
+#           the event loop spill instead, so a handler never stalls the loop
+# Spill lines that cannot be parsed on replay are moved to SECURITY_LOG_SPILL_PATH.quarantine
+# A batch the log sink rejects is retried SECURITY_LOG_RETRIES times, waiting
+# SECURITY_LOG_RETRY_BACKOFF seconds and doubling each time, then spilled for replay
+SECURITY_LOG_QUEUE_SIZE = int(os.getenv("SECURITY_LOG_QUEUE_SIZE", 10000))
+SECURITY_LOG_BATCH_SIZE = int(os.getenv("SECURITY_LOG_BATCH_SIZE", 100))
+SECURITY_LOG_FLUSH_INTERVAL = float(os.getenv("SECURITY_LOG_FLUSH_INTERVAL", 1.0))
+SECURITY_LOG_OVERFLOW = os.getenv("SECURITY_LOG_OVERFLOW", "spill").lower()
+SECURITY_LOG_BLOCK_TIMEOUT = float(os.getenv("SECURITY_LOG_BLOCK_TIMEOUT", 0.5))
+SECURITY_LOG_SPILL_PATH = os.getenv("SECURITY_LOG_SPILL_PATH", "security_log_spill.ndjson")
+SECURITY_LOG_RETRIES = int(os.getenv("SECURITY_LOG_RETRIES", 3))
+SECURITY_LOG_RETRY_BACKOFF = float(os.getenv("SECURITY_LOG_RETRY_BACKOFF", 0.5))
+SECURITY_LOG_DRAIN_TIMEOUT = float(os.getenv("SECURITY_LOG_DRAIN_TIMEOUT", 5.0))
+
+# === Listing Pagination ===
+# Page size when a paginated listing is requested without ?limit=, and the hard cap
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", 100))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", 500))
+
+# === Caretaker Fan-out ===
+# Dependents whose medications are read concurrently by one caretaker request
+DEPENDENT_FANOUT_CONCURRENCY = int(os.getenv("DEPENDENT_FANOUT_CONCURRENCY", 16))
+
+# === Dose Schedule ===
+# Per-user dose timelines are cached until the user's medication version changes
+# (checked on every request, so writes on other workers count) or the TTL.
+# Medications without an end date are expanded SCHEDULE_HORIZON_DAYS ahead.
+SCHEDULE_CACHE_TTL_SECONDS = int(os.getenv("SCHEDULE_CACHE_TTL_SECONDS", 3600))
+SCHEDULE_CACHE_MAX_ENTRIES = int(os.getenv("SCHEDULE_CACHE_MAX_ENTRIES", 10000))
+SCHEDULE_HORIZON_DAYS = int(os.getenv("SCHEDULE_HORIZON_DAYS", 366))
+SCHEDULE_MAX_RANGE_DAYS = int(os.getenv("SCHEDULE_MAX_RANGE_DAYS", 366))
+
+# === Dose Adherence ===
+# Events accepted per POST /doses/events (one Firestore transaction, max 500 writes)
+DOSE_EVENT_BATCH_MAX = int(os.getenv("DOSE_EVENT_BATCH_MAX", 200))
+# Event and medication IDs become Firestore document IDs (at most 1500 bytes)
+DOSE_EVENT_ID_MAX_LENGTH = int(os.getenv("DOSE_EVENT_ID_MAX_LENGTH", 128))
+MEDICATION_ID_MAX_LENGTH = int(os.getenv("MEDICATION_ID_MAX_LENGTH", 256))
+
+# === Reminder Dispatch ===
+# Run the in-process reminder scheduler (enable in exactly one worker/instance).
+# The due-index is rebuilt from Firestore every REMINDER_REFRESH_SECONDS.
+REMINDER_SCHEDULER_ENABLED = os.getenv("REMINDER_SCHEDULER_ENABLED", "0") == "1"
+REMINDER_REFRESH_SECONDS = int(os.getenv("REMINDER_REFRESH_SECONDS", 300))
+REMINDER_TICK_SECONDS = int(os.getenv("REMINDER_TICK_SECONDS", 30))
+# Reminder times are wall-clock times in the reminder's "timezone" (an IANA name
+# such as "America/New_York"); reminders saved without one use DEFAULT_TIMEZONE
+DEFAULT_TIMEZONE = os.getenv("DEFAULT_TIMEZONE", "UTC")
+
+# === Bulk Medication Import ===
+BULK_IMPORT_MAX_ROWS = int(os.getenv("BULK_IMPORT_MAX_ROWS", 1000))
+
+# === Medication Listener Cache ===
+# Serve recently active users' medication lists from memory, kept current by
+# Firestore on_snapshot listeners (one open listener per cached user).
+MEDICATION_LISTENER_CACHE = os.getenv("MEDICATION_LISTENER_CACHE", "0") == "1"
+MEDICATION_LISTENER_MAX = int(os.getenv("MEDICATION_LISTENER_MAX", 1000))
+MEDICATION_LISTENER_IDLE_SECONDS = int(os.getenv("MEDICATION_LISTENER_IDLE_SECONDS", 600))
+
+# === Delta Sync ===
+# Tombstones of deleted medications and reminders expire after this many days
+# (Firestore TTL policy on tombstones.expire_at); older sync cursors get a 410.
+SYNC_TOMBSTONE_TTL_DAYS = int(os.getenv("SYNC_TOMBSTONE_TTL_DAYS", 30))
+
+# === OCR / Extraction Cache ===
+# Entries kept in memory per level (image -> OCR text, OCR text -> extraction).
+# Set EXTRACTION_CACHE_DIR to also keep entries on disk across restarts.
+# Disk entries hold label text (PHI): they are encrypted with ENCRYPTION_KEY, not
+# served after EXTRACTION_CACHE_DISK_TTL_SECONDS, and capped at
+# EXTRACTION_CACHE_DISK_MAX_ENTRIES per level (oldest deleted first).
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", 2000))
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR") or None
+EXTRACTION_CACHE_DISK_MAX_ENTRIES = int(os.getenv("EXTRACTION_CACHE_DISK_MAX_ENTRIES", 20000))
+EXTRACTION_CACHE_DISK_TTL_SECONDS = int(os.getenv("EXTRACTION_CACHE_DISK_TTL_SECONDS", 7 * 24 * 3600))
+
+# === Image Extraction Pipeline ===
+# Concurrent Vision + Gemini extractions per worker, and how many more may wait
+# for a slot before /upload-image/ sheds load with a 503.
+EXTRACTION_MAX_CONCURRENCY = int(os.getenv("EXTRACTION_MAX_CONCURRENCY", 4))
+EXTRACTION_MAX_QUEUE = int(os.getenv("EXTRACTION_MAX_QUEUE", 16))
+# Per-stage time limits in seconds (Vision OCR, Gemini categorization)
+EXTRACTION_OCR_TIMEOUT_SECONDS = float(os.getenv("EXTRACTION_OCR_TIMEOUT_SECONDS", 10))
+EXTRACTION_LLM_TIMEOUT_SECONDS = float(os.getenv("EXTRACTION_LLM_TIMEOUT_SECONDS", 20))
+# POST /upload-images/batch: images per request, and images per Vision request / Gemini prompt
+EXTRACTION_BATCH_MAX_IMAGES = int(os.getenv("EXTRACTION_BATCH_MAX_IMAGES", 50))
+EXTRACTION_BATCH_CHUNK_SIZE = int(os.getenv("EXTRACTION_BATCH_CHUNK_SIZE", 8))
+# Most slots one batch may hold at once, so single uploads are not starved behind it
+EXTRACTION_BATCH_SLOTS = int(os.getenv("EXTRACTION_BATCH_SLOTS", 2))
+# Use canned local clients instead of Vision and Gemini (offline development and tests)
+EXTRACTION_STUB_CLIENTS = os.getenv("EXTRACTION_STUB_CLIENTS", "0") == "1"
+
+# === Local OCR Fallback ===
+# When Vision + Gemini fail or run past their time limits, extract with the local
+# CPU engine (AI_Model/inference.py) instead. Local OCR needs pytesseract and the
+# tesseract binary; without them only text Vision already returned is parsed locally.
+LOCAL_OCR_FALLBACK = os.getenv("LOCAL_OCR_FALLBACK", "1") == "1"
+# Time allowed for the local engine once the remote path has failed or timed out
+EXTRACTION_LOCAL_TIMEOUT_SECONDS = float(os.getenv("EXTRACTION_LOCAL_TIMEOUT_SECONDS", 10))
+
 # === Key paths: Always reference project root, not current file ===
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 SECRETS_DIR = os.path.join(PROJECT_ROOT, "Backend", "Secrets")
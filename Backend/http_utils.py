@@ -0,0 +1,70 @@
+import base64
+import hashlib
+import json
+from typing import AsyncIterable, Optional
+
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+
+from Backend.config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Clients may keep a copy but must revalidate it (If-None-Match) before each use
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def encode_cursor(position) -> str:
+    """Opaque, URL-safe cursor for a position in a listing."""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]):
+    if not cursor:
+        return None
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def page_size(limit: Optional[int]) -> int:
+    """Requested page size, defaulted and capped at PAGE_SIZE_MAX."""
+    if limit is None:
+        return PAGE_SIZE_DEFAULT
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    return min(limit, PAGE_SIZE_MAX)
+
+
+def ndjson_response(items: AsyncIterable[dict]) -> StreamingResponse:
+    """Streams one JSON document per line as the items are produced."""
+    async def lines():
+        async for item in items:
+            yield json.dumps(item, default=str) + "\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def etag_for(*parts) -> str:
+    """Strong ETag derived from the given parts (e.g. a collection version and the query)."""
+    digest = hashlib.sha256(json.dumps(parts, default=str, separators=(",", ":")).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for this header)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def etag_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=etag_headers(etag))
@@ -0,0 +1,34 @@
+import importlib
+import threading
+from types import ModuleType
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access.
+
+    Keeps heavy SDKs (Vision, Gemini, NumPy) out of process start-up:
+    `np = LazyModule("numpy")` costs nothing until `np.zeros` is used.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def load(self) -> ModuleType:
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
@@ -1,19 +1,26 @@
 import sys
 import os
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
 
-from fastapi import FastAPI, File, UploadFile
+from fastapi import APIRouter, FastAPI, File, HTTPException, UploadFile
+from typing import List
 
 # App config
-from Backend.config import USE_DUMMY_DATA
+from Backend.config import USE_DUMMY_DATA, EXTRACTION_BATCH_MAX_IMAGES, EXTRACTION_BATCH_CHUNK_SIZE
+from http_utils import ndjson_response
 
 # Middleware
 from Security.rate_limiter import rate_limiter
+from Security.password_hashing import shutdown_password_executor
+from Security.security_logging import shutdown_security_logging
 
 # User routes and auth
+from Users.models import users_db
 from Users.routes import router as Users_router
 from Users.auth import router as auth_router
 from Users.update import router as update_router
@@ -21,42 +28,57 @@ from Users.update import router as update_router
 # Medication routes
 from Medication.routes import router as medication_router
 from Medication.update import router as update_med_router
+from Medication.schedule import router as schedule_router
+from Medication.adherence import router as adherence_router
+from Medication.bulk import router as bulk_medication_router
+from Medication.sync import router as sync_router
 
 # Reminders
 from Reminders.create import router as reminders_router
 from Reminders.get import router as get_reminders_router
+from Reminders.scheduler import start_reminder_scheduler, stop_reminder_scheduler
 
 # AI & Vision
-from AI_Model.vision import extract_text_from_image
+from AI_Model.pipeline import extraction_pipeline, shutdown_extraction_pipeline
+from AI_Model.extraction import MedicineExtraction
+
+# Data access
+from SDK_Database.listener_cache import shutdown_medication_listeners
 
 # Logging / Security
 from TestRoutes.security_log_tests import router as SecurityLogTestRouter
 
-# Initialize FastAPI app
-app = FastAPI()
-
-# Register the rate limiting middleware
-app.middleware("http")(rate_limiter)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Replace "*" with your frontend URL for security
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(Users_router)
-app.include_router(auth_router)
-app.include_router(update_router)
-app.include_router(update_med_router)
-app.include_router(medication_router)
-app.include_router(reminders_router)
-app.include_router(get_reminders_router)
-app.include_router(SecurityLogTestRouter, prefix="/logs")
+async def warm_up_dummy_users():
+    """Builds the dummy users, bcrypt-hashing their passwords, on a worker thread.
+
+    Awaited before the app takes requests: otherwise the first login either
+    pays for the hashing or, while another thread is building them, blocks
+    the event loop on the users' lock.
+    """
+    await asyncio.get_running_loop().run_in_executor(None, len, users_db)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Dispatch due reminders (only when REMINDER_SCHEDULER_ENABLED=1)
+    start_reminder_scheduler()
+    if USE_DUMMY_DATA:
+        await warm_up_dummy_users()
+    yield
+    await stop_reminder_scheduler()
+    # Release the bcrypt worker processes
+    shutdown_password_executor()
+    # Release the image extraction threads
+    shutdown_extraction_pipeline()
+    # Close the medication snapshot listeners
+    shutdown_medication_listeners()
+    # Flush queued security events
+    shutdown_security_logging()
+
+# Routes defined in this module
+router = APIRouter()
 
 # Root endpoint
-@app.get("/")
+@router.get("/")
 def read_root():
     return {
         "message": "Welcome to MyMeds API",
@@ -64,13 +86,72 @@ def read_root():
     }
 
 # Upload endpoint for Vision API
-@app.post("/upload-image/")
+@router.post("/upload-image/")
 async def upload_image(file: UploadFile = File(...)):
     image_content = await file.read()
-    extracted_text = extract_text_from_image(image_content)
-    return {extracted_text}
+    # Vision + Gemini run off the event loop, bounded and with per-stage timeouts
+    extraction = await extraction_pipeline.extract(image_content)
+    if isinstance(extraction, dict):
+        extraction = MedicineExtraction()  # No text on the label: an empty form
+    # The app fills its text inputs from this list of strings
+    return [extraction.as_strings()]
+
+# Batch upload for onboarding many labels at once; one JSON line per image, in completion order
+@router.post("/upload-images/batch")
+async def upload_images_batch(files: List[UploadFile] = File(...)):
+    if len(files) > EXTRACTION_BATCH_MAX_IMAGES:
+        raise HTTPException(status_code=400, detail=f"At most {EXTRACTION_BATCH_MAX_IMAGES} images per batch")
+    images = [await file.read() for file in files]
+    results = extraction_pipeline.extract_batch(images, chunk_size=EXTRACTION_BATCH_CHUNK_SIZE)
+
+    async def lines():
+        async for index, outcome in results:
+            yield {"index": index, "filename": files[index].filename, **outcome}
+
+    return ndjson_response(lines())
 
 # Optional route to confirm rate limit isn't triggered
-@app.get("/rate-limit-test")
+@router.get("/rate-limit-test")
 def rate_limit_test():
     return {"message": "Request successful"}
+
+
+def create_app() -> FastAPI:
+    """Builds the API: middleware and routers only.
+
+    Nothing here (or in the imports above) contacts an external service:
+    the Firebase, Vision, Gemini and Cloud Logging clients, and in dummy
+    mode the dummy users, are created on first use. Measure with
+    Scripts/Benchmarks/bench_startup.py.
+    """
+    app = FastAPI(lifespan=lifespan)
+
+    # Register the rate limiting middleware
+    app.middleware("http")(rate_limiter)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # Replace "*" with your frontend URL for security
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Include routers
+    app.include_router(Users_router)
+    app.include_router(auth_router)
+    app.include_router(update_router)
+    app.include_router(update_med_router)
+    app.include_router(medication_router)
+    app.include_router(schedule_router)
+    app.include_router(adherence_router)
+    app.include_router(bulk_medication_router)
+    app.include_router(sync_router)
+    app.include_router(reminders_router)
+    app.include_router(get_reminders_router)
+    app.include_router(SecurityLogTestRouter, prefix="/logs")
+    app.include_router(router)
+    return app
+
+
+# `uvicorn main:app`
+app = create_app()
@@ -0,0 +1,272 @@
+"""
+Concurrent request capacity of the real app: GET /medications/ before and after the async data layer.
+
+Imports main.app from a source tree and serves it against an in-memory
+Firestore emulation in which every round trip (a query's stream()/get()
+or a document get()) takes --latency seconds: time.sleep() on the
+blocking client, asyncio.sleep() on the AsyncClient. Firebase, Vision and
+Cloud Logging clients are replaced before `import main`, so no
+credentials or network are needed; each security log write takes
+--log-latency seconds, as a synchronous Cloud Logging call would.
+
+Every request authenticates as its own user (the principal cache is
+pre-filled and each user has its own token), so the rate limiter never
+answers and the auth path does no Firestore read; the route reads the
+user's medication documents and whatever else that tree reads with them.
+
+    python Scripts/Benchmarks/bench_async_routes.py --requests 400 --concurrency 200
+    python Scripts/Benchmarks/bench_async_routes.py --before 7b04719^
+
+With --before REV, REV is exported with `git archive` into a temporary
+directory and both it and this tree are measured, each in a fresh
+interpreter.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+MEDICATIONS_PER_USER = 8
+USER_ID = "1"
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeQuery:
+    """A collection or query; filters, ordering and projections are accepted and ignored."""
+
+    def __init__(self, client, path):
+        self._client = client
+        self._path = path
+
+    def select(self, *args, **kwargs):
+        return self
+    where = order_by = limit = start_after = select
+
+    def document(self, doc_id=None):
+        return FakeDocument(self._client, self._path, doc_id or "generated")
+
+    def _snapshots(self):
+        docs = self._client.collections.get(self._path, {})
+        return [FakeSnapshot(doc_id, data) for doc_id, data in sorted(docs.items())]
+
+    def stream(self, *args, **kwargs):
+        return self._astream() if self._client.asynchronous else self._stream()
+
+    def get(self, *args, **kwargs):
+        return self._aget() if self._client.asynchronous else self._get()
+
+    def _stream(self):
+        time.sleep(self._client.latency)
+        yield from self._snapshots()
+
+    async def _astream(self):
+        await asyncio.sleep(self._client.latency)
+        for snapshot in self._snapshots():
+            yield snapshot
+
+    def _get(self):
+        time.sleep(self._client.latency)
+        return self._snapshots()
+
+    async def _aget(self):
+        await asyncio.sleep(self._client.latency)
+        return self._snapshots()
+
+
+class FakeDocument:
+    def __init__(self, client, collection, doc_id):
+        self._client = client
+        self._collection = collection
+        self.id = doc_id
+
+    def collection(self, name):
+        return FakeQuery(self._client, f"{self._collection}/{self.id}/{name}")
+
+    def _snapshot(self):
+        return FakeSnapshot(self.id, self._client.collections.get(self._collection, {}).get(self.id))
+
+    def get(self, *args, **kwargs):
+        return self._aget() if self._client.asynchronous else self._get()
+
+    def _get(self):
+        time.sleep(self._client.latency)
+        return self._snapshot()
+
+    async def _aget(self):
+        await asyncio.sleep(self._client.latency)
+        return self._snapshot()
+
+
+class FakeFirestore:
+    """Stands in for firestore.client() / firestore_async.client(); read-only."""
+
+    def __init__(self, collections, latency: float, asynchronous: bool):
+        self.collections = collections
+        self.latency = latency
+        self.asynchronous = asynchronous
+
+    def collection(self, path):
+        return FakeQuery(self, path)
+
+    def collection_group(self, name):
+        return FakeQuery(self, name)
+
+    def document(self, path):
+        collection, _, doc_id = path.rpartition("/")
+        return FakeDocument(self, collection, doc_id)
+
+
+class FakeCloudLogger:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def log_struct(self, *args, **kwargs):
+        time.sleep(self.latency)
+
+
+def seed_collections() -> dict:
+    medications = {
+        f"Medication {i}": {
+            "name": f"Medication {i}", "dosage": "10mg", "frequency": "1", "instructions": "Once daily",
+            "pill_count": "30", "times": ["08:00"], "days": ["Monday", "Thursday"],
+        }
+        for i in range(MEDICATIONS_PER_USER)
+    }
+    return {
+        "users": {USER_ID: {"user_id": USER_ID, "username": "bench", "meds_version": 1}},
+        f"users/{USER_ID}/medications": medications,
+    }
+
+
+def install_fakes(latency: float, log_latency: float):
+    """Replaces the Google clients every tree builds, before any of its modules are imported."""
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+    from google.cloud import logging as gcp_logging
+    from google.cloud import vision
+
+    collections = seed_collections()
+    firebase_admin.initialize_app = lambda *args, **kwargs: None
+    credentials.Certificate = lambda *args, **kwargs: None
+    firestore.client = lambda *args, **kwargs: FakeFirestore(collections, latency, asynchronous=False)
+    try:
+        from firebase_admin import firestore_async
+        firestore_async.client = lambda *args, **kwargs: FakeFirestore(collections, latency, asynchronous=True)
+    except ImportError:
+        pass
+
+    cloud_logger = FakeCloudLogger(log_latency)
+    gcp_logging.Client = lambda *args, **kwargs: type("FakeLoggingClient", (), {"logger": lambda self, name: cloud_logger})()
+    vision.ImageAnnotatorClient.from_service_account_json = staticmethod(lambda *args, **kwargs: None)
+
+
+def load_app(tree: str):
+    os.environ.setdefault("SDK_KEY", os.path.join(PROJECT_ROOT, "your-key-file.json"))
+    os.environ.setdefault("HMAC_KEY", "bench")
+    os.environ.setdefault("ENCRYPTION_KEY", "bench")
+    os.environ["USE_DUMMY_DATA"] = "0"
+    sys.path[:0] = [tree, os.path.join(tree, "Backend")]
+
+    import main
+    from Security.token_manager import create_access_token
+    from SDK_Database.user_cache import principal_cache
+    return main.app, create_access_token, principal_cache
+
+
+async def drive(app, headers, concurrency: int) -> float:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(request_headers):
+            async with semaphore:
+                response = await client.get("/medications/", headers=request_headers)
+                response.raise_for_status()
+                assert len(response.json()) == MEDICATIONS_PER_USER
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(h) for h in headers))
+        return time.perf_counter() - start
+
+
+def measure(tree: str, args, label: str):
+    install_fakes(args.latency, args.log_latency)
+    app, create_access_token, principal_cache = load_app(tree)
+    # Silence the local fallback logger some trees print every event to
+    import logging
+    logging.getLogger("fallback-logger").setLevel(logging.WARNING)
+
+    def headers(first, count):
+        result = []
+        for i in range(first, first + count):
+            principal_cache.set(f"bench-{i}", {"user_id": USER_ID, "connected_users": {}})
+            token = create_access_token({"sub": f"bench-{i}", "role": "basic"})
+            result.append({"Authorization": f"Bearer {token}"})
+        return result
+
+    warm_up = min(args.concurrency, args.requests)
+    asyncio.run(drive(app, headers(0, warm_up), args.concurrency))
+    elapsed = asyncio.run(drive(app, headers(warm_up, args.requests), args.concurrency))
+    print(f"{label:28s} {elapsed:7.2f} s  {args.requests / elapsed:8.1f} req/s", flush=True)
+
+
+def export_revision(rev: str, directory: str) -> str:
+    archive = subprocess.run(["git", "archive", rev], cwd=PROJECT_ROOT, capture_output=True, check=True).stdout
+    path = os.path.join(directory, "tree")
+    with tempfile.TemporaryFile() as buffer:
+        buffer.write(archive)
+        buffer.seek(0)
+        with tarfile.open(fileobj=buffer) as tar:
+            tar.extractall(path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="emulated Firestore round trip in seconds")
+    parser.add_argument("--log-latency", type=float, default=0.0, help="emulated Cloud Logging write in seconds")
+    parser.add_argument("--before", metavar="REV", help="git revision to measure alongside this tree")
+    parser.add_argument("--tree", help=argparse.SUPPRESS)
+    parser.add_argument("--label", default="this tree", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.tree:
+        measure(args.tree, args, args.label)
+        return
+
+    print(f"GET /medications/: {args.requests} requests, {args.concurrency} concurrent, "
+          f"{args.latency * 1000:.0f} ms Firestore round trip, {args.log_latency * 1000:.0f} ms log write")
+
+    with tempfile.TemporaryDirectory() as directory:
+        trees = [(f"before ({args.before})", export_revision(args.before, directory))] if args.before else []
+        trees.append(("this tree", PROJECT_ROOT))
+        for label, tree in trees:
+            command = [
+                sys.executable, os.path.abspath(__file__), "--tree", tree, "--label", label,
+                "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+                "--latency", str(args.latency), "--log-latency", str(args.log_latency),
+            ]
+            # Run from the tree's Backend/ so each tree finds its own relative paths
+            subprocess.run(command, cwd=os.path.join(tree, "Backend"), check=True)
+
+
+if __name__ == "__main__":
+    main()
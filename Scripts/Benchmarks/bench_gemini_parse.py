@@ -0,0 +1,132 @@
+"""
+Gemini extraction parsing: parse time and failure rate over recorded responses, before vs after schema mode.
+
+fixtures/gemini_responses.json holds responses in the shapes the
+categorizer receives: schema-mode JSON, JSON wrapped in code fences, the
+older "- Field: value" line format (plain and **bold**), truncated
+output and refusals. Each has the extraction a correct parser returns,
+or null when the response should be reported as a failure.
+
+Before: five response_text.split() passes per response, returning empty
+fields (never an error) for anything it cannot read. After: one
+json.loads (or one regex pass for the line format) into a typed
+MedicineExtraction, raising ExtractionParseError for unusable responses.
+
+Also timed: building the prompt (f-string per call vs a cached prefix)
+and getting the model (new GenerativeModel per call vs the cached one).
+
+    python Scripts/Benchmarks/bench_gemini_parse.py --rounds 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path[:0] = [PROJECT_ROOT, os.path.join(PROJECT_ROOT, "Backend")]
+
+from AI_Model import gemini
+from AI_Model.extraction import EXTRACTION_FIELDS, ExtractionParseError, MedicineExtraction, parse_extraction
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "gemini_responses.json")
+LABEL_TEXT = "LISINOPRIL 10 MG TABLETS\nTAKE 1 TABLET BY MOUTH ONCE DAILY\nQTY: 30   REFILLS: 2"
+
+
+def legacy_parse(response_text: str) -> tuple:
+    # The line-splitting parser categorize_medicine_text used before schema mode
+    medicine_name = dosage = instructions = pill_count = frequency = ""
+    if "Medicine Name:" in response_text:
+        medicine_name = response_text.split("Medicine Name:")[1].split("\n")[0].strip()
+    if "Dosage:" in response_text:
+        dosage = response_text.split("Dosage:")[1].split("\n")[0].strip()
+    if "Instructions:" in response_text:
+        instructions = response_text.split("Instructions:")[1].split("\n")[0].strip()
+    if "PillCount:" in response_text:
+        pill_count = response_text.split("PillCount:")[1].split("\n")[0].strip()
+    if "Frequency:" in response_text:
+        frequency = response_text.split("Frequency:")[1].split("\n")[0].strip()
+    return medicine_name, dosage, instructions, pill_count, frequency
+
+
+def legacy_prompt(extracted_text: str) -> str:
+    # Same size as the old per-call f-string
+    return f"""
+Extract the following information from the text below:
+{gemini._INSTRUCTIONS}
+Text to extract from:
+{extracted_text}
+
+Return the output in this exact format:
+- Medicine Name: [medicine_name]
+- Dosage: [dosage]
+- Instructions: [full instructions with timing]
+- PillCount: [pill_count as a number]
+- Frequency: [frequency as a number]
+"""
+
+
+def evaluate(parse, corpus):
+    """(correct, wrong values returned, failures raised) over the corpus."""
+    correct = wrong = raised = 0
+    for response in corpus:
+        expected = response["expected"]
+        try:
+            # Compared as the text the app receives, since the legacy parser only returns strings
+            got = dict(zip(EXTRACTION_FIELDS, MedicineExtraction._make(parse(response["text"])).as_strings()))
+        except ExtractionParseError:
+            raised += 1
+            correct += expected is None
+            continue
+        if expected is not None and got == expected:
+            correct += 1
+        else:
+            wrong += 1
+    return correct, wrong, raised
+
+
+def per_call_us(func, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    with open(FIXTURES, encoding="utf-8") as f:
+        corpus = json.load(f)
+    texts = [response["text"] for response in corpus]
+
+    def safe(parse):
+        def run():
+            for text in texts:
+                try:
+                    parse(text)
+                except ExtractionParseError:
+                    pass
+        return run
+
+    print(f"{len(corpus)} recorded responses")
+    print(f"{'parser':<10}{'us/response':>13}{'correct':>9}{'silently wrong':>16}{'reported':>10}")
+    for name, parse in (("before", legacy_parse), ("after", parse_extraction)):
+        correct, wrong, raised = evaluate(parse, corpus)
+        us = per_call_us(safe(parse), args.rounds) / len(corpus)
+        print(f"{name:<10}{us:>13.2f}{correct / len(corpus):>9.0%}{wrong / len(corpus):>16.0%}{raised:>10}")
+
+    print()
+    print(f"{'per call':<34}{'before us':>10}{'after us':>10}")
+    before = per_call_us(lambda: legacy_prompt(LABEL_TEXT), args.rounds)
+    after = per_call_us(lambda: gemini.EXTRACTION_PROMPT + LABEL_TEXT, args.rounds)
+    print(f"{'build prompt':<34}{before:>10.2f}{after:>10.2f}")
+    gemini.genai.load()  # The SDK is imported on first use; keep that out of the timing
+    before = per_call_us(lambda: gemini.genai.GenerativeModel(gemini.GEMINI_MODEL), max(args.rounds // 10, 1))
+    after = per_call_us(gemini.get_model, args.rounds)
+    print(f"{'get GenerativeModel':<34}{before:>10.2f}{after:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Local OCR fallback vs the remote Vision + Gemini path: throughput and field accuracy on label fixtures.
+
+Each fixture in fixtures/label_fixtures.json is a label's text, the skew
+it is photographed at and the fields a correct extraction returns. The
+labels are rendered to images here (with the skew and some sensor noise),
+so the set needs no binary files and is the same on every run.
+
+Stages measured:
+  parser      the regex parser on the exact label text (upper bound for the local engine)
+  preprocess  grayscale, deskew and threshold; reports the deskew error in degrees
+  local       preprocess + local OCR + parser, end to end (needs pytesseract and tesseract)
+  remote      uncached Vision OCR + Gemini, end to end (only with --remote and credentials)
+
+Accuracy is the share of medicine_name, dosage, pill_count and frequency
+values that match the fixture (case and spacing ignored).
+
+    python Scripts/Benchmarks/bench_local_ocr.py --rounds 5 --remote
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path[:0] = [PROJECT_ROOT, os.path.join(PROJECT_ROOT, "Backend")]
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from AI_Model.inference import local_engine, parse_label_text, preprocess
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "label_fixtures.json")
+FIELDS = ("medicine_name", "dosage", "instructions", "pill_count", "frequency")
+SCORED_FIELDS = ("medicine_name", "dosage", "pill_count", "frequency")
+
+
+def render_label(text: str, skew: float, seed: int) -> bytes:
+    font = ImageFont.load_default(size=28)
+    lines = text.splitlines()
+    image = Image.new("L", (960, 60 + 42 * len(lines)), 250)
+    ImageDraw.Draw(image).multiline_text((30, 30), text, fill=30, font=font, spacing=12)
+    image = image.rotate(skew, expand=True, fillcolor=250, resample=Image.BICUBIC)
+
+    noisy = np.asarray(image, dtype=np.float32) + np.random.default_rng(seed).normal(0, 12, image.size[::-1])
+    buffer = io.BytesIO()
+    Image.fromarray(np.clip(noisy, 0, 255).astype(np.uint8)).save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def normalize(field: str, value) -> str:
+    value = " ".join(str(value or "").split()).casefold()
+    if field == "frequency":
+        try:
+            return f"{round(float(value), 2):g}"
+        except ValueError:
+            pass
+    return value
+
+
+def score(extractions, fixtures) -> float:
+    matched = total = 0
+    for extraction, fixture in zip(extractions, fixtures):
+        got = dict(zip(FIELDS, extraction)) if isinstance(extraction, (tuple, list)) else {}
+        for field in SCORED_FIELDS:
+            total += 1
+            matched += normalize(field, got.get(field)) == normalize(field, fixture["expected"][field])
+    return matched / total
+
+
+def timed(func, items, rounds: int):
+    results = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        results = [func(item) for item in items]
+    elapsed = (time.perf_counter() - start) / rounds
+    return results, len(items) / elapsed
+
+
+def report(stage: str, per_second: float, accuracy=None, note: str = ""):
+    accuracy = f"{accuracy:.0%}" if accuracy is not None else "-"
+    print(f"{stage:<12}{per_second:>14.1f}{accuracy:>10}   {note}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--remote", action="store_true", help="also run Vision + Gemini (needs credentials)")
+    args = parser.parse_args()
+
+    with open(FIXTURES, encoding="utf-8") as f:
+        fixtures = json.load(f)
+    images = [render_label(fixture["text"], fixture["skew"], seed) for seed, fixture in enumerate(fixtures)]
+
+    print(f"{len(fixtures)} label fixtures")
+    print(f"{'stage':<12}{'labels/s':>14}{'accuracy':>10}")
+
+    parsed, per_second = timed(parse_label_text, [fixture["text"] for fixture in fixtures], args.rounds * 100)
+    report("parser", per_second, score(parsed, fixtures), "exact label text")
+
+    processed, per_second = timed(preprocess, images, args.rounds)
+    # The image was rotated counter-clockwise by `skew`, which estimate_skew reports as clockwise -skew
+    errors = [abs(skew + fixture["skew"]) for (_, skew), fixture in zip(processed, fixtures)]
+    report("preprocess", per_second, note=f"deskew error mean {np.mean(errors):.2f} deg, max {max(errors):.2f} deg")
+
+    if local_engine.available:
+        extracted, per_second = timed(local_engine.extract, images, args.rounds)
+        report("local", per_second, score(extracted, fixtures), f"OCR backend: {local_engine.backend.name}")
+    else:
+        print(f"{'local':<12}{'skipped':>14}{'-':>10}   install pytesseract and the tesseract binary")
+
+    if args.remote:
+        from AI_Model.vision import ocr_image
+        from AI_Model.gemini import categorize_medicine_text
+        extracted, per_second = timed(lambda image: categorize_medicine_text(ocr_image(image)), images, 1)
+        report("remote", per_second, score(extracted, fixtures), "Vision + Gemini, uncached")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Bytes transferred and per-user latency of medication listings: full documents vs projected views.
+
+The old listings streamed whole medication documents and copied the
+fields they needed in a per-request closure. The shared read path asks
+Firestore for the view's source fields only (a select() projection) and
+renders them through a precomputed MedicationView.
+
+Documents are encoded as the Firestore wire protobuf, so the byte counts
+are what each listing receives. Latency covers deserializing a user's
+documents and rendering the response, which is the client-side work that
+grows with the bytes transferred. Network round-trip time is not included.
+
+    python Scripts/Benchmarks/bench_medication_views.py --meds-per-user 20
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path[:0] = [PROJECT_ROOT, os.path.join(PROJECT_ROOT, "Backend")]
+
+from google.cloud.firestore_v1 import _helpers
+from google.cloud.firestore_v1.types import Document
+
+from Medication.views import MEDICATION_LIST_VIEW, MEDICATION_PAGE_VIEW
+
+
+def stored_medication(i: int) -> dict:
+    # Same shape as SDK_Database.Create.add_medication writes
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return {
+        "name": f"Medication {i}",
+        "dosage": "500mg",
+        "frequency": 2,
+        "instructions": "Take one tablet by mouth twice daily with food. Do not crush or chew. "
+                        "Avoid alcohol. Contact your pharmacist if you miss more than one dose.",
+        "pill_count": 60,
+        "times": ["08:00", "20:00"],
+        "days": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
+        "taken": False,
+        "pillShape": "capsule",
+        "pillColorLeft": "#FF0000",
+        "pillColorRight": "#FFFFFF",
+        "pillColor": "#FFFFFF",
+        "backgroundColor": "#D9D9D9",
+        "start_date": "2025-01-01",
+        "end_date": "2025-01-30",
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def encode(med: dict, fields=None) -> bytes:
+    if fields is not None:
+        med = {field: med[field] for field in fields if field in med}
+    return Document.serialize(Document(name="projects/p/databases/(default)/documents/users/1/medications/m",
+                                       fields=_helpers.encode_dict(med)))
+
+
+def legacy_transform(med: dict) -> dict:
+    # The per-request closure the /medicationsmedpage/ handler used to build
+    return {
+        "name": med.get("name", ""),
+        "dosage": med.get("dosage", ""),
+        "quantity": med.get("pill_count", 0),
+        "timesPerDay": med.get("frequency", 0),
+        "times": med.get("times", []),
+        "days": med.get("days", []),
+        "startDate": med.get("start_date", ""),
+        "endDate": med.get("end_date", ""),
+        "taken": False,
+        "pillShape": med.get("pillShape", "circle"),
+        "pillColorLeft": med.get("pillColorLeft", "#FFFFFF"),
+        "pillColorRight": med.get("pillColorRight", "#FFFFFF"),
+        "pillColor": med.get("pillColor", "#FFFFFF"),
+        "backgroundColor": med.get("backgroundColor", "#D9D9D9")
+    }
+
+
+def time_listing(payloads, render, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        [render(_helpers.decode_dict(Document.deserialize(payload).fields, None)) for payload in payloads]
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--meds-per-user", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    meds = [stored_medication(i) for i in range(args.meds_per_user)]
+    full = [encode(med) for med in meds]
+    full_bytes = sum(map(len, full))
+    full_ms = time_listing(full, legacy_transform, args.rounds) * 1e3
+
+    print(f"{args.meds_per_user} medications per user")
+    print(f"{'listing':<28}{'bytes/user':>12}{'ms/user':>10}")
+    print(f"{'full documents (before)':<28}{full_bytes:>12}{full_ms:>10.3f}")
+    for view in (MEDICATION_LIST_VIEW, MEDICATION_PAGE_VIEW):
+        projected = [encode(med, view.source_fields) for med in meds]
+        projected_bytes = sum(map(len, projected))
+        projected_ms = time_listing(projected, view.render, args.rounds) * 1e3
+        label = f"{view.name} view (projected)"
+        print(f"{label:<28}{projected_bytes:>12}{projected_ms:>10.3f}"
+              f"   {1 - projected_bytes / full_bytes:.0%} fewer bytes")
+
+
+if __name__ == "__main__":
+    main()
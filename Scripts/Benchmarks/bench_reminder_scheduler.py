@@ -0,0 +1,79 @@
+"""
+Reminder due-index: rebuild time, cost per due reminder and memory at 100k+ active reminders.
+
+Loads N reminders with random times, weekdays and timezones, as a rebuild
+from a Firestore snapshot would, then replays a simulated day minute by minute.
+Each popped reminder is rescheduled at its next occurrence, so the heap
+stays at N entries. The cost per pop should grow with log N, not with N.
+
+    python Scripts/Benchmarks/bench_reminder_scheduler.py --sizes 100000 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path[:0] = [PROJECT_ROOT, os.path.join(PROJECT_ROOT, "Backend")]
+os.environ.setdefault("USE_DUMMY_DATA", "1")
+
+from Reminders.scheduler import ReminderScheduler
+from Reminders.notifiers import InMemoryNotifier
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+TIMEZONES = [None, "America/New_York", "America/Los_Angeles", "Europe/Berlin", "Asia/Kolkata"]
+
+
+def make_reminders(count: int):
+    rng = random.Random(42)
+    for i in range(count):
+        times = [f"{rng.randrange(24):02d}:{rng.choice((0, 15, 30, 45)):02d}" for _ in range(rng.randint(1, 3))]
+        days = ["Everyday"] if rng.random() < 0.6 else rng.sample(DAYS, rng.randint(1, 5))
+        yield f"users/user_{i}/medications/med/reminders/r{i}", {
+            "user_id": f"user_{i}", "med_id": "med", "times": times, "days": days,
+            "timezone": rng.choice(TIMEZONES), "status": "active"
+        }
+
+
+def bench(count: int):
+    start_of_day = datetime(2025, 1, 6, tzinfo=timezone.utc)
+    reminders = list(make_reminders(count))
+    scheduler = ReminderScheduler(InMemoryNotifier(), clock=lambda: start_of_day)
+
+    started = time.perf_counter()
+    scheduler.load(reminders, now=start_of_day)
+    load_seconds = time.perf_counter() - started
+
+    # Measured on a second load, since tracing slows the timed one down
+    tracemalloc.start()
+    traced = ReminderScheduler(InMemoryNotifier())
+    traced.load(reminders, now=start_of_day)
+    index_bytes = tracemalloc.get_traced_memory()[0]
+    del traced
+    tracemalloc.stop()
+
+    popped = 0
+    started = time.perf_counter()
+    for minute in range(24 * 60):
+        popped += len(scheduler.pop_due(start_of_day + timedelta(minutes=minute)))
+    pop_seconds = time.perf_counter() - started
+    return load_seconds, index_bytes, popped, pop_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    args = parser.parse_args()
+
+    print(f"{'reminders':>10}{'rebuild s':>11}{'index MB':>10}{'due/day':>10}{'us/pop':>8}")
+    for count in args.sizes:
+        load_seconds, index_bytes, popped, pop_seconds = bench(count)
+        print(f"{count:>10}{load_seconds:>11.2f}{index_bytes / 1e6:>10.1f}{popped:>10}"
+              f"{pop_seconds / max(popped, 1) * 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Cold start: time to import Backend/main.py and build the app, checked against a budget.
+
+Each round starts a fresh interpreter with `python -X importtime -c "import
+main"` (dummy data mode), so nothing is cached between rounds except the
+OS file cache. Reported:
+
+  import main     cumulative import time of main, from -X importtime (median of the rounds)
+  create_app()    building a second app from the already imported modules
+  interpreter     `python -c pass`, the floor no import work can go below
+  heaviest        top-level packages by their own (self) import time
+  deferred        SDKs that must not load at import (Vision, Gemini, Cloud Logging, Firestore, NumPy, PIL)
+
+Exits with status 1 when the median import time is over --budget-ms or a
+deferred SDK was imported, so it can gate CI.
+
+    python Scripts/Benchmarks/bench_startup.py --rounds 5 --budget-ms 1000
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+BACKEND = os.path.join(PROJECT_ROOT, "Backend")
+
+# Loaded on first use; importing any of them at start-up is a regression
+DEFERRED_MODULES = (
+    "google.cloud.vision", "google.generativeai", "google.cloud.logging", "google.cloud.firestore",
+    "google.api_core.exceptions", "numpy", "PIL.Image",
+)
+
+
+def environment() -> dict:
+    env = dict(os.environ)
+    env.setdefault("USE_DUMMY_DATA", "1")
+    env.setdefault("SDK_KEY", os.path.join(PROJECT_ROOT, "your-key-file.json"))
+    env.setdefault("HMAC_KEY", "bench")
+    env.setdefault("ENCRYPTION_KEY", "bench")
+    env["PYTHONPATH"] = os.pathsep.join([PROJECT_ROOT, BACKEND, env.get("PYTHONPATH", "")])
+    return env
+
+
+def run(code: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    args = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code]
+    result = subprocess.run(args, cwd=BACKEND, env=environment(), capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"`{code}` failed:\n{result.stderr[-2000:]}")
+    return result
+
+
+def parse_importtime(stderr: str):
+    """{module: (self_us, cumulative_us)} from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def wall_ms(code: str) -> float:
+    start = time.perf_counter()
+    run(code)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="import budget for main (median)")
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    imports, builds, runs = [], [], []
+    for _ in range(args.rounds):
+        runs.append(parse_importtime(run("import main", importtime=True).stderr))
+        imports.append(runs[-1]["main"][1] / 1000)
+        output = run(
+            "import time, main\n"
+            "start = time.perf_counter(); main.create_app(); print((time.perf_counter() - start) * 1000)"
+        ).stdout
+        builds.append(float(output.strip().splitlines()[-1]))
+    interpreter = statistics.median(wall_ms("pass") for _ in range(args.rounds))
+    total = statistics.median(wall_ms("import main") for _ in range(args.rounds))
+
+    median_import = statistics.median(imports)
+    print(f"{'import main':<16}{median_import:>9.0f} ms   (budget {args.budget_ms:.0f} ms, min {min(imports):.0f}, max {max(imports):.0f})")
+    print(f"{'create_app()':<16}{statistics.median(builds):>9.1f} ms")
+    print(f"{'interpreter':<16}{interpreter:>9.0f} ms   (process wall time with main: {total:.0f} ms)")
+
+    by_package = defaultdict(int)
+    for name, (self_us, _) in runs[-1].items():
+        by_package[name.split(".")[0]] += self_us
+    print("\nheaviest packages (self import time)")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {package:<28}{self_us / 1000:>8.1f} ms")
+
+    loaded = [name for name in DEFERRED_MODULES if name in runs[-1]]
+    print("\ndeferred SDKs imported at start-up:", ", ".join(loaded) or "none")
+
+    if median_import > args.budget_ms or loaded:
+        print("\nFAIL: over budget" if median_import > args.budget_ms else "\nFAIL: deferred SDK imported")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Memory per revoked token: full-JWT sets vs self-expiring jti entries.
+
+The old blacklist kept every encoded JWT string in a Python set forever.
+The state backend keeps jti -> exp, drops entries once the token would have
+expired anyway.
+
+    python Scripts/Benchmarks/bench_token_blacklist.py --tokens 100000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path[:0] = [PROJECT_ROOT, os.path.join(PROJECT_ROOT, "Backend")]
+
+from Security import token_manager
+from Security.state_backend import InMemoryStateBackend, StateBatch
+
+
+def measure(build) -> tuple:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    keep = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    used = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return used, keep
+
+
+def time_lookups(backend, jtis) -> float:
+    start = time.perf_counter()
+    for jti in jtis:
+        batch = StateBatch()
+        batch.is_revoked("access", jti)
+        backend.execute(batch)
+    return (time.perf_counter() - start) / len(jtis) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens", type=int, default=100_000)
+    args = parser.parse_args()
+
+    tokens = [token_manager.create_access_token({"sub": f"user_{i}", "role": "basic"}) for i in range(args.tokens)]
+    revocations = [token_manager.get_revocation_id(token) for token in tokens]
+
+    # Copies, so each structure is charged for the strings it would own in production
+    legacy_bytes, _ = measure(lambda: {(token + " ")[:-1] for token in tokens})
+
+    def build_backend():
+        backend = InMemoryStateBackend()
+        for jti, exp in revocations:
+            backend.revoke("access", (jti + " ")[:-1], expires_at=exp)
+        return backend
+
+    jti_bytes, backend = measure(build_backend)
+
+    print(f"{args.tokens:,} revoked access tokens")
+    print(f"{'set of encoded JWTs':28s} {legacy_bytes / args.tokens:7.0f} B/token  (never released)")
+    print(f"{'jti -> exp + expiry heap':28s} {jti_bytes / args.tokens:7.0f} B/token  (released at exp)")
+
+    # Lookups mostly ask about tokens that were never revoked
+    fresh = [token_manager.get_revocation_id(token_manager.create_access_token({"sub": "x", "role": "basic"}))[0]
+             for _ in range(20_000)]
+    print(f"\nnot-revoked lookup: {time_lookups(backend, fresh):.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
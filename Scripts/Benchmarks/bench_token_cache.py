@@ -0,0 +1,64 @@
+"""
+Auth overhead per request: verifying the bearer token every time vs the verified-token cache.
+
+Replays the token work an authenticated request does before reaching the
+route: the revocation lookup (jti from the token's claims, then the state
+backend) and decode_token. Tokens are drawn from a pool of --users active
+sessions, so every token repeats the way a client's bearer token does.
+
+  uncached   verified_token_cache cleared before each request (signature check every time)
+  cached     the cache left warm (first request per token verifies, the rest hit)
+
+    python Scripts/Benchmarks/bench_token_cache.py --requests 50000 --users 500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path[:0] = [PROJECT_ROOT, os.path.join(PROJECT_ROOT, "Backend")]
+
+from Security import token_manager
+
+
+def authenticate(token: str) -> dict:
+    if token_manager.is_token_blacklisted(token):
+        raise RuntimeError("revoked")
+    return token_manager.decode_token(token)
+
+
+def time_requests(tokens, cached: bool) -> float:
+    cache = token_manager.verified_token_cache
+    cache.clear()
+    start = time.perf_counter()
+    for token in tokens:
+        if not cached:
+            cache.clear()
+        authenticate(token)
+    return (time.perf_counter() - start) / len(tokens) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50_000)
+    parser.add_argument("--users", type=int, default=500)
+    args = parser.parse_args()
+
+    pool = [token_manager.create_access_token({"sub": f"user_{i}", "role": "basic"}) for i in range(args.users)]
+    rng = random.Random(0)
+    tokens = [rng.choice(pool) for _ in range(args.requests)]
+
+    uncached = time_requests(tokens, cached=False)
+    cached = time_requests(tokens, cached=True)
+    stats = token_manager.verified_token_cache.stats()
+
+    print(f"{args.requests:,} requests from {args.users:,} sessions ({token_manager.JWT_ALGORITHM})")
+    print(f"{'uncached':10s} {uncached:7.1f} us/request")
+    print(f"{'cached':10s} {cached:7.1f} us/request  ({stats['size']:,} signature checks, one per session)")
+    print(f"\nsaved {uncached - cached:.1f} us/request ({uncached / cached:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
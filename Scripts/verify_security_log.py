@@ -0,0 +1,66 @@
+"""
+Verify the hash chain and batch signatures of an exported security log.
+
+Reads one batch record per line, either as written by the fallback logger
+(text prefix, then JSON) or from a Cloud Logging export where each line
+wraps a record in "jsonPayload". The file is streamed, so memory stays flat however large
+the export is. Exits with status 1 if any batch was altered, removed or
+reordered.
+
+    python Scripts/verify_security_log.py security-logs.ndjson
+    gcloud logging read 'logName:"security-logs"' --format=json --order=asc | jq -c '.[]' \\
+        | python Scripts/verify_security_log.py -
+"""
+import argparse
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path[:0] = [PROJECT_ROOT, os.path.join(PROJECT_ROOT, "Backend")]
+
+from Security.log_chain import verify_records
+
+DEFAULT_KEY_FILE = os.path.join(PROJECT_ROOT, "Backend", "Secrets", "hmac.key")
+
+
+def load_key(key_file: str) -> str:
+    if key_file:
+        with open(key_file, "r") as f:
+            return f.read().strip()
+    if os.getenv("HMAC_KEY"):
+        return os.getenv("HMAC_KEY")
+    if os.path.exists(DEFAULT_KEY_FILE):
+        return load_key(DEFAULT_KEY_FILE)
+    raise SystemExit("No HMAC key found. Pass --key-file, set HMAC_KEY or create Backend/Secrets/hmac.key")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="NDJSON log export, or - for stdin")
+    parser.add_argument("--key-file", help="File holding the HMAC key (default: HMAC_KEY, then Backend/Secrets/hmac.key)")
+    parser.add_argument("--allow-partial", action="store_true",
+                        help="Accept chains that start mid-way, e.g. an export bounded by time")
+    parser.add_argument("--max-errors", type=int, default=100)
+    args = parser.parse_args()
+
+    key = load_key(args.key_file)
+    if args.path == "-":
+        result = verify_records(sys.stdin, key, args.allow_partial, args.max_errors)
+    else:
+        with open(args.path, "r", encoding="utf-8") as f:
+            result = verify_records(f, key, args.allow_partial, args.max_errors)
+
+    print(f"Checked {result.events} events in {result.batches} batches across {result.chains} chains")
+    for error in result.errors:
+        print(f"  {error}")
+    if result.error_count > len(result.errors):
+        print(f"  ... and {result.error_count - len(result.errors)} more")
+
+    if not result.ok:
+        print(f"FAILED: {result.error_count} problems found")
+        sys.exit(1)
+    print("OK: chain intact and all signatures valid")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 import sys
 import os
+import tempfile
 
 # Dynamically resolve and insert the absolute path to /Backend
 backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Backend'))
 if backend_path not in sys.path:
     sys.path.insert(0, backend_path)
 
+# Security log batches the sink rejects (e.g. with a placeholder SDK_KEY) are
+# spilled to disk; keep that file out of the working tree
+os.environ.setdefault("SECURITY_LOG_SPILL_PATH", os.path.join(tempfile.mkdtemp(prefix="mymeds-tests-"), "security_log_spill.ndjson"))
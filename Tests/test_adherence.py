@@ -0,0 +1,173 @@
+import os
+os.environ["USE_DUMMY_DATA"] = "1"
+from datetime import date
+import pytest
+from fastapi.testclient import TestClient
+import Users.routes
+import SDK_Database.Adherence as Adherence
+import SDK_Database.versions as versions
+from main import app
+from Security.token_manager import create_access_token
+from Security.state_backend import get_state_backend
+from SDK_Database.user_cache import principal_cache
+from SDK_Database.Adherence import (
+    add_to_counts, is_adherent_day, adherence_percentage, apply_day_to_streak, current_streak
+)
+
+def d(day):
+    return date(2025, 3, day)
+
+def apply_days(summary, days):
+    for day, adherent in days:
+        apply_day_to_streak(summary, d(day), adherent)
+    return summary
+
+def test_counts_and_percentage():
+    doc = {}
+    for status in ("taken", "taken", "late", "skipped"):
+        add_to_counts(doc, "Aspirin", status)
+
+    assert doc["totals"] == {"taken": 2, "skipped": 1, "late": 1}
+    assert doc["meds"]["Aspirin"] == doc["totals"]
+    assert adherence_percentage(doc["totals"]) == 75.0
+    assert adherence_percentage({}) is None
+
+def test_adherent_day_needs_a_dose_and_no_skips():
+    assert is_adherent_day({"taken": 1, "skipped": 0, "late": 0})
+    assert is_adherent_day({"late": 2})
+    assert not is_adherent_day({"taken": 2, "skipped": 1})
+    assert not is_adherent_day({})
+
+def test_consecutive_days_extend_the_streak():
+    summary = apply_days({}, [(1, True), (2, True), (3, True)])
+
+    assert current_streak(summary, d(3)) == 3
+    assert current_streak(summary, d(4)) == 3  # Today's dose not logged yet
+    assert current_streak(summary, d(5)) == 0  # A day passed with nothing logged
+    assert summary["longest_streak"] == 3
+
+def test_out_of_order_days_from_an_offline_queue():
+    summary = apply_days({}, [(3, True), (2, True), (4, True), (1, True)])
+
+    assert (summary["streak_start"], summary["streak_end"]) == ("2025-03-01", "2025-03-04")
+
+def test_skipped_dose_cuts_the_streak():
+    summary = apply_days({}, [(1, True), (2, True), (3, True), (4, True), (2, False)])
+
+    assert current_streak(summary, d(4)) == 2
+    assert summary["longest_streak"] == 4
+
+    apply_days(summary, [(4, False)])
+    assert current_streak(summary, d(4)) == 0
+
+def test_gap_starts_a_new_streak_until_it_is_filled():
+    summary = apply_days({}, [(1, True), (2, True), (5, True)])
+
+    assert current_streak(summary, d(5)) == 1
+    assert summary["longest_streak"] == 2
+
+    # The days in between arrive late; the earlier streak was kept and joins up
+    apply_days(summary, [(4, True), (3, True)])
+    assert current_streak(summary, d(5)) == 5
+    assert summary["longest_streak"] == 5
+
+def test_late_day_bridges_two_streaks():
+    summary = apply_days({}, [(1, True), (2, True), (3, True), (5, True), (4, True)])
+
+    assert current_streak(summary, d(5)) == 5
+    assert summary["longest_streak"] == 5
+    assert summary["streak_ranges"] == [{"start": "2025-03-01", "end": "2025-03-05"}]
+
+def test_missed_day_after_the_streak_ends_it():
+    summary = apply_days({}, [(1, True), (2, True), (3, False)])
+
+    assert current_streak(summary, d(3)) == 0
+    apply_days(summary, [(4, True)])
+    assert current_streak(summary, d(4)) == 1
+
+def test_summary_from_before_streak_ranges_is_extended():
+    summary = {"streak_start": "2025-03-01", "streak_end": "2025-03-02", "longest_streak": 2}
+
+    apply_days(summary, [(3, True)])
+    assert current_streak(summary, d(3)) == 3
+
+class FakeRef:
+    def __init__(self, store, path):
+        self.store = store
+        self.path = path
+
+class FakeSnapshot:
+    def __init__(self, ref, data):
+        self.reference = ref
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+class FakeCollection:
+    def __init__(self, store, path):
+        self.store = store
+        self.path = path
+
+    def document(self, doc_id):
+        return FakeRef(self.store, f"{self.path}/{doc_id}")
+
+class FakeTransaction:
+    def __init__(self, store):
+        self.store = store
+
+    def create(self, ref, data):
+        self.store.docs[ref.path] = data
+
+    def set(self, ref, data, merge=False):
+        self.store.docs[ref.path] = data
+
+class FakeFirestore:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def collection(self, path):
+        return FakeCollection(self, path)
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+    async def get_all(self, refs, transaction=None):
+        for ref in refs:
+            yield FakeSnapshot(ref, self.docs.get(ref.path))
+
+@pytest.fixture
+def dose_client(monkeypatch):
+    store = FakeFirestore({"users/1/medications/Aspirin": {"name": "Aspirin"}})
+    monkeypatch.setattr(Adherence, "async_db", store)
+    monkeypatch.setattr(versions, "async_db", store)
+    monkeypatch.setattr(Adherence, "async_transactional", lambda func: func)
+    monkeypatch.setattr(Users.routes, "USE_DUMMY_DATA", True)
+    get_state_backend().clear()
+    principal_cache.set("alice", {"user_id": "1", "connected_users": {}})
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'alice', 'role': 'basic'})}"}
+    yield TestClient(app), headers, store
+    principal_cache.clear()
+
+def event(event_id, med_id="Aspirin"):
+    return {"event_id": event_id, "med_id": med_id, "status": "taken",
+            "scheduled_date": "2025-03-01", "timestamp": "2025-03-01T08:00:00Z"}
+
+@pytest.mark.parametrize("event_id", ["a/b", "..", "__id__", "x" * 129, ""])
+def test_event_ids_that_are_not_document_ids_are_rejected(dose_client, event_id):
+    client, headers, store = dose_client
+
+    response = client.post("/doses/events", json={"events": [event(event_id)]}, headers=headers)
+
+    assert response.status_code == 422
+    assert not any(path.startswith("users/1/dose_events") for path in store.docs)
+
+def test_events_for_unknown_medications_are_not_recorded(dose_client):
+    client, headers, store = dose_client
+
+    response = client.post("/doses/events", json={"events": [event("e1"), event("e2", med_id="Other")]}, headers=headers)
+
+    assert response.json() == {"accepted": 1, "duplicates": 0, "unknown_med_ids": ["Other"]}
+    assert "users/1/dose_events/e2" not in store.docs
+    assert set(store.docs["users/1/adherence/summary"]["meds"]) == {"Aspirin"}
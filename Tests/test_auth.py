@@ -1,10 +1,11 @@
 import sys, os
+import asyncio
 os.environ["USE_DUMMY_DATA"] = "1"
 from datetime import datetime, timedelta, timezone
 from fastapi.testclient import TestClient
 from jose import jwt
 from Users.models import users_db, plaintext_passwords, pwd_context
-from Backend.Security.token_manager import refresh_token_store, refresh_token_blacklist
+from Security.state_backend import InMemoryStateBackend, get_state_backend, set_state_backend
 from main import app
 
 # Centralized config
@@ -92,8 +93,7 @@ def test_blacklisted_token_is_rejected():
 
 # === Test Cases: Refresh Token ===
 def test_refresh_token_flow():
-    refresh_token_store.clear()
-    refresh_token_blacklist.clear()
+    get_state_backend().clear()
     
     for user in users_db.values():
         password = get_password_for_user(user)
@@ -132,8 +132,7 @@ def test_logout_success():
 
 # === Test Refresh Token ===
 def test_refresh_token_rotation():
-    refresh_token_store.clear()
-    refresh_token_blacklist.clear()
+    get_state_backend().clear()
 
     # Step 1: Login to get initial access and refresh tokens
     login = client.post("/login/", json={
@@ -163,3 +162,53 @@ def test_refresh_token_rotation():
     assert reuse_attempt.status_code == 401, "Old refresh token reuse should have been rejected!"
     assert reuse_attempt.json()["detail"] == "Token has been revoked"
 
+
+# === Remote State Backend ===
+class OffLoopBackend(InMemoryStateBackend):
+    """Behaves like Redis: every call must be made off the event loop thread."""
+    is_remote = True
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def _check(self):
+        self.calls += 1
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        raise AssertionError("state backend called on the event loop")
+
+    def execute(self, batch):
+        self._check()
+        return super().execute(batch)
+
+    def revoke(self, kind, jti, expires_at=None):
+        self._check()
+        super().revoke(kind, jti, expires_at)
+
+    def store_refresh_token(self, username, token, ttl_seconds=None):
+        self._check()
+        super().store_refresh_token(username, token, ttl_seconds)
+
+    def pop_refresh_token(self, username):
+        self._check()
+        return super().pop_refresh_token(username)
+
+def test_remote_state_calls_stay_off_the_event_loop():
+    previous = get_state_backend()
+    backend = OffLoopBackend()
+    set_state_backend(backend)
+    try:
+        login = client.post("/login/", json={"username": "alice", "password": "password123"})
+        assert login.status_code == 200
+        refresh = client.post("/refresh-token/", json={"refresh_token": login.json()["refresh_token"]})
+        assert refresh.status_code == 200
+
+        headers = {"Authorization": f"Bearer {refresh.json()['access_token']}"}
+        assert client.post("/logout/", headers=headers).status_code == 200
+        assert client.post("/logout/", headers=headers).status_code == 401
+        assert backend.calls >= 6
+    finally:
+        set_state_backend(previous)
@@ -0,0 +1,123 @@
+import os
+os.environ["USE_DUMMY_DATA"] = "1"
+import asyncio
+import json
+import pytest
+from fastapi.testclient import TestClient
+import Medication.bulk as bulk
+import SDK_Database.Create as Create
+import SDK_Database.versions as versions
+from Medication.bulk import parse_rows, validate_rows
+from main import app
+from Security.token_manager import create_access_token
+from Security.state_backend import get_state_backend
+from SDK_Database.user_cache import principal_cache
+
+def med(name, **overrides):
+    row = {
+        "name": name, "dosage": "10mg", "instructions": "With water", "frequency": 2, "pillcount": 60,
+        "times": ["08:00", "20:00"], "days": ["Everyday"], "pillShape": "circle",
+        "pillColorLeft": "#FFFFFF", "pillColorRight": "#FFFFFF", "pillColor": "#FFFFFF", "backgroundColor": "#D9D9D9"
+    }
+    row.update(overrides)
+    return row
+
+CSV = (
+    "name,dosage,instructions,frequency,pillcount,times,days,pillShape,pillColorLeft,pillColorRight,pillColor,backgroundColor\n"
+    "Aspirin,81mg,With food,1,30,08:00,Monday;Friday,circle,#FFF,#FFF,#FFF,#D9D9D9\n"
+    "Ibuprofen,200mg,,two,30,08:00;20:00,Everyday,oval,#FFF,#FFF,#FFF,#D9D9D9\n"
+)
+
+def test_csv_rows_are_parsed_and_validated_per_row():
+    records, errors = validate_rows(parse_rows(CSV.encode(), "text/csv"))
+
+    assert [record["name"] for record in records] == ["Aspirin"]
+    assert records[0]["days"] == ["Monday", "Friday"] and records[0]["end_date"]
+    assert errors[0]["row"] == 2 and errors[0]["errors"][0].startswith("frequency")
+
+def test_duplicates_and_everyday_expansion():
+    records, errors = validate_rows([med("A"), med("a"), med("B", frequency=0)])
+
+    assert len(records[0]["days"]) == 7
+    assert [error["row"] for error in errors] == [2, 3]
+
+class FakeBatch:
+    def __init__(self, db):
+        self.sets, self.db = [], db
+
+    def set(self, ref, record, merge=False):
+        self.sets.append((ref, record))
+
+    async def commit(self):
+        if len(self.db.commits) == self.db.fail_commit:
+            raise ConnectionError("Firestore unavailable")
+        self.db.commits.append(len(self.sets))
+
+class FakeDB:
+    def __init__(self, fail_commit=None):
+        self.commits = []
+        self.fail_commit = fail_commit
+
+    def collection(self, path):
+        return self
+
+    def document(self, name):
+        return name
+
+    def batch(self):
+        return FakeBatch(self)
+
+def test_writes_in_batches_of_500(monkeypatch):
+    fake_db = FakeDB()
+    monkeypatch.setattr(Create, "async_db", fake_db)
+    monkeypatch.setattr(versions, "async_db", fake_db)
+
+    written = asyncio.run(Create.add_medications_bulk("1", [{"name": f"m{i}"} for i in range(1201)]))
+    assert written == 1201
+    # Each batch also carries the user's medication version bump
+    assert fake_db.commits == [500, 500, 204]
+
+def test_a_failed_batch_stops_the_import_and_reports_what_was_written(monkeypatch):
+    fake_db = FakeDB(fail_commit=1)
+    monkeypatch.setattr(Create, "async_db", fake_db)
+    monkeypatch.setattr(versions, "async_db", fake_db)
+    records = [{"name": f"m{i}"} for i in range(1201)]
+
+    with pytest.raises(Create.BulkWriteError) as failure:
+        asyncio.run(Create.add_medications_bulk("1", records))
+
+    # Only the first batch committed; the third was never sent
+    assert fake_db.commits == [500]
+    assert failure.value.written == [f"m{i}" for i in range(499)]
+    assert failure.value.not_written == [f"m{i}" for i in range(499, 1201)]
+    assert isinstance(failure.value.__cause__, ConnectionError)
+
+def test_bulk_route_reports_row_errors(monkeypatch):
+    writes = []
+
+    async def fake_bulk(user_id, records):
+        writes.append((user_id, [record["name"] for record in records]))
+        return len(records)
+
+    monkeypatch.setattr(bulk, "add_medications_bulk", fake_bulk)
+    get_state_backend().clear()
+    principal_cache.set("alice", {"user_id": "1", "connected_users": {}})
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'alice', 'role': 'basic'})}"}
+    client = TestClient(app)
+
+    response = client.post("/medications/bulk", content=json.dumps([med("A"), {"name": "B"}]), headers=headers)
+    assert response.status_code == 200
+    assert response.json()["created"] == 1 and response.json()["errors"][0]["row"] == 2
+    assert writes == [("1", ["A"])]
+
+    denied = client.post("/medications/bulk?user_id=2", content="[]", headers=headers)
+    assert denied.status_code == 403
+
+    async def failing_bulk(user_id, records):
+        raise Create.BulkWriteError(["A"], ["C"])
+
+    monkeypatch.setattr(bulk, "add_medications_bulk", failing_bulk)
+    failed = client.post("/medications/bulk", content=json.dumps([med("A"), med("C")]), headers=headers)
+    assert failed.status_code == 503
+    assert failed.json()["detail"]["written"] == ["A"] and failed.json()["detail"]["not_written"] == ["C"]
+    principal_cache.clear()
@@ -0,0 +1,50 @@
+from cache_utils import TTLCache
+from SDK_Database.user_cache import PrincipalCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=30, clock=clock)
+    cache.set("alice", {"user_id": "user_1"})
+
+    assert cache.get("alice") == {"user_id": "user_1"}
+    clock.now += 31
+    assert cache.get("alice") is None
+    assert len(cache) == 0
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the least recently used
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.stats()["evictions"] == 1
+
+def test_hit_and_miss_counters():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("missing")
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+def test_principal_invalidation_by_user_id():
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    cache.set("alice", {"user_id": "user_1", "connected_users": {}})
+
+    cache.invalidate_user("user_1")
+    assert cache.get("alice") is None
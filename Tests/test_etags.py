@@ -0,0 +1,105 @@
+import os
+os.environ["USE_DUMMY_DATA"] = "1"
+import pytest
+from fastapi.testclient import TestClient
+import Users.routes
+import Medication.routes
+import Reminders.get
+from main import app
+from http_utils import etag_for, etag_matches
+from Security.token_manager import create_access_token
+from Security.state_backend import get_state_backend
+from SDK_Database.user_cache import principal_cache
+
+client = TestClient(app)
+
+MEDS = [("med_1", {"name": "Aspirin", "dosage": "81mg"}), ("med_2", {"name": "Lisinopril", "dosage": "10mg"})]
+
+@pytest.fixture
+def store(monkeypatch):
+    """Fake medication reads for alice (user 1); counts how often the documents are read."""
+    state = {"version": 3, "reads": 0}
+
+    async def fake_version(user_id):
+        return state["version"]
+
+    async def fake_stream(user_id, fields=None):
+        state["reads"] += 1
+        for med_id, med in MEDS:
+            yield med_id, med
+
+    async def fake_iterate(path, start_after=None, fields=None, chunk_size=None):
+        async for item in fake_stream(path, fields):
+            yield item
+
+    async def fake_taken_today(user_id):
+        return {"med_1"}
+
+    async def fake_reminder(user_id, med_id):
+        state["reads"] += 1
+        return {"time": "08:00"}
+
+    async def fake_read_version(user_id):
+        return await fake_version(user_id), None
+
+    monkeypatch.setattr(Medication.routes, "read_meds_version", fake_read_version)
+    monkeypatch.setattr(Medication.routes, "stream_user_medications", fake_stream)
+    monkeypatch.setattr(Medication.routes, "iterate_collection", fake_iterate)
+    monkeypatch.setattr(Medication.routes, "get_taken_today", fake_taken_today)
+    monkeypatch.setattr(Reminders.get, "get_meds_version", fake_version)
+    monkeypatch.setattr(Reminders.get, "get_reminder", fake_reminder)
+    return state
+
+@pytest.fixture(autouse=True)
+def headers(monkeypatch):
+    monkeypatch.setattr(Users.routes, "USE_DUMMY_DATA", True)
+    get_state_backend().clear()
+    principal_cache.set("alice", {"user_id": "1", "connected_users": {}})
+    yield {"Authorization": f"Bearer {create_access_token({'sub': 'alice', 'role': 'basic'})}"}
+    principal_cache.clear()
+
+def test_unchanged_list_is_not_modified(store, headers):
+    first = client.get("/medications/", headers=headers)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    assert [med["taken"] for med in first.json()] == [True, False]
+
+    second = client.get("/medications/", headers={**headers, "If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["ETag"] == etag
+    assert second.content == b""
+    # Only the version was read for the 304
+    assert store["reads"] == 1
+
+def test_write_changes_the_etag(store, headers):
+    etag = client.get("/medications/", headers=headers).headers["ETag"]
+    store["version"] += 1
+
+    response = client.get("/medications/", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+def test_views_and_queries_have_their_own_etags(store, headers):
+    etags = {
+        client.get(path, headers=headers).headers["ETag"]
+        for path in ("/medications/", "/medicationsmedpage/", "/medications/?format=ndjson")
+    }
+    assert len(etags) == 3
+
+def test_reminder_is_not_modified(store, headers):
+    path = "/users/1/medications/med_1/reminders/"
+    first = client.get(path, headers=headers)
+    assert first.status_code == 200 and first.json() == {"time": "08:00"}
+
+    second = client.get(path, headers={**headers, "If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304
+    assert store["reads"] == 1
+
+def test_if_none_match_forms():
+    etag = etag_for("1", 3, "list")
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches(etag_for("1", 4, "list"), etag)
@@ -0,0 +1,105 @@
+import os
+os.environ["USE_DUMMY_DATA"] = "1"
+import json
+from types import SimpleNamespace
+import asyncio
+import AI_Model.vision as vision
+import AI_Model.gemini as gemini
+from AI_Model.pipeline import ExtractionPipeline
+from AI_Model.extraction import MedicineExtraction
+from AI_Model.extraction_cache import ContentCache, text_key, ocr_cache, extraction_cache
+from Security.encryption import fernet_for
+
+class Clock:
+    def __init__(self, now=1_700_000_000):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def disk_files(root):
+    return sorted(os.path.join(d, f) for d, _, files in os.walk(root) for f in files)
+
+def test_memory_tier_is_lru_bounded():
+    cache = ContentCache("test", maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None and cache.get("a") == 1
+    assert cache.stats()["size"] == 2
+
+def test_disk_tier_survives_a_new_process(tmp_path):
+    ContentCache("test", maxsize=10, disk_dir=str(tmp_path)).set("ab12", {"text": "Aspirin"})
+    fresh = ContentCache("test", maxsize=10, disk_dir=str(tmp_path))
+
+    assert fresh.get("ab12") == {"text": "Aspirin"}
+    assert fresh.get("ab12") == {"text": "Aspirin"}
+    assert (fresh.stats()["disk_hits"], fresh.stats()["memory_hits"]) == (1, 1)
+
+def test_disk_entries_are_encrypted(tmp_path):
+    ContentCache("test", maxsize=10, disk_dir=str(tmp_path)).set("ab12", {"text": "ASPIRIN 81mg"})
+
+    [path] = disk_files(tmp_path)
+    with open(path, "rb") as f:
+        assert b"ASPIRIN" not in f.read()
+    # Under another key the entry is unreadable, and is removed rather than served
+    other = ContentCache("test", maxsize=10, disk_dir=str(tmp_path), cipher=fernet_for("extraction-cache", key="other"))
+    assert other.get("ab12") is None and disk_files(tmp_path) == []
+
+def test_disk_entries_expire(tmp_path):
+    clock = Clock()
+    ContentCache("test", maxsize=10, disk_dir=str(tmp_path), disk_ttl=60, clock=clock).set("ab12", "Aspirin")
+
+    clock.now += 30
+    assert ContentCache("test", maxsize=10, disk_dir=str(tmp_path), disk_ttl=60, clock=clock).get("ab12") == "Aspirin"
+    clock.now += 31
+    fresh = ContentCache("test", maxsize=10, disk_dir=str(tmp_path), disk_ttl=60, clock=clock)
+    assert fresh.get("ab12") is None and fresh.stats()["disk_evictions"] == 1
+
+def test_prune_caps_disk_entries_and_drops_plaintext(tmp_path):
+    legacy = tmp_path / "test" / "cd" / "cd34.json"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_text(json.dumps({"text": "ASPIRIN 81mg"}))
+
+    cache = ContentCache("test", maxsize=10, disk_dir=str(tmp_path), disk_max_entries=3)
+    for i in range(5):
+        cache.set(f"{i:02d}ab", i)
+        os.utime(cache._path(f"{i:02d}ab"), (1000 + i, 1000 + i))  # Distinct write times
+
+    assert [os.path.basename(path) for path in disk_files(tmp_path)] == ["02ab.enc", "03ab.enc", "04ab.enc"]
+    assert cache.stats()["disk_evictions"] == 3  # The plaintext file and the two oldest entries
+
+def test_text_key_ignores_ocr_whitespace_and_case():
+    assert text_key("ASPIRIN 81mg\n  Take daily") == text_key("aspirin 81MG take daily")
+    assert text_key("aspirin", "model-a") != text_key("aspirin", "model-b")
+
+def test_repeat_upload_skips_vision_and_gemini(monkeypatch):
+    calls = {"vision": 0, "gemini": 0}
+
+    def fake_text_detection(image):
+        calls["vision"] += 1
+        return SimpleNamespace(error=SimpleNamespace(message=""),
+                               text_annotations=[SimpleNamespace(description="ASPIRIN 81mg\nTake once daily")])
+
+    def fake_categorize(text):
+        calls["gemini"] += 1
+        return MedicineExtraction("Aspirin", "81mg", "Take once daily", 30, 1.0)
+
+    monkeypatch.setattr(vision, "get_vision_client", lambda: SimpleNamespace(text_detection=fake_text_detection))
+    monkeypatch.setattr(gemini, "categorize_medicine_text", fake_categorize)
+    ocr_cache.clear()
+    extraction_cache.clear()
+
+    # Wired as in AI_Model.pipeline._default_clients
+    pipeline = ExtractionPipeline(vision.ocr_image_cached, gemini.categorize_medicine_text_cached)
+
+    async def upload(*images):
+        return [await pipeline.extract(image) for image in images]
+
+    first, again, same_label = asyncio.run(upload(b"photo-1", b"photo-1", b"photo-2"))  # photo-2: same label text
+    pipeline.shutdown()
+
+    assert first == again == same_label == ("Aspirin", "81mg", "Take once daily", 30, 1.0)
+    assert calls == {"vision": 2, "gemini": 1}
@@ -0,0 +1,234 @@
+import os
+os.environ["USE_DUMMY_DATA"] = "1"
+import asyncio
+import json
+import threading
+import time
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+import main
+from AI_Model.pipeline import ExtractionPipeline
+from AI_Model.stubs import StubExtractionClients, STUB_EXTRACTION
+
+class CountingStub(StubExtractionClients):
+    """Records the most OCR calls in flight at once."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+    def ocr(self, image_content):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            return super().ocr(image_content)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+def make_pipeline(stub, **kwargs):
+    return ExtractionPipeline(stub.ocr, stub.categorize, **kwargs)
+
+def test_extraction_does_not_block_the_event_loop():
+    pipeline = make_pipeline(StubExtractionClients(ocr_delay=0.2))
+
+    async def run():
+        ticks = 0
+        task = asyncio.create_task(pipeline.extract(b"image"))
+        while not task.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+        return await task, ticks
+
+    result, ticks = asyncio.run(run())
+    assert result == STUB_EXTRACTION
+    assert ticks >= 10
+
+def test_concurrency_is_bounded():
+    stub = CountingStub(ocr_delay=0.05)
+    pipeline = make_pipeline(stub, max_concurrency=2, max_queue=10)
+
+    async def run():
+        return await asyncio.gather(*(pipeline.extract(b"image") for _ in range(6)))
+
+    results = asyncio.run(run())
+    assert results == [STUB_EXTRACTION] * 6
+    assert stub.peak == 2
+    stats = pipeline.stats()
+    assert stats["ocr"]["count"] == 6 and stats["llm"]["count"] == 6 and stats["total"]["count"] == 6
+
+def test_full_queue_sheds_with_503():
+    pipeline = make_pipeline(StubExtractionClients(ocr_delay=0.1), max_concurrency=1, max_queue=1)
+
+    async def run():
+        return await asyncio.gather(*(pipeline.extract(b"image") for _ in range(4)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    shed = [r for r in results if isinstance(r, HTTPException)]
+    # One running, one waiting; the rest are refused straight away
+    assert [r.status_code for r in shed] == [503, 503]
+    assert shed[0].headers["Retry-After"] == "1"
+    assert pipeline.stats()["shed"] == 2
+
+def test_slow_stage_times_out_with_504():
+    pipeline = make_pipeline(StubExtractionClients(llm_delay=0.3), llm_timeout=0.05)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(pipeline.extract(b"image"))
+
+    assert exc.value.status_code == 504
+    assert pipeline.stats()["timeouts"] == {"ocr": 0, "llm": 1, "local": 0}
+    assert pipeline.stats()["active"] == 0
+
+def test_timed_out_call_keeps_its_slot_until_it_returns():
+    delays = [0.5]
+
+    def ocr(image_content):
+        time.sleep(delays.pop() if delays else 0.01)
+        return "label text"
+
+    pipeline = ExtractionPipeline(ocr, lambda text: STUB_EXTRACTION, max_concurrency=1, ocr_timeout=0.1)
+
+    async def run():
+        outcomes = []
+        for _ in range(3):
+            try:
+                outcomes.append(await pipeline.extract(b"image"))
+            except HTTPException as e:
+                outcomes.append(e.status_code)
+        return outcomes
+
+    # The later requests wait for the stuck thread instead of timing out behind it
+    assert asyncio.run(run()) == [504, STUB_EXTRACTION, STUB_EXTRACTION]
+    assert pipeline.stats()["timeouts"]["ocr"] == 1 and pipeline.stats()["stuck"] == 0
+    pipeline.shutdown()
+
+def test_upload_route_uses_the_pipeline(monkeypatch):
+    stub = StubExtractionClients()
+    monkeypatch.setattr(main, "extraction_pipeline", make_pipeline(stub))
+
+    response = TestClient(main.app).post("/upload-image/", files={"file": ("label.jpg", b"jpeg", "image/jpeg")})
+
+    assert response.status_code == 200
+    # Numbers go out as text, as the app's form fields expect
+    assert response.json() == [["Aspirin", "81 mg", "Take 1 tablet by mouth once daily", "30", "1"]]
+    assert (stub.ocr_calls, stub.llm_calls) == (1, 1)
+
+async def collect_async(pipeline, images, chunk_size):
+    return [item async for item in pipeline.extract_batch(images, chunk_size=chunk_size)]
+
+def collect(pipeline, images, chunk_size):
+    return asyncio.run(collect_async(pipeline, images, chunk_size))
+
+def test_batch_makes_one_call_per_chunk_and_stage():
+    stub = StubExtractionClients()
+    pipeline = ExtractionPipeline(stub.ocr, stub.categorize, stub.ocr_batch, stub.categorize_batch)
+
+    items = collect(pipeline, [b"image-%d" % i for i in range(20)], chunk_size=8)
+
+    assert sorted(index for index, _ in items) == list(range(20))
+    assert items[0][1]["result"]["medicine_name"] == "Aspirin"
+    assert (stub.ocr_calls, stub.llm_calls) == (3, 3)
+
+def test_batch_reports_errors_per_image():
+    texts = {b"good": "ASPIRIN 81 MG", b"blank": "", b"bad": Exception("Error from Vision API: bad image")}
+    pipeline = ExtractionPipeline(
+        lambda image: texts[image], lambda text: None,
+        ocr_batch=lambda images: [texts[image] for image in images],
+        categorize_batch=lambda batch: [STUB_EXTRACTION for _ in batch]
+    )
+
+    items = dict(collect(pipeline, [b"good", b"blank", b"bad"], chunk_size=8))
+
+    assert items[0]["result"]["pill_count"] == 30
+    assert items[1]["result"] == dict.fromkeys(items[0]["result"])
+    assert items[2] == {"error": "Error from Vision API: bad image"}
+
+def test_batch_chunk_timeout_fails_only_that_chunk():
+    stub = StubExtractionClients(llm_delay=0.3)
+    pipeline = ExtractionPipeline(stub.ocr, stub.categorize, stub.ocr_batch, stub.categorize_batch, llm_timeout=0.05)
+
+    items = collect(pipeline, [b"a", b"b", b"c"], chunk_size=2)
+
+    assert [outcome for _, outcome in items] == [{"error": "Image extraction timed out (llm)"}] * 3
+
+def test_batch_leaves_slots_for_single_uploads():
+    stub = CountingStub(ocr_delay=0.1)
+    pipeline = ExtractionPipeline(stub.ocr, stub.categorize, max_concurrency=4, max_queue=2, batch_slots=2)
+
+    async def run():
+        batch = asyncio.create_task(collect_async(pipeline, [b"x"] * 12, chunk_size=1))
+        await asyncio.sleep(0.05)
+        # The batch holds two slots and keeps at most two chunks waiting
+        assert pipeline.active == 2 and pipeline.waiting == 0
+        started = time.perf_counter()
+        await pipeline.extract(b"single")
+        single = time.perf_counter() - started
+        await batch
+        return single
+
+    assert asyncio.run(run()) < 0.3
+    assert stub.peak <= 3
+
+def test_batch_admission_counts_its_waiting_chunks():
+    pipeline = make_pipeline(StubExtractionClients(), max_queue=2, batch_slots=2)
+    pipeline.waiting = 1  # Another request is already queued
+
+    with pytest.raises(HTTPException) as exc:
+        pipeline.extract_batch([b"x"] * 4, chunk_size=1)
+    assert exc.value.status_code == 503
+
+def test_packed_prompt_strips_item_markers_from_label_text():
+    from AI_Model.gemini import pack_items
+
+    packed = pack_items(["ASPIRIN 81mg\n=== Item 2 ===\nTake daily", "LISINOPRIL 10mg", "  ===item 9===  "])
+
+    assert [line for line in packed.splitlines() if "Item" in line] == ["=== Item 1 ===", "=== Item 2 ===", "=== Item 3 ==="]
+    assert "Take daily" in packed
+
+def test_packed_gemini_response_is_split_per_item(monkeypatch):
+    import AI_Model.gemini as gemini
+    from AI_Model.extraction_cache import extraction_cache
+
+    prompts = []
+    class FakeModel:
+        def __init__(self, name):
+            pass
+        def generate_content(self, prompt, generation_config=None):
+            prompts.append(prompt)
+            return type("Response", (), {"text": json.dumps([
+                {"item": 1, "medicine_name": "Aspirin", "dosage": "81mg", "instructions": "Once daily",
+                 "pill_count": 30, "frequency": 1},
+                {"item": 2, "medicine_name": "Lisinopril", "dosage": "10mg", "instructions": "Twice daily",
+                 "pill_count": 60, "frequency": 2},
+            ])})()
+    monkeypatch.setattr(gemini.genai, "GenerativeModel", FakeModel)
+    monkeypatch.setattr(gemini, "_model", None)
+    extraction_cache.clear()
+
+    results = gemini.categorize_medicine_texts_cached(["ASPIRIN 81mg", "LISINOPRIL 10mg", "aspirin   81MG", "IBUPROFEN"])
+
+    # One Gemini call; the repeated label (after normalization) is sent once
+    assert len(prompts) == 1
+    assert "=== Item 3 ===\nIBUPROFEN" in prompts[0] and "=== Item 4 ===" not in prompts[0]
+    assert results[0] == results[2] == ("Aspirin", "81mg", "Once daily", 30, 1)
+    assert isinstance(results[2].pill_count, int)  # Read back from the cache with its type
+    assert results[1][0] == "Lisinopril"
+    assert results[3] is None  # Missing from the response
+
+def test_batch_upload_route_streams_ndjson(monkeypatch):
+    stub = StubExtractionClients()
+    pipeline = ExtractionPipeline(stub.ocr, stub.categorize, stub.ocr_batch, stub.categorize_batch)
+    monkeypatch.setattr(main, "extraction_pipeline", pipeline)
+
+    files = [("files", (f"bottle{i}.jpg", b"jpeg-%d" % i, "image/jpeg")) for i in range(3)]
+    response = TestClient(main.app).post("/upload-images/batch", files=files)
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["filename"] for line in lines) == ["bottle0.jpg", "bottle1.jpg", "bottle2.jpg"]
+    assert all(line["result"]["dosage"] == "81 mg" for line in lines)
@@ -0,0 +1,45 @@
+import asyncio
+import time
+import SDK_Database.read as read
+
+def run(coro):
+    return asyncio.run(coro)
+
+def install_slow_reads(monkeypatch, delays):
+    in_flight = {"now": 0, "max": 0}
+
+    async def fake_stream_user_medications(user_id, fields=None):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(delays[user_id])
+        in_flight["now"] -= 1
+        yield f"{user_id}-med", {"name": f"med of {user_id}"}
+
+    monkeypatch.setattr(read, "stream_user_medications", fake_stream_user_medications)
+    return in_flight
+
+async def collect(user_ids, concurrency):
+    return [item async for item in read.stream_medications_for_users(user_ids, concurrency=concurrency)]
+
+def test_latency_follows_slowest_dependent(monkeypatch):
+    delays = {f"user_{i}": 0.1 for i in range(20)}
+    install_slow_reads(monkeypatch, delays)
+
+    start = time.perf_counter()
+    results = run(collect(list(delays), concurrency=20))
+
+    assert time.perf_counter() - start < 0.5  # ~0.1s, not 20 * 0.1s
+    assert {user_id for user_id, _, _ in results} == set(delays)
+
+def test_results_stream_in_completion_order(monkeypatch):
+    install_slow_reads(monkeypatch, {"slow": 0.2, "fast": 0.01})
+
+    results = run(collect(["slow", "fast"], concurrency=2))
+    assert [user_id for user_id, _, _ in results] == ["fast", "slow"]
+
+def test_concurrency_is_bounded(monkeypatch):
+    delays = {f"user_{i}": 0.02 for i in range(12)}
+    in_flight = install_slow_reads(monkeypatch, delays)
+
+    assert len(run(collect(list(delays), concurrency=3))) == 12
+    assert in_flight["max"] == 3
@@ -0,0 +1,187 @@
+import os
+os.environ["USE_DUMMY_DATA"] = "1"
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import pytest
+from fastapi.testclient import TestClient
+import Users.routes
+import Medication.routes
+from main import app
+from SDK_Database.listener_cache import SnapshotListenerCache
+from Security.token_manager import create_access_token
+from Security.state_backend import get_state_backend
+from SDK_Database.user_cache import principal_cache
+
+def change(kind, doc_id, data=None):
+    return SimpleNamespace(type=SimpleNamespace(name=kind), document=SimpleNamespace(id=doc_id, to_dict=lambda: data))
+
+class FakeWatch:
+    def __init__(self, callback):
+        self.callback = callback
+        self.is_active = True
+        self.closed = False
+
+    def push(self, *changes, read_time=None):
+        self.callback(None, list(changes), read_time)
+
+    def unsubscribe(self):
+        self.closed = True
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def listeners():
+    watches = {}
+
+    def subscribe(user_id, callback):
+        watches[user_id] = FakeWatch(callback)
+        return watches[user_id]
+
+    clock = Clock()
+    cache = SnapshotListenerCache(subscribe, max_listeners=2, idle_seconds=60, clock=clock)
+
+    def settle():
+        # Listeners are opened and closed on the cache's worker thread
+        cache._submit(lambda: None).result()
+
+    yield cache, watches, clock, settle
+    cache.shutdown()
+
+def test_first_read_subscribes_then_serves_pushed_changes(listeners):
+    cache, watches, _, settle = listeners
+
+    assert cache.get("1") is None
+    settle()
+    assert cache.get("1") is None  # No snapshot yet
+
+    watches["1"].push(change("ADDED", "Aspirin", {"dosage": "81mg"}), change("ADDED", "Ibuprofen", {"dosage": "200mg"}))
+    assert dict(cache.get("1")) == {"Aspirin": {"dosage": "81mg"}, "Ibuprofen": {"dosage": "200mg"}}
+
+    watches["1"].push(change("MODIFIED", "Aspirin", {"dosage": "325mg"}), change("REMOVED", "Ibuprofen"))
+    assert dict(cache.get("1")) == {"Aspirin": {"dosage": "325mg"}}
+    assert cache.stats()["hits"] == 2
+
+def test_listener_cap_evicts_least_recently_read(listeners):
+    cache, watches, _, settle = listeners
+    for user_id in ("1", "2"):
+        cache.get(user_id)
+        settle()
+        watches[user_id].push()
+    cache.get("1")
+
+    cache.get("3")
+    settle()
+    assert watches["2"].closed and not watches["1"].closed
+    assert len(cache) == 2 and cache.stats()["evictions"] == 1
+
+def test_idle_listeners_are_closed(listeners):
+    cache, watches, clock, settle = listeners
+    cache.get("1")
+    settle()
+    watches["1"].push()
+
+    clock.now = 61
+    assert cache.get("2") is None
+    settle()
+    assert watches["1"].closed and len(cache) == 1
+
+def test_invalidate_and_dead_streams_resubscribe(listeners):
+    cache, watches, _, settle = listeners
+    cache.get("1")
+    settle()
+    first = watches["1"]
+    first.push(change("ADDED", "Aspirin", {}))
+
+    cache.invalidate("1")
+    settle()
+    assert first.closed
+    assert cache.get("1") is None
+    settle()
+    second = watches["1"]
+    assert second is not first
+
+    second.push()
+    second.is_active = False
+    assert cache.get("1") is None
+    settle()
+    assert second.closed and watches["1"] is not second
+
+def test_disabled_cache_never_subscribes():
+    cache = SnapshotListenerCache(lambda *args: pytest.fail("subscribed"), max_listeners=1, idle_seconds=60, enabled=False)
+    assert cache.get("1") is None and len(cache) == 0
+
+def test_listing_is_served_from_the_listener(monkeypatch):
+    async def no_reads(*args, **kwargs):
+        raise AssertionError("medications read from Firestore")
+        yield
+
+    async def version(user_id):
+        return 1, None
+
+    async def taken_today(user_id):
+        return {"Aspirin"}
+
+    cached = SimpleNamespace(get=lambda user_id, not_before=None: [("Aspirin", {"name": "Aspirin", "dosage": "81mg", "instructions": "x"})])
+    monkeypatch.setattr(Medication.routes, "medication_listeners", cached)
+    monkeypatch.setattr(Medication.routes, "stream_user_medications", no_reads)
+    monkeypatch.setattr(Medication.routes, "read_meds_version", version)
+    monkeypatch.setattr(Medication.routes, "get_taken_today", taken_today)
+    monkeypatch.setattr(Users.routes, "USE_DUMMY_DATA", True)
+    get_state_backend().clear()
+    principal_cache.set("alice", {"user_id": "1", "connected_users": {}})
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'alice', 'role': 'basic'})}"}
+
+    response = TestClient(app).get("/medications/", headers=headers)
+    assert response.status_code == 200
+    assert [(med["name"], med["taken"]) for med in response.json()] == [("Aspirin", True)]
+    principal_cache.clear()
+
+def test_copy_older_than_the_last_write_is_not_served(listeners):
+    cache, watches, _, settle = listeners
+    cache.get("1")
+    settle()
+    watches["1"].push(change("ADDED", "Aspirin", {"dosage": "81mg"}), read_time=datetime(2025, 1, 6, 8, 0, tzinfo=timezone.utc))
+
+    # A write committed elsewhere at 08:05 whose push has not arrived yet
+    written_at = datetime(2025, 1, 6, 8, 5, tzinfo=timezone.utc)
+    assert cache.get("1", not_before=written_at) is None
+
+    watches["1"].push(change("MODIFIED", "Aspirin", {"dosage": "325mg"}), read_time=written_at)
+    assert dict(cache.get("1", not_before=written_at)) == {"Aspirin": {"dosage": "325mg"}}
+    assert not watches["1"].closed
+
+def test_sweep_closes_idle_listeners_without_reads(listeners):
+    cache, watches, clock, settle = listeners
+    cache.get("1")
+    settle()
+    watches["1"].push()
+
+    clock.now = 30
+    assert cache.sweep() == 0
+    clock.now = 61
+    assert cache.sweep() == 1
+    settle()
+    assert watches["1"].closed and len(cache) == 0
+
+def test_sweeper_thread_runs_periodically():
+    watches = {}
+
+    def subscribe(user_id, callback):
+        watches[user_id] = FakeWatch(callback)
+        return watches[user_id]
+
+    cache = SnapshotListenerCache(subscribe, max_listeners=2, idle_seconds=0.05, sweep_seconds=0.01)
+    try:
+        cache.get("1")
+        deadline = time.monotonic() + 5
+        while not (watches.get("1") and watches["1"].closed) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert watches["1"].closed and len(cache) == 0
+    finally:
+        cache.shutdown()
@@ -0,0 +1,128 @@
+import os
+os.environ["USE_DUMMY_DATA"] = "1"
+import asyncio
+import io
+import time
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+from AI_Model import inference
+from AI_Model.inference import binarize, estimate_skew, otsu_threshold, parse_label_text, preprocess
+from AI_Model.pipeline import ExtractionPipeline
+from AI_Model.stubs import StubExtractionClients
+
+LABEL = "WALGREENS PHARMACY\nRx# 0458123\nLISINOPRIL 10 MG TABLETS\nTAKE 1 TABLET BY MOUTH TWICE DAILY\nQTY: 60  REFILLS: 2"
+
+class FakeLocalEngine(inference.LocalExtractionEngine):
+    """Parses with the real parser; "reads" every image as LABEL."""
+
+    def __init__(self):
+        super().__init__(backend=None)
+        self.read = 0
+
+    @property
+    def available(self):
+        return True
+
+    def extract(self, image_content):
+        self.read += 1
+        return self.parse(LABEL)
+
+def render(text, skew=0.0):
+    image = Image.new("L", (900, 300), 245)
+    ImageDraw.Draw(image).multiline_text((30, 30), text, fill=20, font=ImageFont.load_default(size=28), spacing=12)
+    image = image.rotate(skew, expand=True, fillcolor=245)
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+def test_parser_extracts_label_fields():
+    assert parse_label_text(LABEL) == ("Lisinopril", "10 mg", "Take 1 tablet by mouth twice daily", 60, 2)
+    assert parse_label_text("Vitamin D3\n1000 IU softgels\nTake 1 softgel every other day")[1:] == \
+        ("1000 IU", "Take 1 softgel every other day", None, 0.5)
+
+def test_threshold_separates_ink_and_inverts_dark_labels():
+    gray = np.full((20, 20), 230, dtype=np.uint8)
+    gray[5:8, 2:18] = 25
+    assert 25 <= otsu_threshold(gray) < 230
+    assert (binarize(gray) == 0).sum() == 48
+    assert (binarize(255 - gray) == 0).sum() == 48  # White text on a dark label
+
+def test_preprocess_removes_skew():
+    image, skew = preprocess(render(LABEL, skew=5.0))
+    assert skew == -5.0
+    assert abs(estimate_skew(image)) <= 0.5
+
+def test_pipeline_parses_locally_when_gemini_times_out():
+    stub = StubExtractionClients(text=LABEL, llm_delay=0.3)
+    local = FakeLocalEngine()
+    pipeline = ExtractionPipeline(stub.ocr, stub.categorize, local=local, llm_timeout=0.05)
+
+    result = asyncio.run(pipeline.extract(b"image"))
+
+    assert result[0] == "Lisinopril" and result[4] == 2
+    assert local.read == 0  # Vision's text was parsed; no local OCR needed
+    assert pipeline.stats()["fallbacks"] == 1
+
+def test_pipeline_reads_locally_when_vision_fails():
+    def broken_ocr(image):
+        raise ConnectionError("Vision unavailable")
+    local = FakeLocalEngine()
+    pipeline = ExtractionPipeline(broken_ocr, lambda text: None, local=local)
+
+    assert asyncio.run(pipeline.extract(b"image"))[1] == "10 mg"
+    assert local.read == 1
+
+def test_fallback_is_not_queued_behind_stuck_remote_calls():
+    def stuck_ocr(image_content):
+        time.sleep(0.5)
+        return LABEL
+    # One thread, already taken by the timed-out Vision call
+    pipeline = ExtractionPipeline(stuck_ocr, lambda text: None, local=FakeLocalEngine(), max_concurrency=1, ocr_timeout=0.05)
+
+    started = time.perf_counter()
+    result = asyncio.run(pipeline.extract(b"image"))
+
+    assert result[0] == "Lisinopril"
+    assert time.perf_counter() - started < 0.4
+    pipeline.shutdown()
+
+def test_slow_local_engine_gives_up_with_the_remote_error():
+    class SlowLocalEngine(FakeLocalEngine):
+        def extract(self, image_content):
+            time.sleep(0.5)
+            return super().extract(image_content)
+
+    def broken_ocr(image_content):
+        raise ConnectionError("Vision unavailable")
+    pipeline = ExtractionPipeline(broken_ocr, lambda text: None, local=SlowLocalEngine(), local_timeout=0.05)
+
+    started = time.perf_counter()
+    with pytest.raises(ConnectionError):
+        asyncio.run(pipeline.extract(b"image"))
+    assert time.perf_counter() - started < 0.4
+    assert pipeline.stats()["timeouts"]["local"] == 1
+    pipeline.shutdown()
+
+def test_tesseract_is_looked_for_off_the_event_loop(monkeypatch):
+    import threading
+    looked_up_on = []
+
+    def no_backend():
+        looked_up_on.append(threading.current_thread())
+        return None
+
+    monkeypatch.setattr(inference, "get_local_ocr_backend", no_backend)
+
+    def broken_ocr(image_content):
+        raise ConnectionError("Vision unavailable")
+    pipeline = ExtractionPipeline(broken_ocr, lambda text: None, local=inference.LocalExtractionEngine(detect_backend=True))
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            asyncio.run(pipeline.extract(b"image"))
+
+    # Checked once, on the local pool; no local OCR means no fallback
+    assert len(looked_up_on) == 1 and looked_up_on[0] is not threading.main_thread()
+    assert pipeline.stats()["fallbacks"] == 0
+    pipeline.shutdown()
@@ -0,0 +1,100 @@
+import json
+from Security.log_chain import LogChain, verify_records
+
+KEY = "test-chain-key"
+
+def sealed_lines(batches=5, per_batch=3):
+    chain = LogChain(KEY, chain_id="chain-a")
+    return [
+        json.dumps(chain.seal([{"user": f"user{b}", "event_type": "TEST", "n": str(i)} for i in range(per_batch)]))
+        for b in range(batches)
+    ]
+
+def test_intact_chain_verifies():
+    result = verify_records(sealed_lines(), KEY)
+
+    assert result.ok, result.errors
+    assert (result.batches, result.events, result.chains) == (5, 15, 1)
+
+def test_edited_event_is_detected():
+    lines = sealed_lines()
+    record = json.loads(lines[2])
+    record["events"][0]["user"] = "someone_else"
+    lines[2] = json.dumps(record)
+
+    result = verify_records(lines, KEY)
+    assert not result.ok
+    assert "line 3" in result.errors[0]
+
+def test_wrong_key_is_detected():
+    result = verify_records(sealed_lines(), "another-key")
+    assert result.error_count == 5
+
+def test_deleted_batch_is_detected():
+    lines = sealed_lines()
+    del lines[2]
+
+    result = verify_records(lines, KEY)
+    assert not result.ok
+    assert "expected batch 2, found 3" in result.errors[0]
+
+def test_truncated_head_needs_allow_partial():
+    lines = sealed_lines()[2:]
+
+    assert not verify_records(lines, KEY).ok
+    assert verify_records(lines, KEY, allow_partial=True).ok
+
+def test_reordered_batches_are_detected():
+    lines = sealed_lines()
+    lines[1], lines[3] = lines[3], lines[1]
+
+    assert not verify_records(lines, KEY).ok
+
+def test_cloud_logging_export_and_interleaved_chains():
+    other = LogChain(KEY, chain_id="chain-b")
+    lines = []
+    for line in sealed_lines(batches=3):
+        lines.append(json.dumps({"jsonPayload": json.loads(line), "severity": "INFO"}))
+        lines.append(json.dumps({"jsonPayload": other.seal([{"user": "x"}])}))
+    lines.append(json.dumps({"textPayload": "unrelated entry"}))
+
+    result = verify_records(lines, KEY)
+    assert result.ok, result.errors
+    assert (result.batches, result.chains) == (6, 2)
+
+def test_fallback_logger_lines_verify():
+    lines = [f"INFO:fallback-logger:SECURITY LOG BATCH: {line}" for line in sealed_lines()]
+    lines.insert(1, "WARNING: SDK_KEY not set or file missing. Using local fallback logger.")
+
+    result = verify_records(lines, KEY)
+    assert result.ok, result.errors
+    assert result.batches == 5
+
+def test_failed_write_leaves_no_gap(monkeypatch):
+    from Security import security_logging
+    from Security.log_pipeline import LogPipeline
+
+    class FlakySink:
+        def __init__(self):
+            self.lines, self.calls = [], 0
+
+        def log_struct(self, record):
+            self.calls += 1
+            if self.calls == 1:
+                raise ConnectionError("Cloud Logging unavailable")
+            self.lines.append(json.dumps(record))
+
+    sink = FlakySink()
+    monkeypatch.setattr(security_logging, "security_log_chain", LogChain(KEY, chain_id="chain-f"))
+    monkeypatch.setattr(security_logging, "get_security_logger", lambda: sink)
+
+    pipeline = LogPipeline(sink=security_logging.write_security_events, batch_size=1, flush_interval=0.01, retry_backoff=0.01)
+    for i in range(4):
+        pipeline.enqueue({"user": f"user{i}", "event_type": "TEST"})
+    assert pipeline.drain(timeout=5)
+
+    # The rejected batch is sealed again on its retry
+    assert pipeline.stats()["retried"] == 1 and len(sink.lines) == 4
+    result = verify_records(sink.lines, KEY)
+    assert result.ok, result.errors
+    assert result.batches == 4
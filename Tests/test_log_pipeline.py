@@ -0,0 +1,200 @@
+import asyncio
+import threading
+import time
+from Security.log_pipeline import LogPipeline
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_entries_are_written_in_batches():
+    batches = []
+    pipeline = LogPipeline(sink=batches.append, batch_size=10, flush_interval=0.05)
+    for i in range(25):
+        pipeline.enqueue({"n": i})
+
+    assert pipeline.drain(timeout=5)
+    assert [entry["n"] for batch in batches for entry in batch] == list(range(25))
+    assert max(len(batch) for batch in batches) <= 10
+
+def test_flush_interval_bounds_delivery_delay():
+    batches = []
+    pipeline = LogPipeline(sink=batches.append, batch_size=100, flush_interval=0.05)
+    pipeline.enqueue({"n": 1})
+
+    assert wait_for(lambda: batches)
+    pipeline.drain()
+
+def test_drop_policy_counts_overflow():
+    def slow_sink(batch):
+        time.sleep(0.2)
+
+    pipeline = LogPipeline(sink=slow_sink, max_queue=2, batch_size=1, flush_interval=0.01, overflow="drop")
+    results = [pipeline.enqueue({"n": i}) for i in range(20)]
+
+    assert not all(results)
+    assert pipeline.stats()["dropped"] == results.count(False)
+    pipeline.drain()
+
+def test_spilled_entries_are_replayed(tmp_path):
+    written = []
+
+    def slow_sink(batch):
+        time.sleep(0.05)
+        written.extend(batch)
+
+    spill_path = str(tmp_path / "spill.ndjson")
+    pipeline = LogPipeline(
+        sink=slow_sink, max_queue=2, batch_size=5, flush_interval=0.01, overflow="spill", spill_path=spill_path
+    )
+    for i in range(30):
+        assert pipeline.enqueue({"n": i})
+
+    assert pipeline.stats()["spilled"] > 0
+    assert pipeline.drain(timeout=10)
+    assert sorted(entry["n"] for entry in written) == list(range(30))
+
+def test_rejected_batches_are_retried_with_backoff(tmp_path):
+    calls = []
+
+    def flaky_sink(batch):
+        calls.append((time.monotonic(), batch))
+        if len(calls) < 3:
+            raise RuntimeError("logging backend unavailable")
+
+    pipeline = LogPipeline(
+        sink=flaky_sink, batch_size=10, flush_interval=0.01, retries=3, retry_backoff=0.05,
+        spill_path=str(tmp_path / "spill.ndjson")
+    )
+    pipeline.enqueue({"n": 1})
+
+    assert wait_for(lambda: pipeline.stats()["written"] == 1)
+    assert pipeline.drain()
+    assert [batch for _, batch in calls] == [[{"n": 1}]] * 3
+    # Waits 0.05 s, then 0.1 s
+    assert calls[2][0] - calls[0][0] >= 0.15
+    assert pipeline.stats()["failed"] == 0 and not (tmp_path / "spill.ndjson").exists()
+
+def test_batches_the_sink_keeps_rejecting_are_spilled_and_replayed(tmp_path):
+    spill_path = tmp_path / "spill.ndjson"
+    written = []
+    sink_down = True
+
+    def sink(batch):
+        if sink_down:
+            raise RuntimeError("logging backend unavailable")
+        written.extend(batch)
+
+    # The drop policy still keeps rejected batches; only queue overflow is dropped
+    pipeline = LogPipeline(
+        sink=sink, batch_size=10, flush_interval=0.01, overflow="drop", retries=1, retry_backoff=0.01,
+        spill_path=str(spill_path)
+    )
+    for i in range(3):
+        pipeline.enqueue({"n": i})
+
+    assert wait_for(lambda: pipeline.stats()["failed"] >= 3)
+    assert wait_for(spill_path.exists)
+    sink_down = False
+
+    assert wait_for(lambda: len(written) == 3)
+    assert pipeline.drain()
+    assert sorted(entry["n"] for entry in written) == [0, 1, 2]
+    assert not spill_path.exists() and not list(tmp_path.glob("*.replay"))
+
+def test_a_failed_batch_at_shutdown_stays_in_the_spill_file(tmp_path):
+    spill_path = tmp_path / "spill.ndjson"
+
+    def sink(batch):
+        raise RuntimeError("logging backend unavailable")
+
+    pipeline = LogPipeline(sink=sink, batch_size=10, flush_interval=5, retries=3, retry_backoff=5, spill_path=str(spill_path))
+    pipeline.enqueue({"n": 1})
+
+    # No retries while stopping, so the backoff does not hold up the drain
+    assert pipeline.drain(timeout=2)
+    assert spill_path.read_text(encoding="utf-8") == '{"n": 1}\n'
+
+def test_block_policy_never_stalls_the_event_loop(tmp_path):
+    def slow_sink(batch):
+        time.sleep(0.2)
+
+    pipeline = LogPipeline(
+        sink=slow_sink, max_queue=1, batch_size=1, flush_interval=0.01,
+        overflow="block", block_timeout=0.5, spill_path=str(tmp_path / "spill.ndjson")
+    )
+
+    async def handler():
+        started = time.perf_counter()
+        for i in range(5):
+            assert pipeline.enqueue({"n": i})
+        return time.perf_counter() - started
+
+    assert asyncio.run(handler()) < 0.2
+    assert pipeline.stats()["spilled"] > 0 and pipeline.stats()["dropped"] == 0
+    assert pipeline.drain(timeout=10)
+
+def test_corrupt_spill_lines_are_quarantined(tmp_path):
+    spill_path = tmp_path / "spill.ndjson"
+    spill_path.write_text('{"n": 1}\n{"n": 2, "us\n{"n": 3}\n', encoding="utf-8")
+    written = []
+
+    pipeline = LogPipeline(sink=written.extend, batch_size=10, flush_interval=0.01, overflow="spill", spill_path=str(spill_path))
+    pipeline.enqueue({"n": 4})
+    assert pipeline.drain(timeout=5)
+
+    assert sorted(entry["n"] for entry in written) == [1, 3, 4]
+    assert (tmp_path / "spill.ndjson.quarantine").read_text(encoding="utf-8") == '{"n": 2, "us\n'
+    assert pipeline.stats()["quarantined"] == 1
+    assert not list(tmp_path.glob("*.replay"))
+
+def test_overflow_is_spilled_by_the_flusher_thread(tmp_path, monkeypatch):
+    writers = []
+    append = LogPipeline._append_to_spill
+
+    def record_thread(self, entries):
+        if entries:
+            writers.append(threading.current_thread().name)
+        append(self, entries)
+
+    monkeypatch.setattr(LogPipeline, "_append_to_spill", record_thread)
+    written = []
+
+    def slow_sink(batch):
+        time.sleep(0.05)
+        written.extend(batch)
+
+    pipeline = LogPipeline(
+        sink=slow_sink, max_queue=1, batch_size=1, flush_interval=0.01, spill_path=str(tmp_path / "spill.ndjson")
+    )
+
+    async def handler():
+        for i in range(10):
+            assert pipeline.enqueue({"n": i})
+
+    asyncio.run(handler())
+    assert pipeline.stats()["spilled"] > 0
+    assert pipeline.drain(timeout=10)
+    assert sorted(entry["n"] for entry in written) == list(range(10))
+    assert writers and set(writers) == {"security-log-flusher"}
+
+def test_entries_after_drain_are_spilled_by_the_caller(tmp_path):
+    written = []
+    spill_path = tmp_path / "spill.ndjson"
+    pipeline = LogPipeline(sink=written.extend, flush_interval=0.01, spill_path=str(spill_path))
+    pipeline.enqueue({"n": 1})
+    assert pipeline.drain()
+
+    assert pipeline.enqueue({"n": 2})
+    assert written == [{"n": 1}] and not pipeline._thread.is_alive()
+    assert spill_path.read_text(encoding="utf-8") == '{"n": 2}\n'
+
+    # The next process replays it
+    restarted = LogPipeline(sink=written.extend, flush_interval=0.01, spill_path=str(spill_path))
+    restarted.enqueue({"n": 3})
+    assert restarted.drain()
+    assert sorted(entry["n"] for entry in written) == [1, 2, 3]
@@ -0,0 +1,123 @@
+import os
+os.environ["USE_DUMMY_DATA"] = "1"
+import pytest
+from google.api_core.exceptions import NotFound
+from fastapi.testclient import TestClient
+import Users.routes
+import Medication.routes
+import SDK_Database.Update_Med as Update_Med
+import SDK_Database.read as read
+import SDK_Database.versions as versions
+from main import app
+from Security.token_manager import create_access_token
+from Security.state_backend import get_state_backend
+from SDK_Database.user_cache import principal_cache
+
+STORED = {
+    "name": "Aspirin", "dosage": "81mg", "frequency": 1, "instructions": "With food", "pill_count": 30,
+    "times": ["08:00"], "days": ["Monday"], "pillShape": "circle", "pillColorLeft": "#FFFFFF",
+    "pillColorRight": "#FFFFFF", "pillColor": "#FFFFFF", "backgroundColor": "#D9D9D9",
+    "start_date": "2025-03-01", "end_date": "2025-03-30",
+}
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+class FakeDocument:
+    def __init__(self, docs, path):
+        self.docs = docs
+        self.path = path
+
+class FakeCollection:
+    def __init__(self, docs, path):
+        self.docs = docs
+        self.path = path
+
+    def document(self, doc_id):
+        return FakeDocument(self.docs, f"{self.path}/{doc_id}")
+
+    def select(self, fields):
+        return self
+
+    async def stream(self):
+        for path, data in sorted(self.docs.items()):
+            parent, _, doc_id = path.rpartition("/")
+            if parent == self.path:
+                yield FakeSnapshot(doc_id, data)
+
+class FakeBatch:
+    def __init__(self, docs):
+        self.docs = docs
+        self.writes = []
+
+    def update(self, ref, data):
+        self.writes.append((ref, data, False))
+
+    def set(self, ref, data, merge=False):
+        self.writes.append((ref, data, True))
+
+    async def commit(self):
+        for ref, data, upsert in self.writes:
+            if not upsert and ref.path not in self.docs:
+                raise NotFound(f"No document to update: {ref.path}")
+            self.docs.setdefault(ref.path, {}).update(data)
+
+class FakeFirestore:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def collection(self, path):
+        return FakeCollection(self.docs, path)
+
+    def batch(self):
+        return FakeBatch(self.docs)
+
+@pytest.fixture
+def client(monkeypatch):
+    db = FakeFirestore({"users/1/medications/Aspirin": dict(STORED)})
+    for module in (Update_Med, read, versions):
+        monkeypatch.setattr(module, "async_db", db)
+
+    async def version(user_id):
+        return 1, None
+
+    async def taken_today(user_id):
+        return set()
+
+    monkeypatch.setattr(Medication.routes, "read_meds_version", version)
+    monkeypatch.setattr(Medication.routes, "get_taken_today", taken_today)
+    monkeypatch.setattr(Users.routes, "USE_DUMMY_DATA", True)
+    get_state_backend().clear()
+    principal_cache.set("alice", {"user_id": "1", "connected_users": {}})
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'alice', 'role': 'basic'})}"}
+    yield TestClient(app), headers
+    principal_cache.clear()
+
+def update_body(**overrides):
+    body = {
+        "name": "Aspirin", "dosage": "81mg", "instructions": "With food", "frequency": 2, "pillcount": 60,
+        "times": ["08:00", "20:00"], "days": ["Everyday"], "pillShape": "oval", "pillColorLeft": "#FF0000",
+        "pillColorRight": "#FFFFFF", "pillColor": "#FF0000", "backgroundColor": "#D9D9D9",
+    }
+    body.update(overrides)
+    return body
+
+def test_put_writes_every_field_under_its_stored_name(client):
+    test_client, headers = client
+
+    assert test_client.put("/medications/Aspirin/", json=update_body(), headers=headers).status_code == 200
+    [med] = test_client.get("/medicationsmedpage/", headers=headers).json()
+
+    assert med["times"] == ["08:00", "20:00"] and med["quantity"] == 60 and med["timesPerDay"] == 2
+    assert len(med["days"]) == 7 and med["pillShape"] == "oval" and med["pillColor"] == "#FF0000"
+    assert (med["startDate"], med["endDate"]) == ("2025-03-01", "2025-03-30")  # Not part of the request
+
+def test_put_for_an_unknown_medication_is_a_404(client):
+    test_client, headers = client
+
+    assert test_client.put("/medications/Unknown/", json=update_body(name="Unknown"), headers=headers).status_code == 404
@@ -0,0 +1,33 @@
+from Medication.views import MedicationView, MEDICATION_LIST_VIEW, MEDICATION_PAGE_VIEW
+
+STORED = {
+    "name": "Aspirin", "dosage": "81mg", "frequency": 1, "pill_count": 30,
+    "instructions": "With food", "times": ["08:00"], "days": ["Monday"],
+    "start_date": "2025-01-01", "end_date": "2025-01-30", "pillShape": "oval",
+}
+
+def test_views_only_request_fields_they_render():
+    assert "instructions" not in MEDICATION_PAGE_VIEW.source_fields
+    assert "created_at" not in MEDICATION_LIST_VIEW.source_fields
+    assert set(MEDICATION_LIST_VIEW.source_fields) < set(MEDICATION_PAGE_VIEW.source_fields)
+
+def test_page_view_renames_and_fills_defaults():
+    projected = {field: STORED[field] for field in MEDICATION_PAGE_VIEW.source_fields if field in STORED}
+    out = MEDICATION_PAGE_VIEW.render(projected)
+
+    assert out["quantity"] == 30 and out["timesPerDay"] == 1
+    assert out["startDate"] == "2025-01-01"
+    assert out["pillShape"] == "oval" and out["pillColor"] == "#FFFFFF"
+    assert out["taken"] is False
+    assert "instructions" not in out
+
+def test_list_defaults_are_not_shared_between_documents():
+    first = MEDICATION_LIST_VIEW.render({})
+    first["times"].append("09:00")
+
+    assert MEDICATION_LIST_VIEW.render({})["times"] == []
+
+def test_duplicate_sources_are_fetched_once():
+    view = MedicationView("dup", (("a", "x", None), ("b", "x", None)))
+    assert view.source_fields == ("x",)
+    assert view.render({"x": 1}) == {"a": 1, "b": 1}
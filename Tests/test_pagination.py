@@ -0,0 +1,70 @@
+import os
+os.environ["USE_DUMMY_DATA"] = "1"
+import json
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+import Users.routes
+import Medication.routes
+from main import app
+from http_utils import encode_cursor, decode_cursor, page_size
+from Security.token_manager import create_access_token
+from Security.state_backend import get_state_backend
+from SDK_Database.user_cache import principal_cache
+from Backend.config import PAGE_SIZE_MAX
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def admin_headers(monkeypatch):
+    monkeypatch.setattr(Users.routes, "USE_DUMMY_DATA", True)
+    get_state_backend().clear()
+    # Resolve the principal without a Firestore lookup
+    principal_cache.set("dave", {"user_id": "4", "connected_users": {}})
+    yield {"Authorization": f"Bearer {create_access_token({'sub': 'dave', 'role': 'admin'})}"}
+    principal_cache.clear()
+
+def test_cursor_round_trip_and_validation():
+    assert decode_cursor(encode_cursor("med_42")) == "med_42"
+    assert decode_cursor(None) is None
+    with pytest.raises(HTTPException) as error:
+        decode_cursor("not a cursor!")
+    assert error.value.status_code == 400
+
+def test_page_size_is_capped():
+    assert page_size(10**6) == PAGE_SIZE_MAX
+    with pytest.raises(HTTPException):
+        page_size(0)
+
+def test_users_are_paged_without_passwords(admin_headers):
+    first = client.get("/users/?limit=3", headers=admin_headers)
+    assert first.status_code == 200
+    assert [user["username"] for user in first.json()] == ["alice", "bob", "charlie"]
+    assert all("password" not in user for user in first.json())
+
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get(f"/users/?limit=3&cursor={cursor}", headers=admin_headers)
+    assert [user["username"] for user in second.json()] == ["dave"]
+    assert "X-Next-Cursor" not in second.headers
+
+def test_users_stream_as_ndjson(admin_headers):
+    response = client.get("/users/?format=ndjson", headers=admin_headers)
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    users = [json.loads(line) for line in response.text.splitlines()]
+    assert [user["username"] for user in users] == ["alice", "bob", "charlie", "dave"]
+
+def test_admin_medications_resume_from_cursor(admin_headers, monkeypatch):
+    calls = []
+
+    async def fake_page_collection(path, limit, start_after=None, fields=None):
+        calls.append((path, limit, start_after))
+        return [("Aspirin", {"name": "Aspirin"}), ("Ibuprofen", {"name": "Ibuprofen"})], "Ibuprofen"
+
+    monkeypatch.setattr(Medication.routes, "page_collection", fake_page_collection)
+
+    first = client.get("/medications/?limit=2", headers=admin_headers)
+    assert [med["name"] for med in first.json()] == ["Aspirin", "Ibuprofen"]
+    client.get(f"/medications/?limit=2&cursor={first.headers['X-Next-Cursor']}", headers=admin_headers)
+
+    assert calls == [("medications", 2, None), ("medications", 2, "Ibuprofen")]
@@ -0,0 +1,28 @@
+import asyncio
+from Security import password_hashing
+
+def test_hash_and_verify_run_off_the_event_loop():
+    async def roundtrip():
+        hashed = await password_hashing.hash_password_async("hunter2")
+        ok = await password_hashing.verify_password_async("hunter2", hashed)
+        bad = await password_hashing.verify_password_async("wrong", hashed)
+        return hashed, ok, bad
+
+    hashed, ok, bad = asyncio.run(roundtrip())
+    assert hashed.startswith("$2b$")
+    assert ok is True
+    assert bad is False
+
+def test_latency_metrics_are_recorded():
+    before = password_hashing.verify_latency.count
+    hashed = password_hashing.hash_password("qwerty")
+    asyncio.run(password_hashing.verify_password_async("qwerty", hashed))
+
+    stats = password_hashing.password_hashing_stats()
+    assert stats["verify"]["count"] == before + 1
+    assert stats["verify"]["max"] > 0
+
+def test_configured_cost_factor_is_applied():
+    hashed = password_hashing.hash_password("test123")
+    rounds = int(hashed.split("$")[2])
+    assert rounds == password_hashing.BCRYPT_ROUNDS
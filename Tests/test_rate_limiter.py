@@ -4,7 +4,9 @@ import os
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from Security.rate_limiter import rate_limiter, request_log  # Import the shared request_log
+from Security.rate_limiter import rate_limiter
+from Security.state_backend import get_state_backend  # Shared rate-limit state
+from Security.rate_limit_engine import SlidingWindowRateLimiter
 
 # Create a minimal FastAPI app for testing just the middleware
 app = FastAPI()
@@ -17,7 +19,7 @@ def dummy_endpoint():
 client = TestClient(app)
 
 def test_rate_limiting_basic():
-    request_log.clear()  # Ensure clean state before starting test
+    get_state_backend().clear()  # Ensure clean state before starting test
 
     allowed = 100
     for i in range(allowed + 10):
@@ -26,3 +28,39 @@ def test_rate_limiting_basic():
             assert response.status_code == 200, f"Unexpected fail at {i+1}"
         else:
             assert response.status_code == 429, f"Expected 429 at {i+1}"
+
+# === Sliding Window Engine ===
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def test_previous_window_is_weighted_by_overlap():
+    clock = FakeClock()
+    limiter = SlidingWindowRateLimiter(limit=10, window_seconds=60, clock=clock)
+    for _ in range(10):
+        assert limiter.hit("ip")
+    assert not limiter.hit("ip")
+
+    # Halfway into the next window, half of the previous 10 still count
+    clock.now = 90
+    allowed = sum(limiter.hit("ip") for _ in range(10))
+    assert allowed == 5
+
+def test_identifier_table_is_bounded():
+    limiter = SlidingWindowRateLimiter(limit=5, window_seconds=60, max_identifiers=100)
+    for i in range(1000):
+        limiter.hit(f"client-{i}")
+    assert len(limiter) == 100
+
+def test_idle_identifiers_are_swept():
+    clock = FakeClock()
+    limiter = SlidingWindowRateLimiter(limit=5, window_seconds=60, clock=clock)
+    for i in range(5):
+        limiter.hit(f"client-{i}")
+
+    clock.now = 180  # two full windows later
+    limiter.hit("fresh")
+    assert len(limiter) == 1
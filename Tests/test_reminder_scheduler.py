@@ -0,0 +1,132 @@
+import os
+os.environ["USE_DUMMY_DATA"] = "1"
+import asyncio
+from datetime import datetime, timezone
+import pytest
+from zoneinfo import ZoneInfo
+from Reminders.scheduler import ReminderScheduler, minute_stamp, next_occurrence, stamp_to_datetime
+from Reminders.notifiers import InMemoryNotifier
+
+def at(*fields, tz=timezone.utc):
+    return datetime(*fields, tzinfo=tz)
+
+MONDAY_7AM = at(2025, 1, 6, 7, 0)
+
+def reminder(times, days=("Everyday",), status="active", tz=None):
+    return {"user_id": "1", "med_id": "Aspirin", "times": list(times), "days": list(days), "status": status, "timezone": tz}
+
+def test_next_occurrence_rolls_to_the_next_scheduled_day():
+    now = minute_stamp(datetime(2025, 1, 6, 21, 0))  # Monday evening
+    due = next_occurrence((480,), 1 << 2, now)  # Wednesdays at 08:00
+
+    assert stamp_to_datetime(due) == datetime(2025, 1, 8, 8, 0)
+
+def test_pops_due_reminders_in_time_order_and_reschedules():
+    scheduler = ReminderScheduler(InMemoryNotifier(), clock=lambda: MONDAY_7AM)
+    scheduler.upsert("b", reminder(["09:00"]))
+    scheduler.upsert("a", reminder(["08:00", "20:00"]))
+
+    assert scheduler.pop_due(at(2025, 1, 6, 7, 59)) == []
+    due = scheduler.pop_due(at(2025, 1, 6, 9, 0))
+    assert [(key, at.hour) for key, _, at in due] == [("a", 8), ("b", 9)]
+    assert scheduler.next_due() == at(2025, 1, 6, 20, 0)
+
+def test_updates_and_removals_skip_stale_heap_entries():
+    scheduler = ReminderScheduler(InMemoryNotifier(), clock=lambda: MONDAY_7AM)
+    scheduler.upsert("a", reminder(["08:00"]))
+    scheduler.upsert("a", reminder(["10:00"]))
+    scheduler.upsert("b", reminder(["09:00"]))
+    scheduler.upsert("b", reminder(["09:00"], status="inactive"))
+
+    due = scheduler.pop_due(at(2025, 1, 6, 12, 0))
+    assert [(key, at.hour) for key, _, at in due] == [("a", 10)]
+    assert len(scheduler) == 1
+
+def test_missed_occurrences_fire_once():
+    scheduler = ReminderScheduler(InMemoryNotifier(), clock=lambda: MONDAY_7AM)
+    scheduler.upsert("a", reminder(["08:00", "12:00", "18:00"]))
+
+    assert len(scheduler.pop_due(at(2025, 1, 8, 7, 0))) == 1  # Two days later
+    assert scheduler.next_due() == at(2025, 1, 8, 8, 0)
+
+def test_load_and_dispatch_through_notifier():
+    notifier = InMemoryNotifier()
+    scheduler = ReminderScheduler(notifier, clock=lambda: MONDAY_7AM)
+    scheduler.load((f"r{i}", reminder(["08:00"], days=["Monday"])) for i in range(1000))
+
+    assert asyncio.run(scheduler.dispatch_due(at(2025, 1, 6, 8, 0))) == 1000
+    assert len(notifier.sent) == 1000 and notifier.sent[0][1] == at(2025, 1, 6, 8, 0)
+    assert scheduler.next_due() == at(2025, 1, 13, 8, 0)
+
+def test_reload_keeps_the_minute_that_came_due_meanwhile():
+    notifier = InMemoryNotifier()
+    now = [at(2025, 1, 6, 7, 59)]
+    scheduler = ReminderScheduler(notifier, clock=lambda: now[0])
+    scheduler.upsert("a", reminder(["08:00"]))
+    asyncio.run(scheduler.dispatch_due())
+
+    async def loader():
+        yield "a", reminder(["08:00"])
+
+    # The reload comes due after the loop slept into 08:00
+    now[0] = at(2025, 1, 6, 8, 0, 30)
+    asyncio.run(scheduler.reload(loader))
+
+    assert asyncio.run(scheduler.dispatch_due()) == 1
+    assert notifier.sent[0][1] == at(2025, 1, 6, 8, 0)
+
+def test_updates_made_during_a_reload_are_replayed():
+    scheduler = ReminderScheduler(InMemoryNotifier(), clock=lambda: MONDAY_7AM)
+
+    async def loader():
+        yield "a", reminder(["08:00"])
+        yield "b", reminder(["09:00"])
+        # Writes that land while the snapshot is being read and built
+        scheduler.upsert("a", reminder(["10:00"]))
+        scheduler.remove("b")
+        scheduler.upsert("c", reminder(["11:00"]))
+
+    asyncio.run(scheduler.reload(loader))
+
+    due = scheduler.pop_due(at(2025, 1, 6, 12, 0))
+    assert [(key, at.hour) for key, _, at in due] == [("a", 10), ("c", 11)]
+
+def test_times_are_read_in_the_reminders_timezone():
+    notifier = InMemoryNotifier()
+    scheduler = ReminderScheduler(notifier, clock=lambda: MONDAY_7AM)
+    scheduler.upsert("ny", reminder(["08:00"], tz="America/New_York"))
+    scheduler.upsert("berlin", reminder(["08:00"], tz="Europe/Berlin"))
+
+    # It is already 08:00 in Berlin (UTC+1), so Berlin's next is Tuesday 07:00 UTC; New York's (UTC-5) is 13:00 UTC today
+    assert scheduler.next_due() == at(2025, 1, 6, 13, 0)
+    asyncio.run(scheduler.dispatch_due(at(2025, 1, 6, 13, 0)))
+    assert scheduler.next_due() == at(2025, 1, 7, 7, 0)
+    [(sent, due_at)] = notifier.sent
+    assert sent["timezone"] == "America/New_York"
+    assert due_at == at(2025, 1, 6, 8, 0, tz=ZoneInfo("America/New_York")) and due_at.hour == 8
+
+def test_local_times_hold_across_a_dst_change():
+    scheduler = ReminderScheduler(InMemoryNotifier(), clock=lambda: at(2025, 3, 8, 12, 0))
+    scheduler.upsert("ny", reminder(["08:00"], tz="America/New_York"))
+
+    # EST (UTC-5) on Saturday, EDT (UTC-4) from Sunday 9 March
+    assert [due_at.hour for _, _, due_at in scheduler.pop_due(at(2025, 3, 8, 13, 0))] == [8]
+    assert scheduler.next_due() == at(2025, 3, 9, 12, 0)
+
+def test_upsert_schedules_from_the_dispatch_watermark():
+    notifier = InMemoryNotifier()
+    now = [at(2025, 1, 6, 7, 59)]
+    scheduler = ReminderScheduler(notifier, clock=lambda: now[0])
+    asyncio.run(scheduler.dispatch_due())
+
+    # Saved after the clock passed 08:00, before the loop dispatched that minute
+    now[0] = at(2025, 1, 6, 8, 0, 30)
+    scheduler.upsert("a", reminder(["08:00"]))
+
+    assert asyncio.run(scheduler.dispatch_due()) == 1
+    assert notifier.sent[0][1] == at(2025, 1, 6, 8, 0)
+
+def test_naive_datetimes_are_refused():
+    scheduler = ReminderScheduler(InMemoryNotifier())
+    with pytest.raises(ValueError):
+        scheduler.pop_due(datetime(2025, 1, 6, 8, 0))
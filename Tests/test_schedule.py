@@ -0,0 +1,81 @@
+import os
+os.environ["USE_DUMMY_DATA"] = "1"
+from datetime import date
+from fastapi.testclient import TestClient
+import Medication.schedule as schedule
+from Medication.schedule import DoseTimeline, parse_time, parse_days, schedule_cache
+from main import app
+from Security.token_manager import create_access_token
+from Security.state_backend import get_state_backend
+from SDK_Database.user_cache import principal_cache
+
+ASPIRIN = {
+    "name": "Aspirin", "dosage": "81mg", "times": ["20:00", "08:00"], "days": ["Monday", "Wednesday"],
+    "start_date": "2025-01-06", "end_date": "2025-01-19",  # Monday to Sunday, two weeks
+}
+VITAMIN = {"name": "Vitamin D", "times": ["12:30"], "days": ["Everyday"], "start_date": "2025-01-08", "end_date": "2025-01-08"}
+
+def test_parsers():
+    assert parse_time("08:00") == 480 and parse_time("8:30 PM") == 1230
+    assert parse_time("soon") is None
+    assert parse_days(["Monday", "fri"]) == {0, 4}
+    assert parse_days(["Everyday"]) == set(range(7))
+
+def test_expands_only_scheduled_days_within_dates():
+    timeline = DoseTimeline([ASPIRIN])
+
+    assert len(timeline) == 8  # 2 weeks * 2 days * 2 times
+    doses = timeline.between(date(2025, 1, 1), date(2025, 1, 31))
+    assert [(d["date"], d["time"]) for d in doses[:3]] == [
+        ("2025-01-06", "08:00"), ("2025-01-06", "20:00"), ("2025-01-08", "08:00")
+    ]
+    assert doses[0]["name"] == "Aspirin" and doses[0]["pillShape"] == "circle"
+
+def test_range_query_merges_medications_in_time_order():
+    timeline = DoseTimeline([ASPIRIN, VITAMIN])
+
+    doses = timeline.between(date(2025, 1, 8), date(2025, 1, 8))
+    assert [(d["time"], d["name"]) for d in doses] == [
+        ("08:00", "Aspirin"), ("12:30", "Vitamin D"), ("20:00", "Aspirin")
+    ]
+    assert timeline.between(date(2025, 1, 9), date(2025, 1, 12)) == []
+
+def test_open_ended_medication_uses_horizon():
+    med = {"name": "Daily", "times": ["09:00"], "days": ["Everyday"], "start_date": "2025-01-01"}
+    timeline = DoseTimeline([med], horizon_days=9)
+
+    assert len(timeline) == 10
+
+def test_schedule_route_caches_timeline(monkeypatch):
+    reads = []
+
+    version = {"1": 4}
+
+    async def fake_stream_user_medications(user_id, fields=None):
+        reads.append(user_id)
+        yield "Aspirin", dict(ASPIRIN)
+
+    async def fake_get_meds_version(user_id):
+        return version[user_id]
+
+    monkeypatch.setattr(schedule, "stream_user_medications", fake_stream_user_medications)
+    monkeypatch.setattr(schedule, "get_meds_version", fake_get_meds_version)
+    get_state_backend().clear()
+    schedule_cache.clear()
+    principal_cache.set("alice", {"user_id": "1", "connected_users": {}})
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'alice', 'role': 'basic'})}"}
+    client = TestClient(app)
+
+    first = client.get("/schedule?from=2025-01-06&to=2025-01-06", headers=headers)
+    second = client.get("/schedule?from=2025-01-13&to=2025-01-19", headers=headers)
+    assert first.status_code == 200 and len(first.json()) == 2
+    assert len(second.json()) == 4
+    assert reads == ["1"]
+
+    # A write through another worker bumps the version without touching this process's cache
+    version["1"] = 5
+    assert len(client.get("/schedule?from=2025-01-06&to=2025-01-06", headers=headers).json()) == 2
+    assert reads == ["1", "1"]
+
+    assert client.get("/schedule?from=2025-02-01&to=2025-01-01", headers=headers).status_code == 400
+    principal_cache.clear()
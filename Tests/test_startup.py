@@ -0,0 +1,68 @@
+import os
+os.environ["USE_DUMMY_DATA"] = "1"
+import json
+import subprocess
+import sys
+from Users.models import LazyUsers
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND = os.path.join(PROJECT_ROOT, "Backend")
+
+# Run in a fresh interpreter: the test session has already imported everything
+PROBE = """
+import json, sys
+import main
+from Users.models import users_db
+from SDK_Database.firebase_config import async_db
+from fastapi.testclient import TestClient
+root = TestClient(main.create_app()).get("/")
+loaded = [name for name in ("google.cloud.vision", "google.generativeai", "google.cloud.logging", "numpy",
+                            "google.cloud.firestore", "google.api_core.exceptions")
+          if name in sys.modules]
+import firebase_admin
+print(json.dumps({
+    "loaded": loaded,
+    "dummy_users_built": users_db._users is not None,
+    "firebase_initialized": bool(firebase_admin._apps),
+    "firestore_client_built": async_db._client is not None,
+    "root": root.json(),
+}))
+"""
+
+def test_importing_main_creates_no_clients():
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([PROJECT_ROOT, BACKEND])}
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=BACKEND, env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert probe["loaded"] == []
+    assert not probe["dummy_users_built"]
+    assert not probe["firebase_initialized"] and not probe["firestore_client_built"]
+    assert probe["root"]["dummy_data"] is True
+
+def test_dummy_users_are_built_once_on_first_access():
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {1: "alice"}
+
+    users = LazyUsers(build)
+    assert not builds
+    assert users[1] == "alice" and users.get(2) is None and list(users.values()) == ["alice"]
+    assert len(builds) == 1
+
+def test_startup_builds_the_dummy_users_before_serving(monkeypatch):
+    import main
+    from fastapi.testclient import TestClient
+    users = LazyUsers(lambda: {1: "alice"})
+    monkeypatch.setattr(main, "users_db", users)
+    monkeypatch.setattr(main, "USE_DUMMY_DATA", True)
+    # The rest of the session still uses these process-wide services
+    for shutdown in ("shutdown_password_executor", "shutdown_extraction_pipeline",
+                     "shutdown_medication_listeners", "shutdown_security_logging"):
+        monkeypatch.setattr(main, shutdown, lambda: None)
+
+    with TestClient(main.create_app()) as client:
+        assert users._users is not None
+        assert client.get("/").status_code == 200
@@ -0,0 +1,101 @@
+import pytest
+from Security.state_backend import (
+    InMemoryStateBackend,
+    RateLimitRule,
+    RedisStateBackend,
+    StateBatch,
+)
+
+fakeredis = pytest.importorskip("fakeredis")
+
+RULE = RateLimitRule("test", limit=3, window_seconds=60)
+
+def make_backends():
+    return [InMemoryStateBackend(), RedisStateBackend(fakeredis.FakeRedis(decode_responses=True))]
+
+@pytest.mark.parametrize("backend", make_backends(), ids=["memory", "redis"])
+def test_rate_limit_is_enforced(backend):
+    backend.clear()
+    allowed = []
+    for _ in range(5):
+        batch = StateBatch()
+        batch.hit(RULE, "203.0.113.7")
+        allowed.append(backend.execute(batch)[0])
+    assert allowed == [True, True, True, False, False]
+
+@pytest.mark.parametrize("backend", make_backends(), ids=["memory", "redis"])
+def test_revocation_and_refresh_state(backend):
+    backend.clear()
+    backend.store_refresh_token("alice", "refresh-1")
+    backend.revoke("access", "access-1")
+
+    batch = StateBatch()
+    revoked = batch.is_revoked("access", "access-1")
+    other = batch.is_revoked("access", "access-2")
+    stored = batch.get_refresh_token("alice")
+    results = backend.execute(batch)
+
+    assert results[revoked] is True
+    assert results[other] is False
+    assert results[stored] == "refresh-1"
+    assert backend.pop_refresh_token("alice") == "refresh-1"
+    assert backend.pop_refresh_token("alice") is None
+
+def test_redis_batch_is_one_round_trip():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    backend = RedisStateBackend(client)
+    executions = []
+    original = client.pipeline
+
+    def counting_pipeline(*args, **kwargs):
+        pipe = original(*args, **kwargs)
+        execute = pipe.execute
+        pipe.execute = lambda *a, **k: executions.append(1) or execute(*a, **k)
+        return pipe
+
+    client.pipeline = counting_pipeline
+    batch = StateBatch()
+    batch.hit(RULE, "203.0.113.7")
+    batch.is_revoked("access", "token")
+    batch.get_refresh_token("alice")
+    backend.execute(batch)
+
+    assert len(executions) == 1
+
+def test_workers_sharing_redis_share_limits():
+    server = fakeredis.FakeServer()
+    worker_a = RedisStateBackend(fakeredis.FakeRedis(server=server, decode_responses=True))
+    worker_b = RedisStateBackend(fakeredis.FakeRedis(server=server, decode_responses=True))
+
+    for backend in (worker_a, worker_b, worker_a):
+        batch = StateBatch()
+        batch.hit(RULE, "client")
+        assert backend.execute(batch)[0]
+
+    batch = StateBatch()
+    batch.hit(RULE, "client")
+    assert worker_b.execute(batch)[0] is False
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def test_revocations_expire_with_the_token():
+    clock = FakeClock()
+    backend = InMemoryStateBackend(clock=clock)
+    for i in range(10):
+        backend.revoke("access", f"jti-{i}", expires_at=clock.now + 60 + i)
+    backend.revoke("access", "already-expired", expires_at=clock.now - 1)
+
+    batch = StateBatch()
+    batch.is_revoked("access", "jti-3")
+    batch.is_revoked("access", "never-revoked")
+    batch.is_revoked("access", "already-expired")
+    assert backend.execute(batch) == [True, False, False]
+
+    clock.now += 120
+    backend.revoke("access", "late", expires_at=clock.now + 60)
+    assert backend.revoked_count() == 1
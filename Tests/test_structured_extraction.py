@@ -0,0 +1,88 @@
+import os
+os.environ["USE_DUMMY_DATA"] = "1"
+import asyncio
+import json
+import pytest
+import AI_Model.gemini as gemini
+from AI_Model.extraction import (
+    MedicineExtraction, ExtractionParseError, EXTRACTION_SCHEMA, parse_extraction, parse_batch_extraction
+)
+from AI_Model.inference import LocalExtractionEngine
+from AI_Model.pipeline import ExtractionPipeline
+
+RESPONSE = {"medicine_name": "Vitamin D3", "dosage": "1000 IU", "instructions": "Take 1 softgel every other day",
+            "pill_count": 60, "frequency": 0.5}
+
+def test_schema_response_parses_into_typed_result():
+    result = parse_extraction(json.dumps(RESPONSE))
+    assert isinstance(result, MedicineExtraction)
+    assert result.pill_count == 60 and result.frequency == 0.5
+    assert result == ("Vitamin D3", "1000 IU", "Take 1 softgel every other day", 60, 0.5)
+
+    nulls = parse_extraction(json.dumps({**RESPONSE, "pill_count": None}))
+    assert nulls.pill_count is None
+    assert nulls.as_strings()[3:] == ("", "0.5")
+    assert parse_extraction(json.dumps({**RESPONSE, "pill_count": "90 tablets", "frequency": "2"}))[3:] == (90, 2.0)
+
+def test_fenced_json_and_legacy_lines_still_parse():
+    fenced = "```json\n" + json.dumps(RESPONSE) + "\n```"
+    bold = "* **Medicine Name:** Ibuprofen\n* **Dosage:** 200 mg\n* **PillCount:** 100\n* **Frequency:** 4"
+    assert parse_extraction(fenced).medicine_name == "Vitamin D3"
+    assert parse_extraction(bold) == ("Ibuprofen", "200 mg", "", 100, 4)
+
+@pytest.mark.parametrize("response", [
+    "I'm sorry, that does not look like a medicine label.",
+    '{"medicine_name": "Levothyroxine", "dosage": "75 mc',
+    "[]",
+])
+def test_unusable_response_raises(response):
+    with pytest.raises(ExtractionParseError):
+        parse_extraction(response)
+
+def test_batch_response_is_matched_by_item_number():
+    response = json.dumps([{**RESPONSE, "item": 3}, {**RESPONSE, "item": 1, "medicine_name": "Aspirin"}])
+    results = parse_batch_extraction(response, 3)
+    assert [r.medicine_name if r else None for r in results] == ["Aspirin", None, "Vitamin D3"]
+
+def test_model_is_built_once_and_called_in_schema_mode(monkeypatch):
+    built, calls = [], []
+    class FakeModel:
+        def __init__(self, name):
+            built.append(name)
+        def generate_content(self, prompt, generation_config=None):
+            calls.append((prompt, generation_config))
+            return type("Response", (), {"text": json.dumps(RESPONSE)})()
+    monkeypatch.setattr(gemini.genai, "GenerativeModel", FakeModel)
+    monkeypatch.setattr(gemini, "_model", None)
+
+    gemini.categorize_medicine_text("VITAMIN D3 1000 IU")
+    result = gemini.categorize_medicine_text("ASPIRIN 81 MG")
+
+    assert built == [gemini.GEMINI_MODEL]
+    assert calls[1][0] == gemini.EXTRACTION_PROMPT + "ASPIRIN 81 MG"
+    assert calls[1][1].response_mime_type == "application/json"
+    assert calls[1][1].response_schema == EXTRACTION_SCHEMA
+    assert result.dosage == "1000 IU"
+
+def test_label_contents_are_not_written_to_stdout(monkeypatch, capsys):
+    class FakeModel:
+        def generate_content(self, prompt, generation_config=None):
+            batch = prompt.startswith(gemini.BATCH_EXTRACTION_PROMPT)
+            text = json.dumps([{**RESPONSE, "item": 1}] if batch else RESPONSE)
+            return type("Response", (), {"text": text})()
+    monkeypatch.setattr(gemini, "get_model", FakeModel)
+
+    gemini.categorize_medicine_text("VITAMIN D3 1000 IU")
+    gemini.categorize_medicine_texts(["VITAMIN D3 1000 IU"])
+
+    assert "Vitamin D3" not in capsys.readouterr().out
+
+def test_unusable_gemini_response_falls_back_to_local_parser():
+    def refuse(text):
+        raise ExtractionParseError("No extraction fields in response")
+    pipeline = ExtractionPipeline(lambda image: "ASPIRIN 81 MG\nTake 1 tablet daily\nQty: 30", refuse,
+                                  local=LocalExtractionEngine(backend=None))
+
+    result = asyncio.run(pipeline.extract(b"image"))
+
+    assert result == ("Aspirin", "81 mg", "Take 1 tablet daily", 30, 1)
@@ -0,0 +1,194 @@
+import os
+os.environ["USE_DUMMY_DATA"] = "1"
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi.testclient import TestClient
+import Users.routes
+import Medication.routes
+import Medication.sync
+import SDK_Database.Delete_Med as Delete_Med
+import SDK_Database.versions as versions
+from main import app
+from http_utils import encode_cursor
+from Security.token_manager import create_access_token
+from Security.state_backend import get_state_backend
+from SDK_Database.user_cache import principal_cache
+
+client = TestClient(app)
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+def at(minutes):
+    return T0 + timedelta(minutes=minutes)
+
+@pytest.fixture
+def store(monkeypatch):
+    """alice's medications, reminders and tombstones, filtered the way the Firestore queries are."""
+    state = {
+        "version": 2,
+        "queries": 0,
+        "meds": {"Aspirin": {"name": "Aspirin", "updated_at": at(1)}, "Lisinopril": {"name": "Lisinopril", "updated_at": at(2)}},
+        "reminders": {"r1": {"med_id": "Aspirin", "times": ["08:00"], "days": ["Monday"], "status": "active", "updated_at": at(1)}},
+        "tombstones": [{"kind": "medication", "id": "Old", "med_id": None, "deleted_at": at(0)}],
+    }
+
+    async def fake_version(user_id):
+        return state["version"]
+
+    async def fake_meds(user_id, since=None, fields=None):
+        state["queries"] += 1
+        for med_id, med in state["meds"].items():
+            if since is None or med["updated_at"] > since:
+                yield med_id, med
+
+    async def fake_reminders(user_id, since=None):
+        for reminder_id, reminder in state["reminders"].items():
+            if since is None or reminder["updated_at"] > since:
+                yield reminder_id, reminder
+
+    async def fake_tombstones(user_id, since=None):
+        for tombstone in state["tombstones"]:
+            if since is None or tombstone["deleted_at"] > since:
+                yield tombstone
+
+    async def fake_taken_today(user_id):
+        return {"Aspirin"}
+
+    monkeypatch.setattr(Medication.sync, "get_meds_version", fake_version)
+    monkeypatch.setattr(Medication.sync, "stream_changed_medications", fake_meds)
+    monkeypatch.setattr(Medication.sync, "stream_changed_reminders", fake_reminders)
+    monkeypatch.setattr(Medication.sync, "stream_tombstones", fake_tombstones)
+    monkeypatch.setattr(Medication.sync, "get_taken_today", fake_taken_today)
+    return state
+
+@pytest.fixture(autouse=True)
+def headers(monkeypatch):
+    monkeypatch.setattr(Users.routes, "USE_DUMMY_DATA", True)
+    get_state_backend().clear()
+    principal_cache.set("alice", {"user_id": "1", "connected_users": {}})
+    yield {"Authorization": f"Bearer {create_access_token({'sub': 'alice', 'role': 'basic'})}"}
+    principal_cache.clear()
+
+def test_first_sync_returns_everything(store, headers):
+    body = client.get("/sync", headers=headers).json()
+
+    assert [med["id"] for med in body["medications"]] == ["Aspirin", "Lisinopril"]
+    assert [med["taken"] for med in body["medications"]] == [True, False]
+    assert body["reminders"] == [{"id": "r1", "med_id": "Aspirin", "times": ["08:00"], "days": ["Monday"], "status": "active"}]
+    # Deletes from before the first sync are not news to the client
+    assert body["deleted"] == []
+    assert body["taken_today"] == ["Aspirin"]
+
+def test_unchanged_sync_reads_only_the_version(store, headers):
+    cursor = client.get("/sync", headers=headers).json()["cursor"]
+
+    body = client.get(f"/sync?since={cursor}", headers=headers).json()
+    assert body["medications"] == body["reminders"] == body["deleted"] == []
+    assert body["taken_today"] is None
+    assert store["queries"] == 1
+
+def test_delta_contains_only_changes_and_deletes(store, headers):
+    cursor = client.get("/sync", headers=headers).json()["cursor"]
+
+    store["meds"]["Lisinopril"]["updated_at"] = at(5)
+    del store["meds"]["Aspirin"]
+    del store["reminders"]["r1"]
+    store["tombstones"] += [
+        {"kind": "reminder", "id": "r1", "med_id": "Aspirin", "deleted_at": at(6)},
+        {"kind": "medication", "id": "Aspirin", "med_id": None, "deleted_at": at(6)},
+    ]
+    store["version"] += 2
+
+    body = client.get(f"/sync?since={cursor}", headers=headers).json()
+    assert [med["id"] for med in body["medications"]] == ["Lisinopril"]
+    assert body["reminders"] == []
+    assert [(item["kind"], item["id"]) for item in body["deleted"]] == [("reminder", "r1"), ("medication", "Aspirin")]
+
+    store["version"] += 1  # e.g. a dose event
+    again = client.get(f"/sync?since={body['cursor']}", headers=headers).json()
+    assert again["medications"] == again["deleted"] == []
+    assert again["taken_today"] == ["Aspirin"]
+
+def test_bad_and_expired_cursors(store, headers):
+    assert client.get("/sync?since=bm90LWEtY3Vyc29y", headers=headers).status_code == 400
+
+    stale = encode_cursor({"v": 1, "d": "2025-01-01", "m": None, "r": None, "t": None, "at": at(0).isoformat()})
+    assert client.get(f"/sync?since={stale}", headers=headers).status_code == 410
+
+class FakeBatch:
+    def __init__(self, log):
+        self.log = log
+
+    def set(self, ref, data, merge=False):
+        self.log.append(("set", ref, data))
+
+    def delete(self, ref):
+        self.log.append(("delete", ref))
+
+    async def commit(self):
+        self.log.append(("commit",))
+
+class FakeSnapshot:
+    def __init__(self, exists):
+        self.exists = exists
+
+class FakeRef:
+    """Document and collection reference that only records its path."""
+    def __init__(self, path, existing):
+        self.path, self.existing = path, existing
+
+    def collection(self, name):
+        return FakeRef(f"{self.path}/{name}", self.existing)
+
+    def document(self, name):
+        return FakeRef(f"{self.path}/{name}", self.existing)
+
+    async def get(self, field_paths=None):
+        return FakeSnapshot(self.path in self.existing)
+
+    def __eq__(self, other):
+        return self.path == other
+
+    def __repr__(self):
+        return self.path
+
+class FakeDB:
+    def __init__(self, existing):
+        self.log, self.existing = [], existing
+
+    def collection(self, path):
+        return FakeRef(path, self.existing)
+
+    def batch(self):
+        return FakeBatch(self.log)
+
+def test_delete_removes_reminders_and_leaves_tombstones(monkeypatch):
+    fake_db = FakeDB({"users/1/medications/Aspirin"})
+    monkeypatch.setattr(Delete_Med, "async_db", fake_db)
+    monkeypatch.setattr(versions, "async_db", fake_db)
+
+    async def fake_reminders(user_id, med_id):
+        return [("r1", {}), ("r2", {})]
+
+    monkeypatch.setattr(Delete_Med, "get_medication_reminders", fake_reminders)
+
+    assert asyncio.run(Delete_Med.delete_medication("1", "Missing")) is None
+    assert asyncio.run(Delete_Med.delete_medication("1", "Aspirin")) == ["r1", "r2"]
+
+    deleted = [entry[1] for entry in fake_db.log if entry[0] == "delete"]
+    assert deleted == ["users/1/medications/Aspirin/reminders/r1", "users/1/medications/Aspirin/reminders/r2", "users/1/medications/Aspirin"]
+    tombstones = [entry[1] for entry in fake_db.log if entry[0] == "set" and "tombstones" in entry[1].path]
+    assert tombstones == ["users/1/tombstones/reminder:Aspirin:r1", "users/1/tombstones/reminder:Aspirin:r2", "users/1/tombstones/medication:Aspirin"]
+    # One atomic commit, which also bumps the version
+    assert fake_db.log[-1] == ("commit",) and sum(entry == ("commit",) for entry in fake_db.log) == 1
+    assert any(entry[0] == "set" and entry[1] == "users/1" for entry in fake_db.log)
+
+def test_delete_route(monkeypatch, headers):
+    async def fake_delete(user_id, med_id):
+        return [] if med_id == "Aspirin" else None
+
+    monkeypatch.setattr(Medication.routes, "delete_medication_record", fake_delete)
+
+    assert client.delete("/medications/?med_name=Aspirin", headers=headers).status_code == 200
+    assert client.delete("/medications/?med_name=Missing", headers=headers).status_code == 404
@@ -0,0 +1,89 @@
+import os
+os.environ["USE_DUMMY_DATA"] = "1"
+import pytest
+from datetime import timedelta
+from fastapi.testclient import TestClient
+from jose import jwt, JWTError
+from Security import token_manager
+from cache_utils import TTLCache
+from Security.state_backend import get_state_backend
+from SDK_Database.user_cache import principal_cache
+from main import app
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    token_manager.verified_token_cache.clear()
+    get_state_backend().clear()
+    yield
+    token_manager.verified_token_cache.clear()
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """Counts signature checks done by jwt.decode."""
+    calls = []
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(1)
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(token_manager.jwt, "decode", counting_decode)
+    return calls
+
+def test_repeat_decode_is_served_from_cache(decodes):
+    token = token_manager.create_access_token({"sub": "alice", "role": "basic"})
+    first = token_manager.decode_token(token)
+    second = token_manager.decode_token(token)
+
+    assert first == second and first["sub"] == "alice"
+    assert len(decodes) == 1
+
+def test_cached_claims_are_copies():
+    token = token_manager.create_access_token({"sub": "alice", "role": "basic"})
+    token_manager.decode_token(token)["token"] = token
+    assert "token" not in token_manager.decode_token(token)
+
+def test_entry_expires_with_the_token(decodes, monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(token_manager, "verified_token_cache", TTLCache(maxsize=10, clock=lambda: now[0]))
+    token = token_manager.create_access_token({"sub": "alice", "role": "basic"}, expires_delta=timedelta(minutes=5))
+
+    token_manager.decode_token(token)
+    now[0] = 4 * 60
+    token_manager.decode_token(token)
+    assert len(decodes) == 1
+
+    now[0] = 5 * 60 + 1
+    token_manager.decode_token(token)
+    assert len(decodes) == 2
+
+def test_tokens_without_exp_are_not_cached(decodes):
+    token = jwt.encode({"sub": "alice", "role": "basic"}, token_manager.SECRET_KEY, algorithm=token_manager.JWT_ALGORITHM)
+    token_manager.decode_token(token)
+    token_manager.decode_token(token)
+    assert len(decodes) == 2
+
+def test_altered_token_is_still_verified():
+    token = token_manager.create_access_token({"sub": "alice", "role": "basic"})
+    token_manager.decode_token(token)
+
+    header, payload, signature = token.split(".")
+    tampered = ".".join([header, payload, signature[:-2] + ("AA" if signature[-2:] != "AA" else "BB")])
+    with pytest.raises(JWTError):
+        token_manager.decode_token(tampered)
+
+def test_revoked_token_is_refused_even_when_cached(decodes):
+    principal_cache.set("alice", {"user_id": "1", "connected_users": {}})
+    token = token_manager.create_access_token({"sub": "alice", "role": "basic"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/users/1", headers=headers).status_code == 200
+    assert client.get("/users/1", headers=headers).status_code == 200
+    assert len(decodes) == 1
+
+    token_manager.blacklist_access_token(token)
+    response = client.get("/users/1", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has been blacklisted"
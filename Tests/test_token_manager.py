@@ -32,3 +32,16 @@ def test_token_blacklisting():
 def test_invalid_token_raises():
     with pytest.raises(JWTError):
         token_manager.decode_token("this.is.not.valid")
+
+def test_tokens_carry_unique_jti():
+    first = token_manager.decode_token(token_manager.create_access_token(sample_data))
+    second = token_manager.decode_token(token_manager.create_access_token(sample_data))
+    assert first["jti"] and second["jti"]
+    assert first["jti"] != second["jti"]
+
+def test_blacklist_is_keyed_by_jti():
+    token = token_manager.create_access_token(sample_data)
+    other = token_manager.create_access_token(sample_data)
+    token_manager.blacklist_access_token(token)
+    assert token_manager.is_token_blacklisted(token)
+    assert not token_manager.is_token_blacklisted(other)
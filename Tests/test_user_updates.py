@@ -0,0 +1,66 @@
+import os
+os.environ["USE_DUMMY_DATA"] = "1"
+import pytest
+from fastapi.testclient import TestClient
+import Users.routes
+import SDK_Database.Create as Create
+import SDK_Database.Update_User as Update_User
+from main import app
+from Security.token_manager import create_access_token
+from Security.state_backend import get_state_backend
+from SDK_Database.user_cache import principal_cache
+
+class FakeDocument:
+    def __init__(self, writes, path):
+        self.writes = writes
+        self.path = path
+
+    async def update(self, data):
+        self.writes.append((self.path, data))
+
+class FakeDB:
+    def __init__(self):
+        self.writes = []
+
+    def collection(self, name):
+        return self
+
+    def document(self, doc_id):
+        return FakeDocument(self.writes, f"users/{doc_id}")
+
+@pytest.fixture
+def client(monkeypatch):
+    db = FakeDB()
+    monkeypatch.setattr(Update_User, "async_db", db)
+    monkeypatch.setattr(Create, "async_db", db)
+    monkeypatch.setattr(Users.routes, "USE_DUMMY_DATA", True)
+    get_state_backend().clear()
+    principal_cache.clear()
+    principal_cache.set("alice", {"user_id": "1", "connected_users": {"3": "caretaker"}})
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'alice', 'role': 'basic'})}"}
+    yield TestClient(app), headers, db
+    principal_cache.clear()
+
+def test_updates_write_the_callers_user_document(client):
+    test_client, headers, db = client
+
+    response = test_client.put("/users/username/", params={"new_name": "alicia"}, headers=headers)
+
+    assert response.status_code == 200 and response.json() == {"message": "Name updated for 1."}
+    assert db.writes == [("users/1", {"username": "alicia"})]
+    # The write drops the caller's cached principal
+    assert principal_cache.get("alice") is None
+
+def test_connect_writes_the_callers_connections(client):
+    test_client, headers, db = client
+
+    response = test_client.post("/users/connect/", json={"connected_user_id": "2", "role": "caretaker"}, headers=headers)
+
+    assert response.status_code == 200
+    assert db.writes == [("users/1", {"connected_users.2": "caretaker"})]
+
+def test_delegate_access_checks_the_callers_connections(client):
+    test_client, headers, _ = client
+
+    assert test_client.post("/delegate_access/", params={"dependent_id": "3"}, headers=headers).status_code == 200
+    assert test_client.post("/delegate_access/", params={"dependent_id": "2"}, headers=headers).status_code == 403